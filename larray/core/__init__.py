@@ -5,3 +5,4 @@ from larray.core.axis import *
 from larray.core.array import *
 from larray.core.session import *
 from larray.core.ufuncs import *
+from larray.core.expr import *
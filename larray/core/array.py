@@ -5,7 +5,8 @@ __all__ = [
     'LArray', 'zeros', 'zeros_like', 'ones', 'ones_like', 'empty', 'empty_like', 'full', 'full_like', 'sequence',
     'create_sequential', 'ndrange', 'labels_array', 'ndtest', 'aslarray', 'identity', 'diag', 'eye',
     'larray_equal', 'larray_nan_equal', 'all', 'any', 'sum', 'prod', 'cumsum', 'cumprod', 'min', 'max', 'mean', 'ptp',
-    'var', 'std', 'median', 'percentile', 'stack', 'nan', 'nan_equal'
+    'var', 'std', 'median', 'percentile', 'stack', 'nan', 'nan_equal', 'set_num_threads', 'get_num_threads',
+    'set_broadcast_cache_size', 'clear_broadcast_cache'
 ]
 
 """
@@ -42,6 +43,7 @@ from itertools import product, chain, groupby, islice
 import os
 import sys
 import functools
+from multiprocessing.pool import ThreadPool
 
 try:
     import builtins
@@ -62,13 +64,13 @@ except ImportError:
     np_nanprod = None
 
 from larray.core.abstractbases import ABCLArray
-from larray.core.expr import ExprNode
+from larray.core.expr import ExprNode, LazyExpr, LazyBinaryOp
 from larray.core.group import (Group, IGroup, LGroup, remove_nested_groups, _to_key, _to_keys,
                                _range_to_slice, _translate_sheet_name, _translate_key_hdf)
-from larray.core.axis import Axis, AxisReference, AxisCollection, X, _make_axis
+from larray.core.axis import Axis, AxisReference, AxisCollection, PreparedKey, X, _make_axis
 from larray.util.misc import (table2str, size2str, basestring, izip, rproduct, ReprString, duplicates,
                               float_error_handler_factory, _isnoneslice, light_product, unique_list, common_type,
-                              renamed_to, deprecate_kwarg)
+                              renamed_to, deprecate_kwarg, LRUCache)
 
 
 nan = np.nan
@@ -475,6 +477,11 @@ _kwarg_agg = {
         keepaxes : bool, optional
             Whether or not reduced axes are left in the result as dimensions with size one. Defaults to False."""
     },
+    'threads': {'value': None, 'doc': """
+        threads : int, optional
+            Number of threads used to aggregate large arrays along some (but not all) of their axes. Defaults to None
+            (use the value set by set_num_threads, 1 by default)."""
+    },
     'interpolation': {'value': 'linear', 'doc': """
         interpolation : {'linear', 'lower', 'higher', 'midpoint', 'nearest'}, optional
             Interpolation method to use when the desired quantile lies between two data points ``i < j``:
@@ -545,6 +552,226 @@ def _doc_agg_method(func, by=False, long_name='', action_verb='perform', extra_a
 _always_return_float = {np.mean, np.nanmean, np.median, np.nanmedian, np.percentile, np.nanpercentile,
                         np.std, np.nanstd, np.var, np.nanvar}
 
+_num_threads = 1
+# arrays smaller than this (number of elements) are always aggregated in the current thread
+_parallel_min_size = 2 ** 20
+_thread_pools = {}
+
+
+def set_num_threads(threads):
+    """
+    Sets the default number of threads used to aggregate large arrays.
+
+    Aggregates along some (but not all) axes of arrays with at least about one million elements split the data in
+    blocks along the largest non-aggregated axis and aggregate each block in a separate thread. This is only used by
+    sum, prod, min, max, mean, var and std (and their _by variants). Results of min and max do not depend on the number
+    of threads. Results of the other functions are deterministic for a given number of threads but, because of
+    floating point rounding, they can differ very slightly from those computed using another number of threads.
+
+    Parameters
+    ----------
+    threads : int
+        Number of threads. 1 disables multi-threading (this is the default).
+
+    Returns
+    -------
+    int
+        Previous number of threads.
+
+    See Also
+    --------
+    get_num_threads
+
+    Examples
+    --------
+    >>> previous = set_num_threads(4)
+    >>> get_num_threads()
+    4
+    >>> arr = ndtest((1000, 2000))
+    >>> arr.sum('b', threads=2)[:'a2']
+    a       a0       a1       a2
+       1999000  5999000  9999000
+    >>> set_num_threads(previous)
+    4
+    """
+    global _num_threads
+    threads = int(threads)
+    if threads < 1:
+        raise ValueError("threads must be a positive integer")
+    previous = _num_threads
+    _num_threads = threads
+    return previous
+
+
+def get_num_threads():
+    """
+    Returns the default number of threads used to aggregate large arrays (see set_num_threads).
+
+    Returns
+    -------
+    int
+    """
+    return _num_threads
+
+
+# aggregate functions which can be split along non-aggregated axes
+_parallel_agg_ops = {np.sum, np.nansum, np.prod, np_nanprod, np.min, np.nanmin, np.max, np.nanmax,
+                     np.mean, np.nanmean, np.var, np.nanvar, np.std, np.nanstd}
+
+
+def _get_thread_pool(threads):
+    pool = _thread_pools.get(threads)
+    if pool is None:
+        pool = ThreadPool(threads)
+        _thread_pools[threads] = pool
+    return pool
+
+
+def _parallel_aggregate(op, data, axes_indices, threads, keepdims=False, out=None, **kwargs):
+    """
+    Computes op(data, axis=axes_indices, ...) by splitting data in blocks along the largest non-aggregated axis and
+    aggregating each block in a separate thread. Returns None if that is not possible or not worth it.
+    """
+    if threads is None:
+        threads = _num_threads
+    if threads <= 1 or op not in _parallel_agg_ops or data.size < _parallel_min_size:
+        return None
+    kept = [i for i in range(data.ndim) if i not in axes_indices]
+    if not kept:
+        return None
+    split_axis = max(kept, key=lambda i: data.shape[i])
+    length = data.shape[split_axis]
+    num_blocks = min(threads, length)
+    if num_blocks <= 1:
+        return None
+    res_split_axis = split_axis if keepdims else kept.index(split_axis)
+    # blocks only depend on the number of threads and the shape of data
+    bounds = np.linspace(0, length, num_blocks + 1).astype(int)
+    blocks = [slice(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def aggregate_block(block):
+        block_key = (slice(None),) * split_axis + (block,)
+        block_out = None if out is None else out[(slice(None),) * res_split_axis + (block,)]
+        return op(data[block_key], axis=axes_indices, keepdims=keepdims, out=block_out, **kwargs)
+
+    results = _get_thread_pool(threads).map(aggregate_block, blocks)
+    return out if out is not None else np.concatenate(results, axis=res_split_axis)
+
+
+# aggregate functions which can be computed on several groups at once using ufunc.reduceat (means are computed as
+# sums divided by the number of values). {op: (ufunc, skipna)}
+_reduceat_ufuncs = {np.sum: (np.add, False), np.nansum: (np.add, True),
+                    np.prod: (np.multiply, False), np_nanprod: (np.multiply, True),
+                    np.min: (np.minimum, False), np.nanmin: (np.minimum, True),
+                    np.max: (np.maximum, False), np.nanmax: (np.maximum, True),
+                    np.all: (np.logical_and, False), np.any: (np.logical_or, False),
+                    np.mean: (np.add, False), np.nanmean: (np.add, True)}
+
+
+def _group_bounds(axis, group):
+    """
+    Returns the (start, stop) positions of the labels of group on axis if they are contiguous (in increasing order),
+    None otherwise.
+    """
+    try:
+        key = axis.index(group)
+    except Exception:
+        # let the generic code path handle (and report) invalid groups
+        return None
+    length = len(axis)
+    if isinstance(key, slice):
+        start, stop, step = key.indices(length)
+        if step != 1:
+            return None
+    elif np.isscalar(key):
+        if not isinstance(key, (int, np.integer)):
+            return None
+        start = key + length if key < 0 else key
+        stop = start + 1
+    else:
+        key = np.asarray(key)
+        if key.ndim != 1 or key.dtype.kind not in 'iu' or not len(key):
+            return None
+        if len(key) > 1 and not (np.diff(key) == 1).all():
+            return None
+        start, stop = int(key[0]), int(key[-1]) + 1
+        if start < 0:
+            return None
+    if not 0 <= start < stop <= length:
+        return None
+    return start, stop
+
+
+def _reduceat_indices(bounds, length):
+    """
+    Returns the indices to pass to ufunc.reduceat to reduce each (start, stop) range in bounds and the position of
+    each range in the result (or None if this is not possible).
+
+    Ranges can overlap and be in any order. Reducing a range ending before the next one starts requires an extra
+    index whose result is discarded. Since reduceat cannot use length as an index, the range ending at length (if any)
+    must be reduced last.
+
+    Examples
+    --------
+    >>> _reduceat_indices([(0, 2), (2, 5), (5, 10)], 10)
+    ([0, 2, 5], [0, 1, 2])
+    >>> _reduceat_indices([(5, 10), (2, 4), (0, 2)], 10)
+    ([2, 4, 0, 2, 5], [4, 0, 2])
+    >>> _reduceat_indices([(0, 10), (5, 10)], 10) is None
+    True
+    """
+    order = [i for i, (start, stop) in enumerate(bounds) if stop != length]
+    if len(order) < len(bounds) - 1:
+        return None
+    order += [i for i, (start, stop) in enumerate(bounds) if stop == length]
+    indices = []
+    positions = [None] * len(bounds)
+    prev_stop = None
+    for i in order:
+        start, stop = bounds[i]
+        if prev_stop is not None and prev_stop != start:
+            indices.append(prev_stop)
+        positions[i] = len(indices)
+        indices.append(start)
+        prev_stop = stop
+    if prev_stop != length:
+        indices.append(prev_stop)
+    return indices, positions
+
+
+def _reduceat(op, data, indices, axis, dtype=None):
+    """
+    Computes op (which must be in _reduceat_ufuncs) along axis of data on each range between consecutive indices (the
+    last range extends to the end of the axis) using ufunc.reduceat. dtype is only used by sums and products.
+    Returns None if this is not possible.
+    """
+    ufunc, skipna = _reduceat_ufuncs[op]
+    if data.dtype.kind == 'O':
+        return None
+    isnan = None
+    if skipna and data.dtype.kind in 'fc':
+        isnan = np.isnan(data)
+        if isnan.any():
+            # NaNs can be ignored by replacing them with the identity of the operation, but minimum and maximum do
+            # not have any
+            if ufunc.identity is None:
+                return None
+            data = np.where(isnan, ufunc.identity, data)
+        else:
+            isnan = None
+    if op in (np.mean, np.nanmean):
+        # like np.mean, integer and boolean values are averaged as floats
+        sums = np.add.reduceat(data, indices, axis=axis, dtype=float if data.dtype.kind in 'biu' else None)
+        if isnan is not None:
+            counts = np.add.reduceat(~isnan, indices, axis=axis)
+        else:
+            counts_shape = [1] * data.ndim
+            counts_shape[axis] = len(indices)
+            counts = np.diff(np.append(indices, data.shape[axis])).reshape(counts_shape)
+        return sums / counts
+    # reduce bool arrays as integers for sum and prod (like np.sum does)
+    return ufunc.reduceat(data, indices, axis=axis, dtype=dtype if ufunc in (np.add, np.multiply) else None)
+
 obj_isnan = np.vectorize(lambda x: x != x, otypes=[bool])
 
 def nan_equal(a1, a2):
@@ -688,6 +915,18 @@ class LArray(ABCLArray):
         self.axes = axes
         self.title = title
 
+    @classmethod
+    def _unchecked(cls, data, axes, title=''):
+        """
+        Creates an array without any check nor conversion. This is meant for library internals which already know
+        that data is a numpy array and axes an AxisCollection matching its shape.
+        """
+        res = cls.__new__(cls)
+        res.data = data
+        res.axes = axes
+        res.title = title
+        return res
+
     # XXX: rename to posnonzero and implement a label version of nonzero
     def nonzero(self):
         """
@@ -1167,6 +1406,70 @@ class LArray(ABCLArray):
         data = np.ndarray.__array_wrap__(self.data, out_arr, context)
         return LArray(data, self.axes)
 
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        """
+        Called by numpy (>= 1.13) instead of the ufunc itself when it is given an LArray (as input, out or where),
+        so that numpy ufuncs (e.g. np.add or np.exp) work on LArrays like on ndarrays, broadcasting arrays by axis
+        name. The reduce and accumulate methods of ufuncs accept axis references (names, Axis objects or indices).
+
+        Examples
+        --------
+        >>> arr = ndtest((2, 3))
+        >>> np.add(arr, arr.sum('a'))
+        a\\b  b0  b1  b2
+         a0   3   6   9
+         a1   6   9  12
+        >>> np.multiply.reduce(arr, axis='b')
+        a  a0  a1
+            0  60
+        >>> np.add.accumulate(arr, axis='b')
+        a\\b  b0  b1  b2
+         a0   0   1   3
+         a1   3   7  12
+        """
+        for value in inputs + kwargs.get('out', ()):
+            # let other types implementing __array_ufunc__ take care of themselves
+            if not isinstance(value, (LArray, np.ndarray)) and hasattr(value, '__array_ufunc__'):
+                return NotImplemented
+
+        if method == '__call__':
+            return _ufunc_call(ufunc, inputs, kwargs)
+        elif method in ('reduce', 'accumulate'):
+            array = inputs[0]
+            if not isinstance(array, LArray):
+                # self is an out argument
+                return _ufunc_reduce_out(ufunc, method, inputs, kwargs)
+            axis = kwargs.get('axis', 0)
+            if axis is None:
+                axes_indices = tuple(range(array.ndim))
+            elif isinstance(axis, tuple):
+                axes_indices = tuple(array.axes.index(a) for a in axis)
+            else:
+                axes_indices = array.axes.index(axis)
+            kwargs['axis'] = axes_indices
+            if method == 'accumulate':
+                res_axes = array.axes
+            else:
+                if not isinstance(axes_indices, tuple):
+                    axes_indices = (axes_indices,)
+                if kwargs.get('keepdims', False):
+                    res_axes = AxisCollection([Axis(1, axis.name) if i in axes_indices else axis
+                                               for i, axis in enumerate(array.axes)])
+                else:
+                    res_axes = array.axes - [array.axes[i] for i in axes_indices]
+            return _ufunc_reduce_out(ufunc, method, (array.data,) + inputs[1:], kwargs, res_axes)
+        elif method == 'outer':
+            a, b = inputs
+            res_axes = get_axes(a) + get_axes(b)
+            raw_inputs = [v.data if isinstance(v, LArray) else v for v in inputs]
+            return _ufunc_reduce_out(ufunc, method, raw_inputs, kwargs, res_axes)
+        elif method == 'at':
+            # modifies the first argument in place
+            raw_inputs = [v.data if isinstance(v, LArray) else v for v in inputs]
+            return getattr(ufunc, method)(*raw_inputs, **kwargs)
+        else:
+            return NotImplemented
+
     def __bool__(self):
         return bool(self.data)
     # Python 2
@@ -1775,18 +2078,17 @@ class LArray(ABCLArray):
                 axis_key = axis_key.to_label()
 
         # otherwise we need to guess the axis
-        # TODO: instead of checking all axes, we should have a big mapping
-        # (in AxisCollection or LArray):
-        # label -> (axis, index)
-        # but for Pandas, this wouldn't work, we'd need label -> axis
-        valid_axes = []
-        # TODO: use axis_key dtype to only check compatible axes
-        for axis in self.axes:
-            try:
-                axis_pos_key = axis.index(axis_key, bool_passthrough)
-                valid_axes.append(axis)
-            except KeyError:
-                continue
+        # plain labels are looked up in the label -> (axis, index) mapping of the whole collection
+        matches = self.axes._label_positions(axis_key)
+        if matches is None:
+            matches = []
+            # TODO: use axis_key dtype to only check compatible axes
+            for axis in self.axes:
+                try:
+                    matches.append((axis, axis.index(axis_key, bool_passthrough)))
+                except KeyError:
+                    continue
+        valid_axes = [axis for axis, axis_pos_key in matches]
         if not valid_axes:
             raise ValueError("%s is not a valid label for any axis" % axis_key)
         elif len(valid_axes) > 1:
@@ -1795,7 +2097,8 @@ class LArray(ABCLArray):
             valid_axes = ', '.join(a.name if a.name is not None else '{{{}}}'.format(self.axes.index(a))
                                    for a in valid_axes)
             raise ValueError('%s is ambiguous (valid in %s)' % (axis_key, valid_axes))
-        return valid_axes[0].i[axis_pos_key]
+        axis, axis_pos_key = matches[0]
+        return axis.i[axis_pos_key]
 
     def _translate_axis_key(self, axis_key, bool_passthrough=True):
         """Same as chunk.
@@ -1862,19 +2165,17 @@ class LArray(ABCLArray):
                     axis_key = axis_key.with_axis(real_axis)
                 return axis_key
 
-        # TODO: instead of checking all axes, we should have a big mapping
-        # (in AxisCollection or LArray):
-        # label -> (axis, index)
-        # or possibly (for ambiguous labels)
-        # label -> {axis: index}
-        # but for Pandas, this wouldn't work, we'd need label -> axis
-        valid_axes = []
-        for axis in self.axes:
-            try:
-                axis.index(axis_key)
-                valid_axes.append(axis)
-            except KeyError:
-                continue
+        matches = self.axes._label_positions(axis_key)
+        if matches is not None:
+            valid_axes = [axis for axis, pos in matches]
+        else:
+            valid_axes = []
+            for axis in self.axes:
+                try:
+                    axis.index(axis_key)
+                    valid_axes.append(axis)
+                except KeyError:
+                    continue
         if not valid_axes:
             raise ValueError("%s is not a valid label for any axis" % axis_key)
         elif len(valid_axes) > 1:
@@ -1974,9 +2275,9 @@ class LArray(ABCLArray):
 
     # TODO: we only need axes length => move this to AxisCollection
     # (but this backend/numpy-specific so we'll probably need to create a subclass of it)
-    def _cross_key(self, key):
+    def _split_orthogonal_key(self, key):
         """
-        Returns a key indexing the cross product.
+        Splits a complete positional key in a basic key and a list of indexing arrays.
 
         Parameters
         ----------
@@ -1984,35 +2285,92 @@ class LArray(ABCLArray):
 
         Returns
         -------
-        key
-            A key for indexing the cross product.
-        """
-
-        # handle advanced indexing with more than one indexing array: basic indexing (only integer and slices) and
-        # advanced indexing with only one indexing array are handled fine by numpy
-        if self._needs_advanced_indexing(key):
-            # np.ix_ wants only lists so:
-
-            # 1) transform scalar-key to lists of 1 element. In that case, ndarray.__getitem__ leaves length 1
-            #    dimensions instead of dropping them like we would like, so we will need to drop them later ourselves
-            #    (via reshape)
-            noscalar_key = [[axis_key] if np.isscalar(axis_key) else axis_key
-                            for axis_key in key]
-
-            # 2) expand slices to lists (ranges)
-            # XXX: cache the range in the axis?
-            # TODO: fork np.ix_ to allow for slices directly
-            # it will be tricky to get right though because in that case the result of a[key] can have its dimensions in
-            # the wrong order (if the ix_arrays are not next to each other, the corresponding dimensions are moved to
-            # the front). It is probably worth the trouble though because it is much faster than the current solution
-            # (~5x in my simple test) but this case (num_ix_arrays > 1) is rare in the first place (at least in demo)
-            # so it is not a priority.
-            listkey = tuple(np.arange(*axis_key.indices(len(axis))) if isinstance(axis_key, slice) else axis_key
-                            for axis_key, axis in zip(noscalar_key, self.axes))
-            # np.ix_ computes the cross product of all lists
-            return np.ix_(*listkey)
-        else:
-            return tuple(key)
+        tuple
+            Basic key (containing only scalars and slices), which returns a view on the data.
+        list
+            (position in the view, indexing array) pairs for the axes indexed by a sequence.
+        """
+        # isinstance(ndarray, collections.Sequence) is False but it behaves like one
+        sequence = (tuple, list, np.ndarray)
+        basic_key = []
+        array_keys = []
+        pos = 0
+        for axis_key in key:
+            if isinstance(axis_key, sequence):
+                basic_key.append(slice(None))
+                array_keys.append((pos, axis_key))
+            else:
+                basic_key.append(axis_key)
+            if not np.isscalar(axis_key):
+                pos += 1
+        return tuple(basic_key), array_keys
+
+    def _orthogonal_getitem(self, data, key):
+        """
+        Returns the cross product of the positional key. Axes indexed by scalars are dropped.
+
+        Basic indexing (only integer and slices) and advanced indexing with only one indexing array are handled fine
+        by numpy. Otherwise, we first apply the scalars and slices (which gives a view) and then either:
+
+        * index all the axes at once via np.ix_ arrays, after moving those axes first. When the last axis is not
+          indexed by an array, this copies whole rows at a time.
+        * index each axis by its array in turn, starting with the axis which is reduced the most. This is usually
+          faster when the last axis is indexed by an array, unless the result is much smaller than the intermediate
+          results.
+
+        In both cases, slices never need to be expanded to arrays.
+        """
+        if not self._needs_advanced_indexing(key):
+            return data[tuple(key)]
+        basic_key, array_keys = self._split_orthogonal_key(key)
+        res = data[basic_key]
+        array_keys.sort(key=lambda pos_key: len(pos_key[1]) / max(res.shape[pos_key[0]], 1))
+        last_axis = res.ndim - 1
+        use_ix = len(array_keys) > 1
+        if use_ix and any(pos == last_axis for pos, axis_key in array_keys):
+            # rough (measured) relative costs per element copied: 1 for copying rows, 6 for gathering elements along
+            # the last axis and 10 per indexing array for np.ix_ arrays
+            shape = list(res.shape)
+            sequential_cost = 0
+            for pos, axis_key in array_keys:
+                shape[pos] = len(axis_key)
+                sequential_cost += np.prod(shape) * (6 if pos == last_axis else 1)
+            use_ix = np.prod(shape) * 10 * len(array_keys) < sequential_cost
+        if use_ix:
+            positions = [pos for pos, axis_key in array_keys]
+            order = positions + [i for i in range(res.ndim) if i not in positions]
+            res = res.transpose(order)[np.ix_(*[axis_key for pos, axis_key in array_keys])]
+            return res.transpose(np.argsort(order))
+        for pos, axis_key in array_keys:
+            res = res[(slice(None),) * pos + (axis_key,)]
+        return res
+
+    def _orthogonal_setitem(self, data, key, value):
+        """
+        Sets value in the cross product of the positional key. value must be broadcastable to the subset with the
+        axes indexed by scalars dropped.
+        """
+        if not self._needs_advanced_indexing(key):
+            data[tuple(key)] = value
+            return
+        basic_key, array_keys = self._split_orthogonal_key(key)
+        target = data[basic_key]
+        if len(array_keys) == 1:
+            pos, axis_key = array_keys[0]
+            target[(slice(None),) * pos + (axis_key,)] = value
+            return
+        # move the axes indexed by arrays first so that indexing by np.ix_ arrays does not need to expand the slices
+        positions = [pos for pos, axis_key in array_keys]
+        order = positions + [i for i in range(target.ndim) if i not in positions]
+        subset_shape = list(target.shape)
+        for pos, axis_key in array_keys:
+            subset_shape[pos] = len(axis_key)
+        value = np.asarray(value)
+        # numpy allows extra leading length 1 dimensions in the value
+        while value.ndim > target.ndim and value.shape[0] == 1:
+            value = value[0]
+        value = np.broadcast_to(value, subset_shape)
+        target.transpose(order)[np.ix_(*[axis_key for pos, axis_key in array_keys])] = value.transpose(order)
 
     def _needs_advanced_indexing(self, key):
         sequence = (tuple, list, np.ndarray)
@@ -2039,7 +2397,29 @@ class LArray(ABCLArray):
                     for axis, axis_key in zip(self.axes, translated_key)
                     if not np.isscalar(axis_key)]
 
+    def _scalar_key_positions(self, key):
+        """
+        Returns the positions corresponding to a key made of one plain label per axis or None if the generic key
+        translation must be used.
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) != self.ndim:
+            return None
+        return self.axes._scalar_key_positions(key)
+
     def __getitem__(self, key, collapse_slices=False):
+        # fast path for point access
+        positions = self._scalar_key_positions(key)
+        if positions is not None:
+            return self.data[positions]
+
+        if isinstance(key, PreparedKey):
+            translated_key, collapsed_key, axes = key.translate(self.axes)
+            res_data = self._orthogonal_getitem(self.data, collapsed_key if collapse_slices else translated_key)
+            if not axes:
+                return res_data
+            return LArray._unchecked(res_data, AxisCollection._unchecked(axes[:]))
 
         if isinstance(key, ExprNode):
             key = key.evaluate(self.axes)
@@ -2068,16 +2448,12 @@ class LArray(ABCLArray):
 
         if collapse_slices:
             translated_key = self._collapse_slices(translated_key)
-        cross_key = self._cross_key(translated_key)
-        data = data[cross_key]
+        res_data = self._orthogonal_getitem(data, translated_key)
         if not axes:
             # scalars do not need to be wrapped in LArray
-            return data
+            return res_data
         else:
-            # drop length 1 dimensions created by scalar keys
-            res_data = data.reshape(tuple(len(axis) for axis in axes))
-            assert _equal_modulo_len1(data.shape, res_data.shape)
-            return LArray(res_data, axes)
+            return LArray._unchecked(res_data, AxisCollection._unchecked(axes))
 
     def __setitem__(self, key, value, collapse_slices=True):
         # TODO: if key or value has more axes than self, we should use
@@ -2097,31 +2473,39 @@ class LArray(ABCLArray):
 
         # int LArray keys
         # the int value represent an index along ONE particular axis, even if the key has more than one axis.
-        if isinstance(key, ExprNode):
-            key = key.evaluate(self.axes)
+        if not isinstance(value, LArray):
+            # fast path for point access
+            positions = self._scalar_key_positions(key)
+            if positions is not None:
+                self.data[positions] = value
+                return
 
         data = np.asarray(self.data)
-        translated_key = self._translated_key(key)
+        if isinstance(key, PreparedKey):
+            translated_key, collapsed_key, axes = key.translate(self.axes)
+            if collapse_slices:
+                translated_key = collapsed_key
+        else:
+            if isinstance(key, ExprNode):
+                key = key.evaluate(self.axes)
 
-        if isinstance(key, (LArray, np.ndarray)) and np.issubdtype(key.dtype, np.bool_):
-            if isinstance(value, LArray):
-                new_axes = self._bool_key_new_axes(translated_key, wildcard_allowed=True)
-                value = value.broadcast_with(new_axes)
-            data[translated_key] = value
-            return
+            translated_key = self._translated_key(key)
 
-        if collapse_slices:
-            translated_key = self._collapse_slices(translated_key)
-        cross_key = self._cross_key(translated_key)
+            if isinstance(key, (LArray, np.ndarray)) and np.issubdtype(key.dtype, np.bool_):
+                if isinstance(value, LArray):
+                    new_axes = self._bool_key_new_axes(translated_key, wildcard_allowed=True)
+                    value = value.broadcast_with(new_axes)
+                data[translated_key] = value
+                return
+
+            if collapse_slices:
+                translated_key = self._collapse_slices(translated_key)
+            axes = None
 
         if isinstance(value, LArray):
             # XXX: we might want to create fakes (or wildcard?) axes in this case, as we only use axes names and axes
             # length, not the ticks, and those could theoretically take a significant time to compute
-            if self._needs_advanced_indexing(translated_key):
-                # when adv indexing is needed, cross_key converts scalars to lists of 1 element, which does not remove
-                # the dimension like scalars normally do
-                axes = self._get_axes_from_translated_key(translated_key, True)
-            else:
+            if axes is None:
                 axes = self._get_axes_from_translated_key(translated_key)
             value = value.broadcast_with(axes)
             value.axes.check_compatible(axes)
@@ -2139,7 +2523,7 @@ class LArray(ABCLArray):
             # if value is a "raw" ndarray we rely on numpy broadcasting
             pass
 
-        data[cross_key] = value
+        self._orthogonal_setitem(data, translated_key, value)
 
     def _bool_key_new_axes(self, key, wildcard_allowed=False, sep='_'):
         """
@@ -2252,6 +2636,232 @@ class LArray(ABCLArray):
         """
         self.__setitem__(kwargs, value)
 
+    def _value_positions(self, labels, axis_labels):
+        positions = self.axes._scalar_key_positions(labels, axis_labels)
+        if positions is not None:
+            return positions
+        # use the generic path to get the same errors than when indexing the array
+        key = labels + tuple(self.axes[axis_name][label] for axis_name, label in axis_labels.items())
+        translated_key = self._translated_key(key)
+        if not all(np.isscalar(axis_key) for axis_key in translated_key):
+            raise ValueError("%s does not select a single value of an array with axes %s"
+                             % (key, self.axes.display_names))
+        return tuple(translated_key)
+
+    def get_value(self, *labels, **axis_labels):
+        """
+        Returns the value of a single cell, given one label per axis.
+
+        This is equivalent to (but much faster than) indexing the array with a key selecting a single cell.
+
+        Parameters
+        ----------
+        *labels : scalars
+            Labels given without their axis, in any order.
+        **axis_labels : scalars
+            Labels given by axis name: {axis_name: label}.
+
+        Returns
+        -------
+        scalar
+
+        See Also
+        --------
+        LArray.set_value
+
+        Examples
+        --------
+        >>> arr = ndtest((2, 3))
+        >>> arr
+        a\\b  b0  b1  b2
+         a0   0   1   2
+         a1   3   4   5
+        >>> arr.get_value('a1', 'b2')
+        5
+        >>> arr.get_value('b2', 'a1')
+        5
+        >>> arr.get_value('a1', b='b0')
+        3
+        >>> arr.get_value('a1')
+        Traceback (most recent call last):
+        ...
+        ValueError: ('a1',) does not select a single value of an array with axes ['a', 'b']
+        """
+        return self.data[self._value_positions(labels, axis_labels)]
+
+    def set_value(self, value, *labels, **axis_labels):
+        """
+        Sets the value of a single cell, given one label per axis.
+
+        This is equivalent to (but much faster than) setting a key selecting a single cell.
+
+        Parameters
+        ----------
+        value : scalar
+            Value to store.
+        *labels : scalars
+            Labels given without their axis, in any order.
+        **axis_labels : scalars
+            Labels given by axis name: {axis_name: label}.
+
+        See Also
+        --------
+        LArray.get_value
+
+        Examples
+        --------
+        >>> arr = ndtest((2, 3))
+        >>> arr.set_value(10, 'a1', 'b2')
+        >>> arr.set_value(20, 'a0', b='b1')
+        >>> arr
+        a\\b  b0  b1  b2
+         a0   0  20   2
+         a1   3   4  10
+        """
+        self.data[self._value_positions(labels, axis_labels)] = value
+
+    def _points_positions(self, labels, axis_labels):
+        """
+        Translates one array of labels per axis to positions, using a single vectorized lookup per axis.
+
+        Returns
+        -------
+        list
+            positions on each axis (ndarrays broadcastable between them).
+        AxisCollection or None
+            axes of the result if any key is an LArray, None otherwise.
+        """
+        axes = self.axes
+        if len(labels) > self.ndim:
+            raise ValueError("too many keys (%d) for array with %d dimensions" % (len(labels), self.ndim))
+        keys = list(zip(axes, labels)) + [(axes[axis_name], axis_key) for axis_name, axis_key in axis_labels.items()]
+        positions = [None] * self.ndim
+        for axis, axis_key in keys:
+            i = axes.index(axis)
+            if positions[i] is not None:
+                raise ValueError("several keys given for axis %s" % axis.name)
+            if isinstance(axis_key, LArray):
+                positions[i] = LArray._unchecked(self._points_axis_positions(axis, axis_key.data), axis_key.axes)
+            else:
+                positions[i] = self._points_axis_positions(axis, axis_key)
+        if any(axis_pos is None for axis_pos in positions):
+            missing = [axis.name for axis, axis_pos in zip(axes, positions) if axis_pos is None]
+            raise ValueError("no key given for axis %s" % ', '.join(str(name) for name in missing))
+        if any(isinstance(axis_pos, LArray) for axis_pos in positions):
+            return _broadcast_data(positions)
+        return positions, None
+
+    @staticmethod
+    def _points_axis_positions(axis, axis_key):
+        if np.isscalar(axis_key):
+            return axis.index(axis_key)
+        axis_key = np.asarray(axis_key)
+        # empty keys (which np.asarray makes float arrays) select nothing
+        if axis_key.size == 0:
+            return np.zeros(axis_key.shape, dtype=int)
+        # string columns coming from pandas have object dtype
+        labels_kind = axis.labels.dtype.kind
+        if axis_key.dtype.kind == 'O' and labels_kind in 'US':
+            axis_key = axis_key.astype(labels_kind)
+        try:
+            return axis.index(axis_key)
+        except KeyError:
+            invalid = [label for label in np.unique(axis_key) if label not in axis]
+            # all labels are valid but the key could not be translated as a whole (e.g. it has another dtype)
+            if not invalid:
+                raise
+            raise ValueError("%s %s not valid label(s) for the %s axis"
+                             % (', '.join(repr(label) for label in invalid[:10]),
+                                'is' if len(invalid) == 1 else 'are', axis.name))
+
+    def get_values(self, *labels, **axis_labels):
+        """
+        Returns the values of many cells at once, given one array of labels per axis.
+
+        This is meant to look up values for many points at once (for example the rate corresponding to each
+        individual in a table of microdata). Each array of labels is translated to positions using a single
+        vectorized lookup and, contrary to `points`, no label is built for the result.
+
+        Parameters
+        ----------
+        *labels : array-like or LArray or scalar
+            Arrays of labels for the first axes of the array, in axis order.
+        **axis_labels : array-like or LArray or scalar
+            Arrays of labels given by axis name: {axis_name: labels}.
+
+        Returns
+        -------
+        ndarray or LArray
+            Values of the cells designated by each combination of labels. If any key is an LArray, the result is an
+            LArray with the (combined) axes of the keys, otherwise it is an ndarray with the (broadcasted) shape of
+            the keys.
+
+        See Also
+        --------
+        LArray.set_values, LArray.get_value, LArray.points
+
+        Examples
+        --------
+        >>> rate = ndtest((Axis('sex=M,F'), Axis('age=0..3')))
+        >>> rate
+        sex\\age  0  1  2  3
+              M  0  1  2  3
+              F  4  5  6  7
+        >>> rate.get_values(sex=['F', 'M', 'F'], age=[3, 0, 0])
+        array([7, 0, 4])
+        >>> sex = LArray(['F', 'M', 'F'], Axis(3, 'id'))
+        >>> age = LArray([3, 0, 0], sex.axes)
+        >>> rate.get_values(sex, age)
+        id*  0  1  2
+             7  0  4
+
+        Scalars can be used for axes which do not vary
+
+        >>> rate.get_values(sex='F', age=age)
+        id*  0  1  2
+             7  4  4
+        """
+        positions, res_axes = self._points_positions(labels, axis_labels)
+        res_data = self.data[tuple(positions)]
+        if res_axes is None:
+            return res_data
+        return LArray._unchecked(res_data, res_axes)
+
+    def set_values(self, values, *labels, **axis_labels):
+        """
+        Sets the values of many cells at once, given one array of labels per axis.
+
+        When several points designate the same cell, the last value is kept.
+
+        Parameters
+        ----------
+        values : scalar, array-like or LArray
+            Values to store. They must be broadcastable to the (combined) axes or shape of the keys.
+        *labels : array-like or LArray or scalar
+            Arrays of labels for the first axes of the array, in axis order.
+        **axis_labels : array-like or LArray or scalar
+            Arrays of labels given by axis name: {axis_name: labels}.
+
+        See Also
+        --------
+        LArray.get_values, LArray.set_value
+
+        Examples
+        --------
+        >>> arr = zeros((Axis('sex=M,F'), Axis('age=0..3')), dtype=int)
+        >>> arr.set_values([1, 2, 3], sex=['F', 'M', 'F'], age=[3, 0, 1])
+        >>> arr
+        sex\\age  0  1  2  3
+              M  2  0  0  0
+              F  0  3  0  1
+        """
+        positions, res_axes = self._points_positions(labels, axis_labels)
+        if isinstance(values, LArray):
+            if res_axes is None:
+                raise ValueError("values can only be an LArray if (some) keys are LArrays")
+            values = values.broadcast_with(res_axes).data
+        self.data[tuple(positions)] = values
+
     def reshape(self, target_axes):
         """
         Given a list of new axes, changes the shape of the array.
@@ -2352,20 +2962,11 @@ class LArray(ABCLArray):
             target_axes = target
             if not isinstance(target, AxisCollection):
                 target_axes = AxisCollection(target_axes)
-        if self.axes == target_axes:
+        recipe = self.axes._broadcast_recipe(target_axes)
+        if recipe is None:
             return self
-
-        target_axes = (self.axes - target_axes) | target_axes
-
-        # XXX: this breaks la['1,5,9'] = la['2,7,3']
-        # but that use case should use drop_labels
-        # self.axes.check_compatible(target_axes)
-
-        # 1) reorder axes to target order
-        array = self.transpose(target_axes & self.axes)
-
-        # 2) add length one axes
-        return array.reshape(array.axes.get_all(target_axes))
+        axes_indices, new_axes = recipe
+        return LArray._unchecked(self.data.transpose(axes_indices).reshape(new_axes.shape), new_axes)
 
     # XXX: I wonder if effectively dropping the labels is necessary or not
     # we could perfectly only mark the axis as being a wildcard axis and keep
@@ -2586,7 +3187,7 @@ class LArray(ABCLArray):
         """
         return self.__getitem__(kwargs, collapse)
 
-    def _axis_aggregate(self, op, axes=(), keepaxes=False, out=None, **kwargs):
+    def _axis_aggregate(self, op, axes=(), keepaxes=False, out=None, threads=None, **kwargs):
         """
         Parameters
         ----------
@@ -2598,12 +3199,14 @@ class LArray(ABCLArray):
             Alternative output array in which to place the result. It must have the same shape as the expected output.
         keepaxes : bool or scalar, optional
             If this is set to True, the axes which are reduced are left in the result as dimensions with size one.
+        threads : int, optional
+            Number of threads to use for large arrays. Defaults to None (see set_num_threads).
 
         Returns
         -------
         LArray or scalar
         """
-        src_data = np.asarray(self)
+        src_data = self.data
         axes = self.axes[list(axes)] if axes else self.axes
         axes_indices = tuple(self.axes.index(a) for a in axes) if axes != self.axes else None
         if op.__name__ == 'ptp':
@@ -2616,7 +3219,11 @@ class LArray(ABCLArray):
         if out is not None:
             assert isinstance(out, LArray)
             kwargs['out'] = out.data
-        res_data = op(src_data, axis=axes_indices, **kwargs)
+        res_data = None
+        if axes_indices is not None and not np.isscalar(axes_indices):
+            res_data = _parallel_aggregate(op, src_data, axes_indices, threads, **kwargs)
+        if res_data is None:
+            res_data = op(src_data, axis=axes_indices, **kwargs)
         if keepaxes:
             label = op.__name__.replace('nan', '') if keepaxes is True else keepaxes
             new_axes = [Axis([label], axis.name) for axis in axes]
@@ -2628,7 +3235,7 @@ class LArray(ABCLArray):
             # scalars don't need to be wrapped in LArray
             return res_data
         else:
-            return LArray(res_data, res_axes)
+            return LArray._unchecked(res_data, res_axes)
 
     def _cum_aggregate(self, op, axis):
         """
@@ -2637,15 +3244,12 @@ class LArray(ABCLArray):
         time.
         """
         # TODO: accept a single group in axis, to filter & aggregate in one shot
-        return LArray(op(np.asarray(self), axis=self.axes.index(axis)),
-                      self.axes)
+        return LArray._unchecked(op(self.data, axis=self.axes.index(axis)), self.axes)
 
     # TODO: now that items is never a (k, v), it should be renamed to
     # something else: args? (groups would be misleading because each "item" can contain several groups)
-    # TODO: experiment implementing this using ufunc.reduceat
-    # http://docs.scipy.org/doc/numpy-1.10.0/reference/generated/numpy.ufunc.reduceat.html
     # XXX: rename keepaxes to label=value? For group_aggregates we might want to keep the LGroup label if any
-    def _group_aggregate(self, op, items, keepaxes=False, out=None, **kwargs):
+    def _group_aggregate(self, op, items, keepaxes=False, out=None, threads=None, **kwargs):
         assert out is None
         res = self
         # TODO: when working with several "axes" at the same times, we should not produce the intermediary result at
@@ -2684,40 +3288,43 @@ class LArray(ABCLArray):
             res_data = np.empty(res_shape, dtype=res_dtype)
 
             group_idx = [slice(None) for _ in res_shape]
-            for i, group in enumerate(groups):
-                group_idx[axis_idx] = i
-                # this is only useful for ndim == 1 because a[(0,)] (equivalent to a[0] which kills the axis)
-                # is different from a[[0]] (which does not kill the axis)
-                idx = tuple(group_idx)
-
-                # we need only lists of ticks, not single ticks, otherwise the dimension is discarded too early
-                # (in __getitem__ instead of in the aggregate func)
-                if isinstance(group, IGroup) and np.isscalar(group.key):
-                    group = IGroup([group.key], axis=group.axis)
-                elif isinstance(group, LGroup):
-                    key = _to_key(group.key)
-                    assert not isinstance(key, Group)
-                    if np.isscalar(key):
-                        key = [key]
-                    # we do not care about the name at this point
-                    group = LGroup(key, axis=group.axis)
-
-                arr = res.__getitem__(group, collapse_slices=True)
-                if res_data.ndim == 1:
-                    assert len(idx) == 1 and idx[0] == i
-
-                    # res_data[idx] but instead of returning a scalar (eg np.int32), it returns a 0d array which is a
-                    # view on res_data, which can thus be used as out
-                    out = res_data[i:i + 1].reshape(())
-                else:
-                    out = res_data[idx]
-
-                arr = np.asarray(arr)
-                op(arr, axis=axis_idx, out=out, **kwargs)
-                del arr
+            # when possible, compute all groups at once
+            if not (res._reduceat_group_aggregate(op, axis, axis_idx, groups, res_data, **kwargs) or
+                    res._take_group_aggregate(op, axis, axis_idx, groups, res_data, **kwargs)):
+                for i, group in enumerate(groups):
+                    group_idx[axis_idx] = i
+                    # this is only useful for ndim == 1 because a[(0,)] (equivalent to a[0] which kills the axis)
+                    # is different from a[[0]] (which does not kill the axis)
+                    idx = tuple(group_idx)
+
+                    # we need only lists of ticks, not single ticks, otherwise the dimension is discarded too early
+                    # (in __getitem__ instead of in the aggregate func)
+                    if isinstance(group, IGroup) and np.isscalar(group.key):
+                        group = IGroup([group.key], axis=group.axis)
+                    elif isinstance(group, LGroup):
+                        key = _to_key(group.key)
+                        assert not isinstance(key, Group)
+                        if np.isscalar(key):
+                            key = [key]
+                        # we do not care about the name at this point
+                        group = LGroup(key, axis=group.axis)
+
+                    arr = res.__getitem__(group, collapse_slices=True)
+                    if res_data.ndim == 1:
+                        assert len(idx) == 1 and idx[0] == i
+
+                        # res_data[idx] but instead of returning a scalar (eg np.int32), it returns a 0d array which is
+                        # a view on res_data, which can thus be used as out
+                        out = res_data[i:i + 1].reshape(())
+                    else:
+                        out = res_data[idx]
+
+                    arr = np.asarray(arr)
+                    op(arr, axis=axis_idx, out=out, **kwargs)
+                    del arr
             if killaxis:
-                assert group_idx[axis_idx] == 0
-                res_data = res_data[idx]
+                group_idx[axis_idx] = 0
+                res_data = res_data[tuple(group_idx)]
                 del res_axes[axis_idx]
             else:
                 # We do NOT modify the axis name (eg append "_agg" or "*") even though this creates a new axis that is
@@ -2731,6 +3338,66 @@ class LArray(ABCLArray):
                 res = res_data
         return res
 
+    def _reduceat_group_aggregate(self, op, axis, axis_idx, groups, out, **kwargs):
+        """
+        Computes op on all groups (along axis) at once using ufunc.reduceat and stores the result in out.
+        This is only possible for some operations and if each group has contiguous labels.
+
+        Returns
+        -------
+        bool
+            Whether or not the result could be computed.
+        """
+        if op not in _reduceat_ufuncs or any(v is not None for v in kwargs.values()):
+            return False
+        length = len(axis)
+        bounds = [_group_bounds(axis, g) for g in groups]
+        if any(b is None for b in bounds):
+            return False
+        indices_positions = _reduceat_indices(bounds, length)
+        if indices_positions is None:
+            return False
+        indices, positions = indices_positions
+        res = _reduceat(op, self.data, indices, axis_idx, dtype=out.dtype)
+        if res is None:
+            return False
+        if positions != list(range(len(indices))):
+            res = res.take(positions, axis=axis_idx)
+        out[...] = res
+        return True
+
+    def _take_group_aggregate(self, op, axis, axis_idx, groups, out, **kwargs):
+        """
+        Computes op on all groups (along axis) at once and stores the result in out. The labels of all groups are
+        taken (in the order of the groups) along axis and the result is reduced with a single ufunc.reduceat call.
+        Contrary to _reduceat_group_aggregate, this supports groups which are not made of contiguous labels but
+        copies the data of all groups (labels present in several groups are copied several times).
+
+        Returns
+        -------
+        bool
+            Whether or not the result could be computed.
+        """
+        if op not in _reduceat_ufuncs or any(v is not None for v in kwargs.values()):
+            return False
+        all_positions = np.arange(len(axis))
+        try:
+            groups_positions = [np.atleast_1d(all_positions[axis.index(g)]) for g in groups]
+        except Exception:
+            # let the generic code path handle (and report) invalid groups
+            return False
+        sizes = [len(positions) for positions in groups_positions]
+        # reduceat does not reduce empty ranges
+        if not all(sizes):
+            return False
+        indices = np.cumsum([0] + sizes[:-1])
+        data = self.data.take(np.concatenate(groups_positions), axis=axis_idx)
+        res = _reduceat(op, data, indices, axis_idx, dtype=out.dtype)
+        if res is None:
+            return False
+        out[...] = res
+        return True
+
     def _prepare_aggregate(self, op, args, kwargs=None, commutative=False, stack_depth=1):
         """converts args to keys & LGroup and kwargs to LGroup"""
 
@@ -2815,7 +3482,7 @@ class LArray(ABCLArray):
         return list(to_agg) + [o for o in operations if is_or_contains_group(o)]
 
     def _aggregate(self, op, args, kwargs=None, keepaxes=False, by_agg=False, commutative=False,
-                   out=None, extra_kwargs={}):
+                   out=None, threads=None, extra_kwargs={}):
         operations = self._prepare_aggregate(op, args, kwargs, commutative, stack_depth=3)
         if by_agg and operations != self.axes:
             operations = self._by_args_to_normal_agg_args(operations)
@@ -2824,10 +3491,146 @@ class LArray(ABCLArray):
         # group *consecutive* same-type (group vs axis aggregates) operations
         # we do not change the order of operations since we only group consecutive operations.
         for are_axes, axes in groupby(operations, self.axes.isaxis):
-            func = res._axis_aggregate if are_axes else res._group_aggregate
-            res = func(op, axes, keepaxes=keepaxes, out=out, **extra_kwargs)
+            if are_axes:
+                func = res._axis_aggregate
+            else:
+                func = res._group_aggregate
+                if commutative:
+                    axes = res._sort_group_aggregates(axes)
+            res = func(op, axes, keepaxes=keepaxes, out=out, threads=threads, **extra_kwargs)
         return res
 
+    def _sort_group_aggregates(self, items):
+        """
+        Sorts group aggregates items (see _group_aggregate) so that those reducing their axis the most come first.
+        This keeps intermediate results as small as possible. The order is left unchanged if several items concern
+        the same axis.
+        """
+        items = list(items)
+        axes_idx = []
+        reductions = []
+        for item in items:
+            groups = item if isinstance(item, tuple) else (item,)
+            try:
+                axis_idx = self.axes.index(groups[0].axis)
+            except (KeyError, ValueError):
+                return items
+            axes_idx.append(axis_idx)
+            reductions.append(len(groups) / len(self.axes[axis_idx]))
+        if len(set(axes_idx)) < len(axes_idx):
+            return items
+        # sorted is stable, so items with the same reduction keep their relative order
+        return [item for _, item in sorted(zip(reductions, items), key=lambda r_item: r_item[0])]
+
+    def aggregate_by_mapping(self, mapping, op=sum, labels=None, name=None, skipna=None):
+        """
+        Aggregates the labels of an axis into target labels given by a (many-to-one) mapping.
+
+        Parameters
+        ----------
+        mapping : LArray
+            One dimensional array giving, for each label of one of the axes of the array, the target label it must be
+            aggregated into.
+        op : function, optional
+            Aggregate function. One of `sum`, `prod`, `min`, `max` or `mean`. Defaults to `sum`.
+        labels : array-like, optional
+            Labels of the target axis. Labels which are not used by the mapping get the result of the aggregation of
+            zero values (0 for `sum`, 1 for `prod` and NaN for the other functions). Defaults to the unique values of
+            the mapping, in the order they first appear.
+        name : str, optional
+            Name of the target axis. Defaults to the name of the aggregated axis.
+        skipna : bool, optional
+            Whether or not to exclude NaN (missing) values. Defaults to True.
+
+        Returns
+        -------
+        LArray
+            Array with the axis of the mapping replaced by the target axis.
+
+        Notes
+        -----
+        This is equivalent to (but much faster than) aggregating one group per target label.
+
+        Examples
+        --------
+        >>> arr = ndtest((2, 5))
+        >>> arr
+        a\\b  b0  b1  b2  b3  b4
+         a0   0   1   2   3   4
+         a1   5   6   7   8   9
+        >>> mapping = LArray(['c1', 'c0', 'c1', 'c1', 'c0'], arr.b)
+        >>> arr.aggregate_by_mapping(mapping)
+        a\\b  c1  c0
+         a0   5   5
+         a1  20  15
+        >>> arr.aggregate_by_mapping(mapping, op=max, labels=['c0', 'c1', 'c2'], name='c')
+        a\\c   c0   c1   c2
+         a0  4.0  3.0  nan
+         a1  9.0  8.0  nan
+        """
+        ufuncs = {sum: np.add, prod: np.multiply, min: np.minimum, max: np.maximum, mean: np.add}
+        if op not in ufuncs:
+            raise ValueError("op must be one of sum, prod, min, max or mean")
+        if not isinstance(mapping, LArray) or mapping.ndim != 1:
+            raise ValueError("mapping must be a one dimensional LArray")
+        src_axis = self.axes[mapping.axes[0]]
+        axis_idx = self.axes.index(src_axis)
+        if not mapping.axes[0].equals(src_axis):
+            mapping = mapping[src_axis.labels]
+        if labels is None:
+            labels = unique_list(mapping.data)
+        target_axis = Axis(labels, src_axis.name if name is None else name)
+        codes = target_axis.index(mapping.data)
+
+        data = self.data
+        if skipna is None:
+            skipna = True
+        ufunc = ufuncs[op]
+        isnan = None
+        if skipna and data.dtype.kind in 'fc':
+            isnan = np.isnan(data)
+            if ufunc in (np.minimum, np.maximum):
+                # fmin and fmax ignore NaNs
+                ufunc = np.fmin if ufunc is np.minimum else np.fmax
+            else:
+                data = np.where(isnan, 0 if ufunc is np.add else 1, data)
+
+        # sort source labels by target label so that each target label is a contiguous range of positions
+        order = np.argsort(codes, kind='mergesort')
+        codes = codes[order]
+        if (np.diff(order) != 1).any():
+            data = data.take(order, axis=axis_idx)
+            if isnan is not None:
+                isnan = isnan.take(order, axis=axis_idx)
+        present, starts = np.unique(codes, return_index=True)
+
+        # reduce bool arrays as integers for sum and prod (like np.sum does)
+        dtype = int if ufunc in (np.add, np.multiply) and data.dtype.kind == 'b' else None
+        reduced = ufunc.reduceat(data, starts, axis=axis_idx, dtype=dtype)
+        if op is mean:
+            if isnan is not None:
+                counts = np.add.reduceat(~isnan, starts, axis=axis_idx, dtype=int)
+            else:
+                counts = np.diff(np.append(starts, len(codes)))
+                counts = counts.reshape([-1 if i == axis_idx else 1 for i in range(data.ndim)])
+            reduced = reduced / counts
+
+        if len(present) == len(target_axis):
+            res_data = reduced
+        else:
+            res_shape = list(reduced.shape)
+            res_shape[axis_idx] = len(target_axis)
+            if op in (sum, prod):
+                res_data = np.full(res_shape, 0 if op is sum else 1, dtype=reduced.dtype)
+            else:
+                res_data = np.full(res_shape, np.nan, dtype=common_type((reduced, np.nan)))
+            idx = [slice(None)] * data.ndim
+            idx[axis_idx] = present
+            res_data[tuple(idx)] = reduced
+        res_axes = self.axes[:]
+        res_axes[axis_idx] = target_axis
+        return LArray(res_data, res_axes)
+
     # op=sum does not parse correctly
     def with_total(self, *args, **kwargs):
         """with_total(*args, op='sum', label='total', **kwargs)
@@ -3196,7 +3999,7 @@ class LArray(ABCLArray):
     def copy(self):
         """Returns a copy of the array.
         """
-        return LArray(self.data.copy(), axes=self.axes[:], title=self.title)
+        return LArray._unchecked(self.data.copy(), self.axes[:], self.title)
 
     @property
     def info(self):
@@ -3397,15 +4200,17 @@ class LArray(ABCLArray):
 
     # aggregate method decorator
     def _decorate_agg_method(npfunc, nanfunc=None, commutative=False, by_agg=False, extra_kwargs=[],
-                             long_name='', action_verb='perform'):
+                             long_name='', action_verb='perform', parallel=False):
         def decorated(func):
-            _doc_agg_method(func, by_agg, long_name, action_verb, kwargs=extra_kwargs + ['out', 'skipna', 'keepaxes'])
+            doc_kwargs = extra_kwargs + ['out', 'skipna', 'keepaxes'] + (['threads'] if parallel else [])
+            _doc_agg_method(func, by_agg, long_name, action_verb, kwargs=doc_kwargs)
 
             @functools.wraps(func)
             def wrapper(self, *args, **kwargs):
                 keepaxes = kwargs.pop('keepaxes', _kwarg_agg['keepaxes']['value'])
                 skipna = kwargs.pop('skipna', _kwarg_agg['skipna']['value'])
                 out = kwargs.pop('out', _kwarg_agg['out']['value'])
+                threads = kwargs.pop('threads', _kwarg_agg['threads']['value']) if parallel else None
                 if skipna is None:
                     skipna = nanfunc is not None
                 if skipna and nanfunc is None:
@@ -3415,7 +4220,7 @@ class LArray(ABCLArray):
                 for k in extra_kwargs:
                     _extra_kwargs[k] = kwargs.pop(k, _kwarg_agg[k]['value'])
                 return self._aggregate(_npfunc, args, kwargs, by_agg=by_agg, keepaxes=keepaxes,
-                                       commutative=commutative, out=out, extra_kwargs=_extra_kwargs)
+                                       commutative=commutative, out=out, threads=threads, extra_kwargs=_extra_kwargs)
             return wrapper
         return decorated
 
@@ -3695,7 +4500,7 @@ class LArray(ABCLArray):
 
     # commutative modulo float precision errors
 
-    @_decorate_agg_method(np.sum, np.nansum, commutative=True, extra_kwargs=['dtype'])
+    @_decorate_agg_method(np.sum, np.nansum, commutative=True, extra_kwargs=['dtype'], parallel=True)
     def sum(self, *args, **kwargs):
         """{signature}
         Computes the sum of array elements along given axes/groups.
@@ -3759,7 +4564,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.sum, np.nansum, commutative=True, by_agg=True, extra_kwargs=['dtype'], long_name="sum")
+    @_decorate_agg_method(np.sum, np.nansum, commutative=True, by_agg=True, extra_kwargs=['dtype'], long_name="sum",
+                          parallel=True)
     def sum_by(self, *args, **kwargs):
         """{signature}
         Computes the sum of array elements for the given axes/groups.
@@ -3821,7 +4627,8 @@ class LArray(ABCLArray):
         pass
 
     # nanprod needs numpy 1.10
-    @_decorate_agg_method(np.prod, np_nanprod, commutative=True, extra_kwargs=['dtype'], long_name="product")
+    @_decorate_agg_method(np.prod, np_nanprod, commutative=True, extra_kwargs=['dtype'], long_name="product",
+                          parallel=True)
     def prod(self, *args, **kwargs):
         """{signature}
         Computes the product of array elements along given axes/groups.
@@ -3886,7 +4693,7 @@ class LArray(ABCLArray):
         pass
 
     @_decorate_agg_method(np.prod, np_nanprod, commutative=True, by_agg=True, extra_kwargs=['dtype'],
-                          long_name="product")
+                          long_name="product", parallel=True)
     def prod_by(self, *args, **kwargs):
         """{signature}
         Computes the product of array elements for the given axes/groups.
@@ -3947,7 +4754,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.min, np.nanmin, commutative=True, long_name="minimum", action_verb="search")
+    @_decorate_agg_method(np.min, np.nanmin, commutative=True, long_name="minimum", action_verb="search",
+                          parallel=True)
     def min(self, *args, **kwargs):
         """{signature}
         Get minimum of array elements along given axes/groups.
@@ -4010,7 +4818,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.min, np.nanmin, commutative=True, by_agg=True, long_name="minimum", action_verb="search")
+    @_decorate_agg_method(np.min, np.nanmin, commutative=True, by_agg=True, long_name="minimum", action_verb="search",
+                          parallel=True)
     def min_by(self, *args, **kwargs):
         """{signature}
         Get minimum of array elements for the given axes/groups.
@@ -4070,7 +4879,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.max, np.nanmax, commutative=True, long_name="maximum", action_verb="search")
+    @_decorate_agg_method(np.max, np.nanmax, commutative=True, long_name="maximum", action_verb="search",
+                          parallel=True)
     def max(self, *args, **kwargs):
         """{signature}
         Get maximum of array elements along given axes/groups.
@@ -4133,7 +4943,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.max, np.nanmax, commutative=True, by_agg=True, long_name="maximum", action_verb="search")
+    @_decorate_agg_method(np.max, np.nanmax, commutative=True, by_agg=True, long_name="maximum", action_verb="search",
+                          parallel=True)
     def max_by(self, *args, **kwargs):
         """{signature}
         Get maximum of array elements for the given axes/groups.
@@ -4193,7 +5004,7 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.mean, np.nanmean, commutative=True, extra_kwargs=['dtype'])
+    @_decorate_agg_method(np.mean, np.nanmean, commutative=True, extra_kwargs=['dtype'], parallel=True)
     def mean(self, *args, **kwargs):
         """{signature}
         Computes the arithmetic mean.
@@ -4258,7 +5069,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.mean, np.nanmean, commutative=True, by_agg=True, extra_kwargs=['dtype'], long_name="mean")
+    @_decorate_agg_method(np.mean, np.nanmean, commutative=True, by_agg=True, extra_kwargs=['dtype'], long_name="mean",
+                          parallel=True)
     def mean_by(self, *args, **kwargs):
         """{signature}
         Computes the arithmetic mean.
@@ -4695,7 +5507,7 @@ class LArray(ABCLArray):
 
     _doc_agg_method(ptp, False, kwargs=['out'])
 
-    @_decorate_agg_method(np.var, np.nanvar, extra_kwargs=['dtype', 'ddof'], long_name="variance")
+    @_decorate_agg_method(np.var, np.nanvar, extra_kwargs=['dtype', 'ddof'], long_name="variance", parallel=True)
     def var(self, *args, **kwargs):
         """{signature}
         Computes the unbiased variance.
@@ -4758,7 +5570,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.var, np.nanvar, by_agg=True, extra_kwargs=['dtype', 'ddof'], long_name="variance")
+    @_decorate_agg_method(np.var, np.nanvar, by_agg=True, extra_kwargs=['dtype', 'ddof'], long_name="variance",
+                          parallel=True)
     def var_by(self, *args, **kwargs):
         """{signature}
         Computes the unbiased variance.
@@ -4821,7 +5634,8 @@ class LArray(ABCLArray):
         """
         pass
 
-    @_decorate_agg_method(np.std, np.nanstd, extra_kwargs=['dtype', 'ddof'], long_name="standard deviation")
+    @_decorate_agg_method(np.std, np.nanstd, extra_kwargs=['dtype', 'ddof'], long_name="standard deviation",
+                          parallel=True)
     def std(self, *args, **kwargs):
         """{signature}
         Computes the sample standard deviation.
@@ -4885,7 +5699,7 @@ class LArray(ABCLArray):
         pass
 
     @_decorate_agg_method(np.std, np.nanstd, by_agg=True, extra_kwargs=['dtype', 'ddof'],
-                          long_name="standard deviation")
+                          long_name="standard deviation", parallel=True)
     def std_by(self, *args, **kwargs):
         """{signature}
         Computes the sample standard deviation.
@@ -5053,6 +5867,8 @@ class LArray(ABCLArray):
         def opmethod(self, other):
             res_axes = self.axes
 
+            if isinstance(other, LazyExpr):
+                return LazyBinaryOp(opname, self, other)
             if isinstance(other, ExprNode):
                 other = other.evaluate(self.axes)
 
@@ -5063,11 +5879,14 @@ class LArray(ABCLArray):
             if not isinstance(other, (LArray, np.ndarray)) and not np.isscalar(other):
                 other = aslarray(other)
 
+            self_data = self.data
             if isinstance(other, LArray):
-                # TODO: first test if it is not already broadcastable
-                (self, other), res_axes = make_numpy_broadcastable([self, other])
-                other = other.data
-            return LArray(super_method(self.data, other), res_axes)
+                (self_data, other), res_axes = _broadcast_data([self, other])
+            res_data = super_method(self_data, other)
+            # operations on 0-d arrays return numpy scalars
+            if not isinstance(res_data, np.ndarray):
+                return LArray(res_data, res_axes)
+            return LArray._unchecked(res_data, res_axes)
         opmethod.__name__ = fullname
         return opmethod
 
@@ -5107,6 +5926,53 @@ class LArray(ABCLArray):
     __or__ = _binop('or')
     __ror__ = _binop('ror')
 
+    # in-place element-wise method factory
+    def _binop_inplace(opname):
+        fullname = '__i%s__' % opname
+        super_method = getattr(np.ndarray, fullname)
+        fallback_name = '__%s__' % opname
+
+        def opmethod(self, other):
+            if isinstance(other, ExprNode):
+                other = other.evaluate(self.axes)
+            if not isinstance(other, (LArray, np.ndarray)) and not np.isscalar(other):
+                other = aslarray(other)
+
+            if isinstance(other, LArray):
+                (_, other_data), res_axes = _broadcast_data([self, other])
+                if len(res_axes) != self.ndim:
+                    raise ValueError("cannot do an in-place operation with an array having extra axes: {}"
+                                     .format(res_axes - self.axes))
+            else:
+                other_data = other
+            # when the result cannot be stored in the current dtype (e.g. int_array += 1.5 or int_array /= 2), we
+            # return a new array, like Python does for types without in-place operators
+            if np.result_type(self.data, other_data) != self.dtype:
+                return getattr(self, fallback_name)(other)
+            try:
+                super_method(self.data, other_data)
+            except TypeError:
+                # numpy checks casting before computing anything, so self.data is left untouched
+                return getattr(self, fallback_name)(other)
+            return self
+        opmethod.__name__ = fullname
+        return opmethod
+
+    __iadd__ = _binop_inplace('add')
+    __isub__ = _binop_inplace('sub')
+    __imul__ = _binop_inplace('mul')
+    if sys.version < '3':
+        __idiv__ = _binop_inplace('div')
+    __itruediv__ = _binop_inplace('truediv')
+    __ifloordiv__ = _binop_inplace('floordiv')
+    __imod__ = _binop_inplace('mod')
+    __ipow__ = _binop_inplace('pow')
+    __ilshift__ = _binop_inplace('lshift')
+    __irshift__ = _binop_inplace('rshift')
+    __iand__ = _binop_inplace('and')
+    __ixor__ = _binop_inplace('xor')
+    __ior__ = _binop_inplace('or')
+
     def __matmul__(self, other):
         """
         Overrides operator @ for matrix multiplication.
@@ -5202,7 +6068,11 @@ class LArray(ABCLArray):
         super_method = getattr(np.ndarray, fullname)
 
         def opmethod(self):
-            return LArray(super_method(self.data), self.axes)
+            res_data = super_method(self.data)
+            # operations on 0-d arrays return numpy scalars
+            if not isinstance(res_data, np.ndarray):
+                return LArray(res_data, self.axes)
+            return LArray._unchecked(res_data, self.axes)
         opmethod.__name__ = fullname
         return opmethod
 
@@ -5851,7 +6721,8 @@ class LArray(ABCLArray):
         indices_present = set(axes_indices)
         missing_indices = [i for i in range(len(self.axes)) if i not in indices_present]
         axes_indices = axes_indices + missing_indices
-        return LArray(self.data.transpose(axes_indices), self.axes[axes_indices])
+        res_axes = AxisCollection._unchecked([self.axes[i] for i in axes_indices])
+        return LArray._unchecked(self.data.transpose(axes_indices), res_axes)
     T = property(transpose)
 
     def clip(self, a_min, a_max, out=None):
@@ -8053,14 +8924,6 @@ def get_axes(value):
     return value.axes if isinstance(value, LArray) else AxisCollection([])
 
 
-def _strip_shape(shape):
-    return tuple(s for s in shape if s != 1)
-
-
-def _equal_modulo_len1(shape1, shape2):
-    return _strip_shape(shape1) == _strip_shape(shape2)
-
-
 # assigning a temporary name to anonymous axes before broadcasting and removing it afterwards is not a good idea after
 # all because it copies the axes/change the object, and thus "flatten" wouldn't work with index axes:
 # a[ones(a.axes[axes], dtype=bool)]
@@ -8092,9 +8955,183 @@ def make_numpy_broadcastable(values):
     --------
     Axis.iscompatible : tests if axes are compatible between them.
     """
-    all_axes = AxisCollection.union(*[get_axes(v) for v in values])
-    return [v.broadcast_with(all_axes) if isinstance(v, LArray) else v
-            for v in values], all_axes
+    all_axes, recipes = _broadcast_plan(values)
+    return [LArray(v.data.transpose(recipe[0]).reshape(recipe[1].shape), recipe[1]) if recipe is not None
+            else v
+            for v, recipe in zip(values, recipes)], all_axes
+
+
+# maps the axes of the operands of an operation to the axes of the result and how to broadcast each operand
+_broadcast_plans = LRUCache(128)
+
+
+def set_broadcast_cache_size(maxsize):
+    """
+    Sets the maximum number of broadcast plans kept in cache.
+
+    Operations between arrays (and functions like `maximum` or `where`) cache how to combine the axes of their
+    operands (the axes of the result and how to transpose and reshape the data of each operand), so that repeating an
+    operation between arrays with the same axes does not need to compute it again. Plans only depend on the names and
+    labels of the axes (they do not keep the axes themselves alive).
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of plans. 0 disables the cache. Defaults to 128.
+
+    Returns
+    -------
+    int
+        Previous maximum number of plans.
+
+    See Also
+    --------
+    clear_broadcast_cache
+
+    Examples
+    --------
+    >>> previous = set_broadcast_cache_size(1000)
+    >>> set_broadcast_cache_size(previous)
+    1000
+    """
+    previous = _broadcast_plans.maxsize
+    _broadcast_plans.resize(maxsize)
+    return previous
+
+
+def clear_broadcast_cache():
+    """
+    Removes all broadcast plans from the cache.
+
+    See Also
+    --------
+    set_broadcast_cache_size
+
+    Examples
+    --------
+    >>> clear_broadcast_cache()
+    """
+    _broadcast_plans.clear()
+
+
+def _broadcast_plan(values):
+    """
+    Returns the combined axes of values and a broadcast recipe (see AxisCollection._broadcast_recipe) for each value.
+
+    Plans are cached using the name and fingerprint of the axes of the LArrays in values as key, so that operations
+    between arrays with equal axes share their plan, even if their axes are different objects. Cached plans do not
+    reference the axes of values: each axis is stored as the position of the value and of the axis in that value it
+    comes from and is taken from the current values when the plan is used. Axes whose labels are replaced (in place)
+    get a new key because their fingerprint is reset. Axes whose fingerprint does not imply equal labels (float and
+    object labels) are not cached.
+    """
+    key = _broadcast_plan_key(values) if _broadcast_plans.maxsize > 0 else None
+    plan = _broadcast_plans.get(key) if key is not None else None
+    if plan is None:
+        all_axes = AxisCollection.union(*[get_axes(v) for v in values])
+        recipes = [v.axes._broadcast_recipe(all_axes) if isinstance(v, LArray) else None for v in values]
+        if key is None:
+            return all_axes, recipes
+        # (value position, axis position) of each axis of values
+        axes_refs = {id(axis): (i, j) for i, v in reversed(list(enumerate(values))) if isinstance(v, LArray)
+                     for j, axis in enumerate(v.axes)}
+
+        # axes which do not come from any value (length 1 axes added to broadcast values) are stored (and shared
+        # between the results of the plan) as-is
+        def refs(axes):
+            return [axes_refs.get(id(axis), axis) for axis in axes]
+
+        plan = refs(all_axes), [(recipe[0], refs(recipe[1])) if recipe is not None else None for recipe in recipes]
+        _broadcast_plans[key] = plan
+
+    def axes_from_refs(refs):
+        return AxisCollection._unchecked([values[ref[0]].axes._list[ref[1]] if isinstance(ref, tuple) else ref
+                                          for ref in refs])
+
+    all_axes_refs, recipes_refs = plan
+    return axes_from_refs(all_axes_refs), [(recipe[0], axes_from_refs(recipe[1])) if recipe is not None else None
+                                           for recipe in recipes_refs]
+
+
+def _broadcast_plan_key(values):
+    """
+    Returns the key of the broadcast plan of values or None if the plan of values cannot be cached.
+    """
+    key = []
+    for v in values:
+        if isinstance(v, LArray):
+            axes_key = []
+            for axis in v.axes:
+                fingerprint = axis._fingerprint
+                # fingerprints which are not exact do not imply equal labels
+                if not fingerprint[2]:
+                    return None
+                axes_key.append((axis.name, axis._iswildcard, fingerprint))
+            key.append(tuple(axes_key))
+        else:
+            key.append(None)
+    return tuple(key)
+
+
+def _ufunc_call(ufunc, inputs, kwargs):
+    """
+    Calls ufunc with the raw data of inputs (and of the out and where keyword arguments) broadcasted by axis name.
+    """
+    outs = kwargs.get('out', ())
+    where = kwargs.get('where', True)
+    extra = list(outs) + ([where] if isinstance(where, LArray) else [])
+    # out arrays come first so that the other values are transposed to the order of their axes
+    raw_values, res_axes = _broadcast_data(extra + list(inputs))
+    for out in outs:
+        if isinstance(out, LArray) and out.ndim != len(res_axes):
+            raise ValueError("out array is missing axes {} of the result".format(res_axes - out.axes))
+    if outs:
+        kwargs['out'] = tuple(raw_values[:len(outs)])
+    if isinstance(where, LArray):
+        kwargs['where'] = raw_values[len(outs)]
+    res = ufunc(*raw_values[len(extra):], **kwargs)
+    if outs:
+        return outs[0] if len(outs) == 1 else outs
+
+    def wrap(res_data):
+        return LArray(res_data, res_axes.copy()) if res_axes else res_data
+
+    return tuple(wrap(r) for r in res) if isinstance(res, tuple) else wrap(res)
+
+
+def _ufunc_reduce_out(ufunc, method, raw_inputs, kwargs, res_axes=None):
+    """
+    Calls ufunc.method (reduce, accumulate or outer) with raw_inputs. If an out LArray is given, it must have
+    res_axes.
+    """
+    out = kwargs.get('out', ())
+    out = out[0] if out else None
+    if isinstance(out, LArray):
+        if res_axes is not None and not out.axes == res_axes:
+            out = out.transpose(res_axes)
+        kwargs['out'] = (out.data,)
+    res = getattr(ufunc, method)(*raw_inputs, **kwargs)
+    if out is not None:
+        return out
+    return LArray(res, res_axes) if res_axes else res
+
+
+def _broadcast_data(values):
+    """
+    Same as make_numpy_broadcastable but returns the raw (numpy) data of LArrays instead of LArrays.
+
+    Returns
+    -------
+    list
+        values where LArrays are replaced by numpy arrays broadcastable between them.
+    AxisCollection
+        Collection of axes of all input arrays.
+    """
+    all_axes, recipes = _broadcast_plan(values)
+    return [v.data.transpose(recipe[0]).reshape(recipe[1].shape) if recipe is not None
+            else v.data if isinstance(v, LArray)
+            else v
+            for v, recipe in zip(values, recipes)], all_axes
 
 
 _default_float_error_handler = float_error_handler_factory(3)
@@ -1,6 +1,7 @@
 # -*- coding: utf8 -*-
 from __future__ import absolute_import, division, print_function
 
+import hashlib
 import re
 import sys
 import warnings
@@ -11,12 +12,104 @@ import numpy as np
 from larray.core.abstractbases import ABCAxis, ABCAxisReference, ABCLArray
 from larray.core.expr import ExprNode
 from larray.core.group import (Group, LGroup, IGroup, IGroupMaker, _to_tick, _to_ticks, _to_key, _seq_summary,
-                               _contain_group_ticks, _seq_group_to_name)
+                               _contain_group_ticks, _seq_group_to_name, _range_to_slice)
 from larray.util.oset import *
-from larray.util.misc import (basestring, PY2, unicode, long, duplicates, array_lookup2, ReprString, index_by_id,
-                              renamed_to, common_type)
+from larray.util.misc import (basestring, PY2, unicode, long, duplicates, lookup_engines, ReprString, index_by_id,
+                              renamed_to, common_type, LRUCache, CacheInfo, size2str)
 
-__all__ = ['Axis', 'AxisCollection', 'X', 'x']
+__all__ = ['Axis', 'AxisCollection', 'AxisPool', 'PreparedKey', 'X', 'x']
+
+
+# strings matching this pattern are not (necessarily) interpreted as a single label by Axis.index (see _to_key)
+_key_syntax_pattern = re.compile(r'[,:\[{]|\.\.|>>|^\s|\s$|^$')
+
+
+def _int_progression(labels):
+    """
+    Returns (start, step) if labels is a 1D array of integers forming an arithmetic progression, None otherwise.
+
+    Examples
+    --------
+    >>> _int_progression(np.array([2007, 2008, 2009]))
+    (2007, 1)
+    >>> _int_progression(np.array([10, 5, 0]))
+    (10, -5)
+    >>> _int_progression(np.array([0, 1, 3])) is None
+    True
+    """
+    if labels.ndim != 1 or labels.dtype.kind != 'i' or not len(labels):
+        return None
+    start = int(labels[0])
+    if len(labels) == 1:
+        return start, 1
+    step = int(labels[1]) - start
+    if step == 0 or not np.all(np.diff(labels) == step):
+        return None
+    return start, step
+
+
+class _RangeMapping(object):
+    """
+    Dict-like label -> position mapping for axes with integer progression labels (and wildcard axes). Positions are
+    computed arithmetically instead of being stored.
+
+    Examples
+    --------
+    >>> mapping = _RangeMapping(1991, 1, 110)
+    >>> mapping[2015]
+    24
+    >>> 2200 in mapping
+    False
+    >>> mapping.positions(np.array([1991, 2015]))
+    array([ 0, 24])
+    """
+    __slots__ = ('start', 'step', 'length')
+
+    def __init__(self, start, step, length):
+        self.start = start
+        self.step = step
+        self.length = length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, label):
+        # behave like a dict {label: position}: any number which compares equal to a label (including bools and
+        # integral floats) matches it
+        if not isinstance(label, (int, long, float, np.integer, np.floating, np.bool_)):
+            raise KeyError(label)
+        pos, rem = divmod(label - self.start, self.step)
+        if rem or not 0 <= pos < self.length:
+            raise KeyError(label)
+        return int(pos)
+
+    def __contains__(self, label):
+        try:
+            self[label]
+            return True
+        except KeyError:
+            return False
+
+    def positions(self, labels):
+        """
+        Vectorized version of __getitem__ for an ndarray of integer labels.
+        """
+        labels = np.asarray(labels)
+        # an empty key (which np.asarray makes a float array) selects nothing
+        if labels.size == 0:
+            return np.zeros(labels.shape, dtype=np.intp)
+        # prevent an array of booleans or floats from matching (like array_lookup2 does)
+        if labels.dtype.kind != 'i':
+            raise KeyError('key has not the same dtype than axis')
+        # computing in the dtype of the key could overflow for narrow integer types (e.g. int8)
+        pos = labels.astype(np.intp) - self.start
+        if self.step != 1:
+            if np.remainder(pos, self.step).any():
+                raise KeyError('all keys not in array')
+            pos //= self.step
+        if pos.size and (pos.min() < 0 or pos.max() >= self.length):
+            raise KeyError('all keys not in array')
+        return pos
 
 
 class Axis(ABCAxis):
@@ -75,6 +168,22 @@ class Axis(ABCAxis):
     >>> anonymous
     Axis([0, 1, 2, 3, 4], None)
     """
+    # maximum number of sequences/arrays of labels whose translation is cached (see index_cache_info)
+    index_cache_size = 32
+    # incremented each time the labels of an axis whose mapping was computed are replaced, which invalidates the label
+    # index of all collections (see AxisCollection._get_label_index)
+    _labels_generation = 0
+    # shorter keys are not cached because translating them costs less than looking them up in the cache, and longer
+    # keys are not cached to bound memory usage
+    _index_cache_min_key_size = 64
+    _index_cache_max_key_size = 10000
+    # longer range axes translate labels arithmetically instead of building a dict {label: position}
+    _range_dict_max_length = 1000
+    # shorter sequences of labels are translated label by label on range axes (converting them to an array first
+    # costs more than the lookups, especially when they are done in a dict)
+    _range_vectorize_min_key_size = 8
+    _range_dict_vectorize_min_key_size = 64
+
     # ticks instead of labels?
     def __init__(self, labels, name=None):
         if isinstance(labels, Group) and name is None:
@@ -97,20 +206,48 @@ class Axis(ABCAxis):
         self.name = name
         self._labels = None
         self.__mapping = None
-        self.__sorted_keys = None
-        self.__sorted_values = None
+        self.__lookup = None
+        self.__index_cache = None
+        self.__fingerprint = None
+        self._lookup_engine = 'hash'
         self._length = None
         self._iswildcard = False
+        self.__range = None
         self.labels = labels
 
+    @property
+    def _range(self):
+        # (start, step) if labels are an integer progression (this includes wildcard axes), None otherwise. Integer
+        # labels given as an array are only checked on first use so that creating an axis stays cheap.
+        rng = self.__range
+        if rng is False:
+            rng = _int_progression(self._labels)
+            self.__range = rng
+        return rng
+
+    @_range.setter
+    def _range(self, rng):
+        self.__range = rng
+
+    @property
+    def _range_mapping(self):
+        # vectorized (arithmetic) mapping of range axes
+        start, step = self._range
+        return _RangeMapping(start, step, self._length)
+
     @property
     def _mapping(self):
         # To map labels with their positions
         mapping = self.__mapping
         if mapping is None:
-            labels = self._labels
-            # TODO: this would be more efficient for wildcard axes but does not work in all cases
-            # mapping = labels
+            if self._length > self._range_dict_max_length and self._range is not None:
+                # labels are a long integer progression (this includes wildcard axes) => positions can be computed
+                # arithmetically, there is no need to build (nor to store) a dict. Short progressions still use a
+                # dict because looking labels up in it one by one is faster.
+                mapping = self._range_mapping
+                self.__mapping = mapping
+                return mapping
+            labels = self.labels
             mapping = {label: i for i, label in enumerate(labels)}
             if not self._iswildcard:
                 # we have no choice but to do that, otherwise we could not make geo['Brussels'] work efficiently
@@ -121,29 +258,39 @@ class Axis(ABCAxis):
             self.__mapping = mapping
         return mapping
 
-    def _update_key_values(self):
-        mapping = self._mapping
-        if mapping:
-            sorted_keys, sorted_values = tuple(zip(*sorted(mapping.items())))
-        else:
-            sorted_keys, sorted_values = (), ()
-        keys, values = np.array(sorted_keys), np.array(sorted_values)
-        self.__sorted_keys = keys
-        self.__sorted_values = values
-        return keys, values
-
     @property
-    def _sorted_keys(self):
-        if self.__sorted_keys is None:
-            keys, _ = self._update_key_values()
-        return self.__sorted_keys
+    def lookup_engine(self):
+        """
+        Name of the engine used to translate arrays of labels to positions: 'hash' (hash table, the default) or
+        'sorted' (binary search in the sorted labels). Axes with integer progression labels do not use any engine as
+        they translate labels arithmetically.
+
+        Examples
+        --------
+        >>> sex = Axis('sex=M,F')
+        >>> sex.lookup_engine
+        'hash'
+        >>> sex.lookup_engine = 'sorted'
+        >>> sex.index(np.array(['F', 'M']))
+        array([1, 0])
+        """
+        return self._lookup_engine
+
+    @lookup_engine.setter
+    def lookup_engine(self, engine):
+        if engine not in lookup_engines:
+            raise ValueError("invalid lookup engine %r (valid engines are: %s)"
+                             % (engine, ', '.join(sorted(lookup_engines))))
+        self._lookup_engine = engine
+        self.__lookup = None
 
     @property
-    def _sorted_values(self):
-        values = self.__sorted_values
-        if values is None:
-            _, values = self._update_key_values()
-        return values
+    def _lookup(self):
+        lookup = self.__lookup
+        if lookup is None:
+            lookup = lookup_engines[self._lookup_engine](self._mapping)
+            self.__lookup = lookup
+        return lookup
 
     @property
     def i(self):
@@ -173,23 +320,36 @@ class Axis(ABCAxis):
         """
         labels of the axis.
         """
-        return self._labels
+        labels = self._labels
+        if labels is None and self._range is not None:
+            # labels of range axes are only materialized when they are actually needed
+            start, step = self._range
+            labels = np.arange(start, start + step * self._length, step)
+            self._labels = labels
+        return labels
 
     @labels.setter
     def labels(self, labels):
         if labels is None:
             raise TypeError("labels should be a sequence or a single int")
+        rng = None
         if isinstance(labels, (int, long)):
             length = labels
-            labels = np.arange(length)
+            labels = None
+            rng = (0, 1)
             iswildcard = True
         else:
+            # range objects (given directly or resulting from a "range string" like '0..115') are kept as such
+            ticks = labels if not PY2 and isinstance(labels, range) else _to_ticks(labels, parse_single_int=True)
+            if not PY2 and isinstance(ticks, range):
+                length = len(ticks)
+                labels = None
+                rng = (ticks.start, ticks.step)
             # TODO: move this to _to_ticks????
             # we convert to an ndarray to save memory for scalar ticks (for
             # LGroup ticks, it does not make a difference since a list of LGroup
             # and an ndarray of LGroup are both arrays of pointers)
-            ticks = _to_ticks(labels, parse_single_int=True)
-            if _contain_group_ticks(ticks):
+            elif _contain_group_ticks(ticks):
                 # avoid getting a 2d array if all LGroup have the same length
                 labels = np.empty(len(ticks), dtype=object)
                 # this does not work if some values have a length (with a valid __len__) and others not
@@ -198,12 +358,27 @@ class Axis(ABCAxis):
                     labels[i] = tick
             else:
                 labels = np.asarray(ticks)
-            length = len(labels)
+                # integer labels could form a progression, but this is only checked when needed (see _range)
+                if labels.ndim == 1 and labels.dtype.kind == 'i':
+                    rng = False
+            if labels is not None:
+                length = len(labels)
             iswildcard = False
 
+        if rng and length <= 1:
+            # normalize degenerate ranges so that they compare equal
+            rng = (rng[0] if length else 0, 1)
         self._length = length
         self._labels = labels
         self._iswildcard = iswildcard
+        self.__range = rng
+        # invalidate caches computed from the previous labels
+        if self.__mapping is not None:
+            Axis._labels_generation += 1
+        self.__mapping = None
+        self.__lookup = None
+        self.__index_cache = None
+        self.__fingerprint = None
 
     def by(self, length, step=None):
         """Split axis into several groups of specified length.
@@ -479,9 +654,13 @@ class Axis(ABCAxis):
             name = self.name
         if isinstance(key, ABCLArray):
             return tuple(key.axes)
-        # TODO: compute length for wildcard axes more efficiently
-        labels = len(self.labels[key]) if self.iswildcard else self.labels[key]
-        return Axis(labels, name)
+        if not PY2 and isinstance(key, slice) and self._range is not None:
+            # slicing a range gives a range, so the subaxis is a range axis too and its labels need not be computed
+            start, step = self._range
+            labels = range(start, start + step * self._length, step)[key]
+        else:
+            labels = self.labels[key]
+        return Axis(len(labels) if self.iswildcard else labels, name)
 
     def iscompatible(self, other):
         """
@@ -528,7 +707,7 @@ class Axis(ABCAxis):
             # wildcard axes of length > 1 match with equal len or len 1
             return len(self) == 1 or len(other) == 1 or len(self) == len(other)
         else:
-            return np.array_equal(self.labels, other.labels)
+            return self._labels_equal(other)
 
     def equals(self, other):
         """
@@ -563,7 +742,55 @@ class Axis(ABCAxis):
 
         # this might need to change if we ever support wildcard axes with real labels
         return isinstance(other, Axis) and self.name == other.name and self.iswildcard == other.iswildcard and \
-               (len(self) == len(other) if self.iswildcard else np.array_equal(self.labels, other.labels))
+               (len(self) == len(other) if self.iswildcard else self._labels_equal(other))
+
+    def _labels_equal(self, other):
+        # range axes can be compared without materializing their labels
+        if self._range is not None and other._range is not None:
+            return self._range == other._range and self._length == other._length
+        # axis references do not have labels
+        if isinstance(self, ABCAxisReference) or isinstance(other, ABCAxisReference):
+            return np.array_equal(self.labels, other.labels)
+        if len(self) != len(other):
+            return False
+        dtype, digest, exact = self._fingerprint
+        other_dtype, other_digest, _ = other._fingerprint
+        # labels with a different dtype can still be equal (e.g. int and float or strings of different max length)
+        if dtype == other_dtype and digest is not None and other_digest is not None:
+            if digest != other_digest:
+                return False
+            if exact:
+                return True
+        return np.array_equal(self.labels, other.labels)
+
+    @property
+    def _fingerprint(self):
+        """
+        (dtype, digest, exact) tuple summarizing the labels of the axis. It is computed once and reset when labels
+        change. For dtypes which can be compared bytewise (integers, booleans and strings), equal digests imply equal
+        labels. For other dtypes (float, object) the digest is a mere hash, and equal digests require a full
+        comparison. digest is None when the labels cannot be hashed. Range axes are summarized by their start, step
+        and length so that their labels are not materialized.
+        """
+        fingerprint = self.__fingerprint
+        if fingerprint is None and self._range is not None:
+            fingerprint = ('range', self._range + (self._length,), True)
+            self.__fingerprint = fingerprint
+        elif fingerprint is None:
+            labels = self.labels
+            dtype = labels.dtype
+            if dtype.kind in 'biuSU':
+                digest = hashlib.sha1(np.ascontiguousarray(labels).tobytes()).digest()
+                exact = True
+            else:
+                try:
+                    digest = hash(tuple(labels.tolist()))
+                except TypeError:
+                    digest = None
+                exact = False
+            fingerprint = (dtype.str, digest, exact)
+            self.__fingerprint = fingerprint
+        return fingerprint
 
     def matching(self, pattern):
         """
@@ -732,7 +959,8 @@ class Axis(ABCAxis):
 
     def _is_key_type_compatible(self, key):
         key_kind = np.dtype(type(key)).kind
-        label_kind = self.labels.dtype.kind
+        # avoid materializing the labels of range axes just to get their kind
+        label_kind = 'i' if self._labels is None else self._labels.dtype.kind
         # on Python2, ascii-only unicode string can match byte strings (and vice versa), so we shouldn't be more picky
         # here than dict hashing
         str_key = key_kind in ('S', 'U')
@@ -823,31 +1051,22 @@ class Axis(ABCAxis):
         elif isinstance(key, np.ndarray) and key.dtype.kind is 'b' and bool_passthrough:
             return key
         elif isinstance(key, (tuple, list, OrderedSet)):
-            # TODO: the result should be cached
-            # Note that this is faster than array_lookup(np.array(key), mapping)
-            res = np.empty(len(key), int)
-            try:
-                for i, label in enumerate(_seq_group_to_name(key)):
-                    res[i] = mapping[label]
-            except KeyError:
-                for i, label in enumerate(key):
-                    res[i] = mapping[label]
-            return res
+            # for range axes, translating a long list at once is faster than label by label
+            min_size = self._range_dict_vectorize_min_key_size if isinstance(mapping, dict) else \
+                self._range_vectorize_min_key_size
+            if len(key) >= min_size and self._range is not None:
+                array_key = np.asarray(_seq_group_to_name(key))
+                if array_key.dtype.kind == 'i':
+                    return self._range_mapping.positions(array_key)
+            if len(key) < self._index_cache_min_key_size:
+                return self._seq_index(key)
+            return self._cached_index(key, self._seq_index)
         elif isinstance(key, np.ndarray):
             # handle fancy indexing with a ndarray of labels
-            # TODO: the result should be cached
-            # TODO: benchmark this against the tuple/list version above when mapping is large
-            # array_lookup is O(len(key) * log(len(mapping)))
-            # vs
-            # tuple/list version is O(len(key)) (dict.getitem is O(1))
-            # XXX: we might want to special case dtype bool, because in that case the mapping will in most case be
-            # {False: 0, True: 1} or {False: 1, True: 0} and in those case key.astype(int) and (~key).astype(int)
-            # are MUCH faster
-            # see C:\Users\gdm\devel\lookup_methods.py and C:\Users\gdm\Desktop\lookup_methods.html
-            try:
-                return array_lookup2(_seq_group_to_name(key), self._sorted_keys, self._sorted_values)
-            except KeyError:
-                return array_lookup2(key, self._sorted_keys, self._sorted_values)
+            if self._range is not None:
+                # this is O(len(key)) and does not need any lookup engine
+                return self._range_mapping.positions(key)
+            return self._cached_index(key, self._array_index)
         elif isinstance(key, ABCLArray):
             from .array import LArray
             return LArray(self.index(key.data), key.axes)
@@ -864,6 +1083,95 @@ class Axis(ABCAxis):
 
     translate = renamed_to(index, 'translate')
 
+    def _seq_index(self, key):
+        mapping = self._mapping
+        # Note that this is faster than array_lookup(np.array(key), mapping)
+        res = np.empty(len(key), int)
+        try:
+            for i, label in enumerate(_seq_group_to_name(key)):
+                res[i] = mapping[label]
+        except KeyError:
+            for i, label in enumerate(key):
+                res[i] = mapping[label]
+        return res
+
+    def _array_index(self, key):
+        # XXX: we might want to special case dtype bool, because in that case the mapping will in most case be
+        # {False: 0, True: 1} or {False: 1, True: 0} and in those case key.astype(int) and (~key).astype(int)
+        # are MUCH faster
+        # see C:\Users\gdm\devel\lookup_methods.py and C:\Users\gdm\Desktop\lookup_methods.html
+        lookup = self._lookup
+        try:
+            return lookup(_seq_group_to_name(key))
+        except KeyError:
+            return lookup(key)
+
+    def _cached_index(self, key, translate):
+        """
+        Translates key (a sequence or an array of labels) using translate, going through the index cache.
+        """
+        if self.index_cache_size <= 0:
+            return translate(key)
+        min_size, max_size = self._index_cache_min_key_size, self._index_cache_max_key_size
+        # the fingerprint must distinguish arrays with the same bytes but a different dtype or shape
+        if isinstance(key, np.ndarray):
+            # the bytes of object arrays are pointers, not labels
+            if key.dtype.kind == 'O' or not min_size <= key.size <= max_size:
+                return translate(key)
+            fingerprint = ('array', key.dtype.str, key.shape, key.tobytes())
+        else:
+            # groups are not cached because their translation could depend on more than their name
+            if not min_size <= len(key) <= max_size or any(isinstance(label, Group) for label in key):
+                return translate(key)
+            fingerprint = ('seq', tuple(key))
+            try:
+                hash(fingerprint)
+            except TypeError:
+                return translate(key)
+        cache = self.__index_cache
+        if cache is None:
+            cache = LRUCache(self.index_cache_size)
+            self.__index_cache = cache
+        res = cache.get(fingerprint)
+        if res is None:
+            res = translate(key)
+            # the cached array is returned as-is (without copying it) so it must not be modified
+            if isinstance(res, np.ndarray):
+                res.flags.writeable = False
+            cache[fingerprint] = res
+        return res
+
+    def index_cache_info(self):
+        """
+        Returns statistics about the cache of translated sequences and arrays of labels of the axis.
+
+        Each axis keeps a cache of the positions corresponding to the last (by default 32) sequences or arrays of
+        at least 64 labels translated by Axis.index (shorter keys are cheaper to translate than to look up). The
+        maximum number of cached keys is given by the `index_cache_size` class attribute (which can also be set on a
+        particular axis). Setting it to 0 disables the cache. The cache is emptied when the labels of the axis change.
+        Cached positions are returned as read-only arrays.
+
+        Returns
+        -------
+        CacheInfo
+            named tuple with hits, misses, maxsize and currsize fields.
+
+        Examples
+        --------
+        >>> age = Axis(['age%d' % i for i in range(100)], 'age')
+        >>> key = ['age%d' % i for i in range(20, 84)]
+        >>> age.index(key)[:5]
+        array([20, 21, 22, 23, 24])
+        >>> age.index(key)[:5]
+        array([20, 21, 22, 23, 24])
+        >>> age.index_cache_info()
+        CacheInfo(hits=1, misses=1, maxsize=32, currsize=1)
+        """
+        cache = self.__index_cache
+        if cache is None:
+            return CacheInfo(0, 0, self.index_cache_size, 0)
+        return cache.cache_info()
+
     # FIXME: remove id
     @property
     def id(self):
@@ -968,8 +1276,12 @@ class Axis(ABCAxis):
         new_axis.__mapping = self.__mapping
         new_axis._length = self._length
         new_axis._iswildcard = self._iswildcard
-        new_axis.__sorted_keys = self.__sorted_keys
-        new_axis.__sorted_values = self.__sorted_values
+        new_axis._lookup_engine = self._lookup_engine
+        new_axis.__lookup = self.__lookup
+        new_axis.__fingerprint = self.__fingerprint
+        if 'index_cache_size' in self.__dict__:
+            new_axis.index_cache_size = self.index_cache_size
+        new_axis.__range = self.__range
         return new_axis
 
     def replace(self, old, new=None):
@@ -1263,6 +1575,9 @@ class AxisCollection(object):
         Axis([2007, 2008, 2009, 2010], 'time')
     ])
     """
+    # number of lookups of labels given without their axis after which the collection builds its label index
+    _label_index_min_lookups = 16
+
     def __init__(self, axes=None):
         if axes is None:
             axes = []
@@ -1282,6 +1597,7 @@ class AxisCollection(object):
                              % (axis.name, axis.labels_summary(), id(axis)))
         self._list = axes
         self._map = {axis.name: axis for axis in axes if axis.name is not None}
+        self._label_index = None
 
         # # check dupes on each axis
         # for axis in axes:
@@ -1301,6 +1617,18 @@ class AxisCollection(object):
         #     dupes = '\n'.join("{} is valid in {{{}}}".format(label, axes) for label, axes in label_axes)
         #     warnings.warn("ambiguous labels found:\n%s" % dupes, category=UserWarning, stacklevel=5)
 
+    @classmethod
+    def _unchecked(cls, axes):
+        """
+        Creates a collection from a list of distinct Axis objects, without any check nor conversion. This is meant
+        for library internals which build collections from axes which are known to be valid.
+        """
+        res = cls.__new__(cls)
+        res._list = axes
+        res._map = {axis.name: axis for axis in axes if axis.name is not None}
+        res._label_index = None
+        return res
+
     def __dir__(self):
         # called by dir() and tab-completion at the interactive prompt, must return a list of any valid getattr key.
         # dir() takes care of sorting but not uniqueness, so we must ensure that.
@@ -1319,10 +1647,159 @@ class AxisCollection(object):
     # needed to make *un*pickling work (because otherwise, __getattr__ is called before _map exists, which leads to
     # an infinite recursion)
     def __getstate__(self):
-        return self.__dict__
+        # the label index is a cache, there is no point in storing it
+        d = self.__dict__.copy()
+        d['_label_index'] = None
+        return d
 
     def __setstate__(self, d):
         self.__dict__ = d
+        self._label_index = None
+
+    def _get_label_index(self):
+        """
+        Returns the inverted index {label: [(axis position in collection, label position), ...]} of the labels of all
+        axes in the collection and the positions of the axes (long range axes) which are not part of it because their
+        labels are translated arithmetically.
+
+        The index is only built once it has been needed _label_index_min_lookups times (many collections, e.g. those
+        of temporary arrays, are only used for a few lookups, which would not pay off the cost of building it) and is
+        rebuilt when the collection changes or the labels of any axis are replaced. Before that, None is returned and
+        the caller must look the label up in each axis.
+        """
+        label_index = self._label_index
+        generation = Axis._labels_generation
+        if label_index is None or label_index[0] != generation:
+            label_index = (generation, 0)
+        if isinstance(label_index[1], int):
+            num_lookups = label_index[1] + 1
+            if num_lookups < self._label_index_min_lookups:
+                self._label_index = (generation, num_lookups)
+                return None
+            index = {}
+            other_axes = []
+            for i, axis in enumerate(self._list):
+                mapping = axis._mapping
+                if not isinstance(mapping, dict):
+                    other_axes.append(i)
+                    continue
+                for label, pos in mapping.items():
+                    index.setdefault(label, []).append((i, pos))
+            label_index = (generation, (index, other_axes))
+            self._label_index = label_index
+        return label_index[1]
+
+    def _label_positions(self, label):
+        """
+        Returns the (axis, position) pairs for all axes of the collection containing label.
+
+        Parameters
+        ----------
+        label : any
+            Key to look for.
+
+        Returns
+        -------
+        list of tuple (Axis, int) or None
+            None if label is not a plain label, in which case each axis must be tried in turn (using Axis.index).
+
+        Examples
+        --------
+        >>> col = AxisCollection('sex=M,F; gender=F,M,X')
+        >>> [(axis.name, pos) for axis, pos in col._label_positions('M')]
+        [('sex', 0), ('gender', 1)]
+        >>> [(axis.name, pos) for axis, pos in col._label_positions('X')]
+        [('gender', 2)]
+        >>> col._label_positions('M,F') is None
+        True
+        """
+        # only scalars which are interpreted as-is by Axis.index can be looked up directly
+        if not np.isscalar(label) or (isinstance(label, basestring) and _key_syntax_pattern.search(label)):
+            return None
+        label_index = self._get_label_index()
+        if label_index is None:
+            matches = []
+            for axis in self._list:
+                try:
+                    pos = axis._mapping[label]
+                except KeyError:
+                    continue
+                except TypeError:
+                    return None
+                # avoid matching 0 against False or 0.0 (like Axis.index)
+                if axis._is_key_type_compatible(label):
+                    matches.append((axis, pos))
+            return matches
+        index, other_axes = label_index
+        try:
+            matches = index.get(label, [])
+        except TypeError:
+            return None
+        axes = self._list
+        if other_axes:
+            matches = list(matches)
+            for i in other_axes:
+                try:
+                    matches.append((i, axes[i]._mapping[label]))
+                except KeyError:
+                    continue
+            matches.sort()
+        return [(axes[i], pos) for i, pos in matches if axes[i]._is_key_type_compatible(label)]
+
+    def _scalar_key_positions(self, labels, axis_labels=None):
+        """
+        Returns the position on each axis of a key made of exactly one label per axis. Labels can be given without
+        their axis (in any order) or by axis name.
+
+        Parameters
+        ----------
+        labels : tuple
+            Labels given without their axis.
+        axis_labels : dict, optional
+            {axis_name: label}
+
+        Returns
+        -------
+        tuple of int or None
+            None if the key is not of that form, or if any label is invalid or ambiguous, in which case the generic
+            (slower) key translation must be used.
+
+        Examples
+        --------
+        >>> col = AxisCollection('nat=BE,FO; sex=M,F; time=2015..2017')
+        >>> col._scalar_key_positions(('F', 2016, 'BE'))
+        (0, 1, 1)
+        >>> col._scalar_key_positions(('F',), {'nat': 'FO', 'time': 2017})
+        (1, 1, 2)
+        >>> col._scalar_key_positions(('F', 2016)) is None
+        True
+        """
+        axes = self._list
+        if len(labels) + (len(axis_labels) if axis_labels else 0) != len(axes):
+            return None
+        positions = [None] * len(axes)
+        for label in labels:
+            matches = self._label_positions(label)
+            if matches is None or len(matches) != 1:
+                return None
+            axis, pos = matches[0]
+            i = index_by_id(axes, axis)
+            if positions[i] is not None:
+                return None
+            positions[i] = pos
+        if axis_labels:
+            for name, label in axis_labels.items():
+                axis = self._map.get(name)
+                if axis is None or not np.isscalar(label) or not axis._is_key_type_compatible(label):
+                    return None
+                i = index_by_id(axes, axis)
+                if positions[i] is not None:
+                    return None
+                try:
+                    positions[i] = axis._mapping[label]
+                except (KeyError, TypeError):
+                    return None
+        return tuple(positions)
 
     def __getitem__(self, key):
         if isinstance(key, Axis):
@@ -1353,7 +1830,7 @@ class AxisCollection(object):
             return AxisCollection([self.get_by_pos(k, i)
                                    for i, k in enumerate(key)])
         elif isinstance(key, slice):
-            return AxisCollection(self._list[key])
+            return AxisCollection._unchecked(self._list[key])
         elif key is None:
             raise KeyError("axis '%s' not found in %s" % (key, self))
         else:
@@ -1423,6 +1900,7 @@ class AxisCollection(object):
             # XXX: we might want to make the stop bound inclusive, which makes more sense for label bounds (but
             #      prevents inserts via setitem)
             stop_idx = slice_bound(key.stop)
+            self._label_index = None
             old = self._list[start_idx:stop_idx:key.step]
             for axis in old:
                 if axis.name is not None:
@@ -1452,6 +1930,37 @@ class AxisCollection(object):
             axis = self._list.pop(idx)
             if axis.name is not None:
                 del self._map[axis.name]
+            self._label_index = None
+
+    def _broadcast_recipe(self, target_axes):
+        """
+        Returns how to make an array with these axes (NumPy) broadcastable with target_axes (see
+        LArray.broadcast_with).
+
+        Returns
+        -------
+        tuple or None
+            None if the array is already broadcastable. Otherwise, a (axes_indices, new_axes) tuple where
+            axes_indices is the order in which to transpose the data and new_axes the axes of the broadcastable array
+            (the transposed data must be reshaped to new_axes.shape).
+        """
+        if self == target_axes:
+            return None
+
+        target_axes = (self - target_axes) | target_axes
+
+        # XXX: this breaks la['1,5,9'] = la['2,7,3']
+        # but that use case should use drop_labels
+        # self.check_compatible(target_axes)
+
+        # 1) reorder axes to target order (like LArray.transpose)
+        axes_indices = [self.index(axis) for axis in self[target_axes & self]]
+        # this whole mumbo jumbo is required (for now) for anonymous axes
+        indices_present = set(axes_indices)
+        axes_indices += [i for i in range(len(self)) if i not in indices_present]
+
+        # 2) add length one axes
+        return axes_indices, self[axes_indices].get_all(target_axes)
 
     def union(self, *args, **kwargs):
         validate = kwargs.pop('validate', True)
@@ -1899,7 +2408,13 @@ class AxisCollection(object):
         """
         Returns a copy.
         """
-        return self[:]
+        # axes are already known to be valid, so there is no need to go through __init__
+        res = AxisCollection.__new__(AxisCollection)
+        res._list = self._list[:]
+        res._map = self._map.copy()
+        # the label index is never modified in place (only replaced), so it can be shared
+        res._label_index = self._label_index
+        return res
 
     def replace(self, axes_to_replace=None, new_axis=None, inplace=False, **kwargs):
         """Replace one, several or all axes of the collection.
@@ -2058,7 +2573,61 @@ class AxisCollection(object):
 
         # only keep indices (as this works for unnamed axes too)
         to_remove = set(self.index(axis) for axis in axes if axis in self)
-        return AxisCollection([axis for i, axis in enumerate(self) if i not in to_remove])
+        return AxisCollection._unchecked([axis for i, axis in enumerate(self._list) if i not in to_remove])
+
+    def prepare_key(self, *args, **kwargs):
+        """
+        Translates a key once, so that it can be used to select (or set) the same subset of many arrays without
+        translating labels each time.
+
+        Parameters
+        ----------
+        *args : key
+            Any key which could be used to select a subset of an array with these axes, except boolean keys and keys
+            containing arrays of indices (points).
+        **kwargs : {axis_name: axis_key}
+            Keys for some axes given by name.
+
+        Returns
+        -------
+        PreparedKey
+            Key which can be used in the getitem and setitem operations of arrays having (some of) these axes. Arrays
+            with other axes must contain all the axes which are not fully selected by the key, with the same labels.
+
+        Examples
+        --------
+        >>> from larray import ndtest
+        >>> arr = ndtest((2, 3, 4))
+        >>> key = arr.axes.prepare_key('a1', c='c1..c2')
+        >>> arr[key]
+        b\\c  c1  c2
+         b0  13  14
+         b1  17  18
+         b2  21  22
+        >>> arr[key] = 0
+        >>> arr.sum_by('a')
+        a  a0   a1
+           66  105
+        >>> ndtest('b=b0..b2; c=c0..c3')[key]
+        Traceback (most recent call last):
+        ...
+        ValueError: array has no axis a but the key does not select all its labels
+        """
+        from larray.core.array import LArray
+
+        key = args[0] if len(args) == 1 else args
+        if kwargs:
+            key = (key if isinstance(key, tuple) else (key,)) + tuple(self[name][axis_key]
+                                                                     for name, axis_key in kwargs.items())
+        # translating a key only needs the axes, not the data, so we use an array with no memory
+        template = LArray._unchecked(np.broadcast_to(np.zeros((), dtype=bool), self.shape), self)
+        translated_key = template._translated_key(key)
+        bool_key = isinstance(key, (LArray, np.ndarray)) and np.issubdtype(key.dtype, np.bool_)
+        if bool_key or any(not np.isscalar(k) and not isinstance(k, (slice, list, tuple, np.ndarray))
+                           for k in translated_key):
+            raise ValueError("cannot prepare key {}: only keys selecting labels independently on each axis are "
+                             "supported".format(key))
+        return PreparedKey(self, translated_key)
 
     def translate_full_key(self, key):
         """
@@ -2603,11 +3172,192 @@ class AxisCollection(object):
         return self.replace(axes_changes), other.replace(axes_changes)
 
 
+class PreparedKey(object):
+    """
+    Positional key for a subset, computed once by AxisCollection.prepare_key.
+
+    Parameters
+    ----------
+    axes : AxisCollection
+        Axes the key was translated for.
+    key : tuple
+        Complete positional key (one scalar, slice or sequence of indices for each axis).
+    """
+    def __init__(self, axes, key):
+        self.axes = axes
+        self.key = key
+        # {tuple of id of axes: (refs to the axes, positional key, collapsed positional key, result axes)}
+        self._translations = LRUCache(16)
+
+    def __repr__(self):
+        return 'PreparedKey({})'.format(', '.join('{}: {}'.format(axis.name, axis_key)
+                                                  for axis, axis_key in zip(self.axes, self.key)
+                                                  if not (isinstance(axis_key, slice) and axis_key == slice(None))))
+
+    def translate(self, axes):
+        """
+        Returns the positional key (not collapsed and with slices collapsed), and the axes of the subset, for an
+        array with the given axes.
+        """
+        axes_ids = tuple(id(axis) for axis in axes)
+        translation = self._translations.get(axes_ids)
+        if translation is None:
+            translation = self._translate(axes)
+            self._translations[axes_ids] = translation
+        return translation[1:]
+
+    def _translate(self, axes):
+        own_axes = self.axes
+        if len(axes) == len(own_axes) and all(a is b for a, b in zip(axes, own_axes)):
+            key = self.key
+        else:
+            used = set()
+            key = []
+            for i, axis in enumerate(axes):
+                if axis in own_axes:
+                    own_idx = own_axes.index(axis)
+                    if not own_axes[own_idx].equals(axis):
+                        raise ValueError("incompatible axes:\n{!r}\nvs\n{!r}".format(axis, own_axes[own_idx]))
+                    used.add(own_idx)
+                    key.append(self.key[own_idx])
+                else:
+                    key.append(slice(None))
+            for i, axis_key in enumerate(self.key):
+                if i not in used and not (isinstance(axis_key, slice) and axis_key == slice(None)):
+                    raise ValueError("array has no axis {} but the key does not select all its labels"
+                                     .format(own_axes[i].name))
+            key = tuple(key)
+        sequence = (tuple, list, np.ndarray)
+        collapsed_key = tuple(_range_to_slice(axis_key, len(axis)) if isinstance(axis_key, sequence) else axis_key
+                              for axis_key, axis in zip(key, axes))
+        res_axes = [axis.subaxis(axis_key) for axis, axis_key in zip(axes, key) if not np.isscalar(axis_key)]
+        # keep a reference to axes so that their ids stay valid as long as the translation is cached
+        return list(axes), key, collapsed_key, res_axes
+
+
+class AxisPool(object):
+    """
+    Pool of axes used to share a single Axis object between all the arrays using identical axes.
+
+    By default, each array loaded from a file gets its own axes objects, even if all the arrays of a file share the
+    same axes. When given an AxisPool, functions loading arrays (read_csv, read_hdf, from_frame, Session.load, ...)
+    replace each axis equal (same name and labels) to an axis already in the pool by the one in the pool. This
+    reduces memory usage and speeds up operations between those arrays (because comparing an axis with itself is
+    free).
+
+    Examples
+    --------
+    >>> pool = AxisPool()
+    >>> a = pool.intern(Axis('a=a0..a2'))
+    >>> a2 = pool.intern(Axis('a=a0..a2'))
+    >>> a2 is a
+    True
+    >>> pool.intern(Axis('a=a0,a1')) is a
+    False
+    >>> len(pool), pool.hits
+    (2, 1)
+    """
+    def __init__(self):
+        self._axes = {}
+        self.hits = 0
+        self.nbytes_saved = 0
+
+    def intern(self, axis):
+        """
+        Returns the axis of the pool equal to axis if there is one, otherwise adds axis to the pool and returns it.
+
+        Parameters
+        ----------
+        axis : Axis
+            Axis to intern.
+
+        Returns
+        -------
+        Axis
+        """
+        if axis.iswildcard:
+            key = (axis.name, len(axis))
+        elif axis._range is not None:
+            # range axes are keyed without materializing their labels
+            key = (axis.name, len(axis)) + axis._range
+        else:
+            dtype, digest, _ = axis._fingerprint
+            # unhashable labels
+            if digest is None:
+                return axis
+            key = (axis.name, len(axis), dtype, digest)
+        candidates = self._axes.setdefault(key, [])
+        for candidate in candidates:
+            if candidate is axis:
+                return candidate
+            if candidate.equals(axis):
+                self.hits += 1
+                # wildcard and (non materialized) range axes do not store any label
+                if axis._labels is not None:
+                    self.nbytes_saved += _labels_nbytes(axis._labels)
+                return candidate
+        candidates.append(axis)
+        return axis
+
+    def intern_axes(self, array):
+        """
+        Returns array with all its axes interned in the pool.
+
+        Parameters
+        ----------
+        array : LArray
+            Array to intern the axes of.
+
+        Returns
+        -------
+        LArray
+            Array with the same data as the input array. Returns the input array itself if all its axes are already
+            in the pool.
+        """
+        axes = [self.intern(axis) for axis in array.axes]
+        if all(axis is array_axis for axis, array_axis in zip(axes, array.axes)):
+            return array
+        return array.set_axes(axes)
+
+    def __len__(self):
+        return sum(len(candidates) for candidates in self._axes.values())
+
+    def clear(self):
+        """
+        Removes all axes from the pool and resets its statistics.
+        """
+        self._axes.clear()
+        self.hits = 0
+        self.nbytes_saved = 0
+
+    @property
+    def memory_saved(self):
+        """
+        Returns (an estimate of) the memory saved by sharing axes in human readable form.
+
+        Returns
+        -------
+        str
+        """
+        return size2str(self.nbytes_saved)
+
+    def __repr__(self):
+        return 'AxisPool({} axes, {} hits, {} saved)'.format(len(self), self.hits, self.memory_saved)
+
+
+def _labels_nbytes(labels):
+    nbytes = labels.nbytes
+    if labels.dtype.kind == 'O':
+        nbytes += sum(sys.getsizeof(label) for label in labels)
+    return nbytes
+
+
 class AxisReference(ABCAxisReference, ExprNode, Axis):
     def __init__(self, name):
         self.name = name
         self._labels = None
         self._iswildcard = False
+        self._range = None
 
     def index(self, key):
         raise NotImplementedError("an AxisReference (X.) cannot translate labels")
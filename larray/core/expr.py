@@ -2,6 +2,16 @@
 from __future__ import absolute_import, division, print_function
 
 import sys
+import operator
+
+import numpy as np
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+__all__ = ['lazy']
 
 
 class ExprNode(object):
@@ -93,3 +103,365 @@ class UnaryOp(ExprNode):
         # TODO: implement eval via numexpr
         expr = expr_eval(self.expr, context)
         return getattr(expr, '__{}__'.format(self.op))()
+
+
+# number of elements computed at once when evaluating lazy expressions with numpy
+_lazy_chunk_size = 2 ** 16
+
+# {opname: (numpy function, numexpr operator or None if not supported by numexpr)}
+_lazy_binops = {
+    'add': (np.add, '+'),
+    'sub': (np.subtract, '-'),
+    'mul': (np.multiply, '*'),
+    'truediv': (np.true_divide, '/'),
+    'floordiv': (np.floor_divide, None),
+    'mod': (np.remainder, None),
+    'pow': (np.power, '**'),
+    'lshift': (np.left_shift, None),
+    'rshift': (np.right_shift, None),
+    # numexpr only supports & and | on booleans
+    'and': (np.bitwise_and, None),
+    'or': (np.bitwise_or, None),
+    'xor': (np.bitwise_xor, None),
+    'lt': (np.less, '<'),
+    'le': (np.less_equal, '<='),
+    'eq': (np.equal, '=='),
+    'ne': (np.not_equal, '!='),
+    'gt': (np.greater, '>'),
+    'ge': (np.greater_equal, '>='),
+}
+if sys.version < '3':
+    _lazy_binops['div'] = (np.divide, None)
+
+# {opname: (numpy function, numexpr format string or None if not supported by numexpr)}
+_lazy_unaryops = {
+    'neg': (np.negative, '(-{})'),
+    'pos': (operator.pos, '{}'),
+    'abs': (np.absolute, None),
+    'invert': (np.invert, None),
+}
+
+# dtypes numexpr can compute with
+_numexpr_dtypes = {np.dtype(t) for t in (bool, np.int32, np.int64, np.float32, np.float64, np.complex128)}
+
+
+def _lazy_operand(value):
+    from larray.core.array import LArray, aslarray
+
+    if isinstance(value, LazyExpr):
+        return value
+    elif isinstance(value, ExprNode):
+        raise TypeError("cannot combine a lazy expression with {}".format(type(value).__name__))
+    elif isinstance(value, LArray):
+        return LazyArray(value)
+    elif np.isscalar(value):
+        return value
+    else:
+        return LazyArray(aslarray(value))
+
+
+def _lazy_axes(value):
+    from larray.core.axis import AxisCollection
+
+    return value.axes if isinstance(value, LazyExpr) else AxisCollection([])
+
+
+class LazyExpr(ExprNode):
+    """
+    Base class for lazy expressions (see lazy). The axes of the result are computed when the expression is built.
+    """
+    # numpy must use our reflected operators instead of iterating over us
+    __array_priority__ = 101
+
+    def _binop(opname):
+        def opmethod(self, other):
+            return LazyBinaryOp(opname, self, other)
+
+        opmethod.__name__ = '__{}__'.format(opname)
+        return opmethod
+
+    __ror__ = _binop('ror')
+    __or__ = _binop('or')
+    __rxor__ = _binop('rxor')
+    __xor__ = _binop('xor')
+    __rand__ = _binop('rand')
+    __and__ = _binop('and')
+    __rrshift__ = _binop('rrshift')
+    __rshift__ = _binop('rshift')
+    __rlshift__ = _binop('rlshift')
+    __lshift__ = _binop('lshift')
+    __rpow__ = _binop('rpow')
+    __pow__ = _binop('pow')
+    __rmod__ = _binop('rmod')
+    __mod__ = _binop('mod')
+    __rfloordiv__ = _binop('rfloordiv')
+    __floordiv__ = _binop('floordiv')
+    __rtruediv__ = _binop('rtruediv')
+    __truediv__ = _binop('truediv')
+    if sys.version < '3':
+        __div__ = _binop('div')
+        __rdiv__ = _binop('rdiv')
+    __rmul__ = _binop('rmul')
+    __mul__ = _binop('mul')
+    __rsub__ = _binop('rsub')
+    __sub__ = _binop('sub')
+    __radd__ = _binop('radd')
+    __add__ = _binop('add')
+    __ge__ = _binop('ge')
+    __gt__ = _binop('gt')
+    __ne__ = _binop('ne')
+    __eq__ = _binop('eq')
+    __le__ = _binop('le')
+    __lt__ = _binop('lt')
+
+    def _unaryop(opname):
+        def opmethod(self):
+            return LazyUnaryOp(opname, self)
+
+        opmethod.__name__ = '__{}__'.format(opname)
+        return opmethod
+
+    __neg__ = _unaryop('neg')
+    __pos__ = _unaryop('pos')
+    __abs__ = _unaryop('abs')
+    __invert__ = _unaryop('invert')
+
+    def __repr__(self):
+        return 'lazy expression with axes {}'.format(self.axes)
+
+    def _leaves(self):
+        raise NotImplementedError()
+
+    def _eval_chunk(self, chunks):
+        raise NotImplementedError()
+
+    def _numexpr(self, names):
+        raise NotImplementedError()
+
+    def _numexpr_compatible(self):
+        raise NotImplementedError()
+
+    def compute(self, backend=None, chunk_size=None, threads=None):
+        """
+        Evaluates the expression.
+
+        Parameters
+        ----------
+        backend : {'numpy', 'numexpr'}, optional
+            Library used to evaluate the expression. Defaults to 'numexpr' if it is installed and supports all the
+            operations and types of the expression, 'numpy' otherwise.
+        chunk_size : int, optional
+            Number of elements computed at once by the numpy backend. Defaults to 65536.
+        threads : int, optional
+            Number of threads used by the numpy backend to compute chunks. Defaults to the value set by
+            set_num_threads.
+
+        Returns
+        -------
+        LArray
+        """
+        from larray.core.array import LArray, get_num_threads, _get_thread_pool
+
+        axes = self.axes
+        leaves = self._leaves()
+        raw_leaves = {}
+        for leaf in leaves:
+            data = leaf.array.data
+            recipe = leaf.array.axes._broadcast_recipe(axes)
+            if recipe is not None:
+                data = data.transpose(recipe[0]).reshape(recipe[1].shape)
+            raw_leaves[id(leaf)] = data
+
+        if backend is None:
+            backend = 'numexpr' if ne is not None and self._numexpr_compatible() else 'numpy'
+        if backend == 'numexpr':
+            if ne is None:
+                raise ImportError("numexpr is required to use the numexpr backend")
+            names = {id(leaf): 'v%d' % i for i, leaf in enumerate(leaves)}
+            local_dict = {names[k]: data for k, data in raw_leaves.items()}
+            res_data = ne.evaluate(self._numexpr(names), local_dict=local_dict, global_dict={})
+            return LArray(np.broadcast_to(res_data, axes.shape).copy() if res_data.shape != axes.shape else res_data,
+                          axes)
+        elif backend != 'numpy':
+            raise ValueError("invalid backend: {}".format(backend))
+
+        if chunk_size is None:
+            chunk_size = _lazy_chunk_size
+        if threads is None:
+            threads = get_num_threads()
+        chunk_keys = _chunk_keys(axes.shape, chunk_size)
+
+        def eval_chunk(key):
+            chunks = {k: data[_leaf_key(key, data.shape)] for k, data in raw_leaves.items()}
+            return self._eval_chunk(chunks)
+
+        first = np.asarray(eval_chunk(chunk_keys[0]))
+        if len(chunk_keys) == 1:
+            res_data = np.array(np.broadcast_to(first, axes.shape))
+            return LArray(res_data, axes)
+        res_data = np.empty(axes.shape, dtype=first.dtype)
+        res_data[chunk_keys[0]] = first
+
+        def compute_chunk(key):
+            res_data[key] = eval_chunk(key)
+
+        if threads > 1:
+            _get_thread_pool(threads).map(compute_chunk, chunk_keys[1:])
+        else:
+            for key in chunk_keys[1:]:
+                compute_chunk(key)
+        return LArray(res_data, axes)
+
+    def evaluate(self, context):
+        return self.compute()
+
+
+def _chunk_keys(shape, chunk_size):
+    """
+    Returns a list of keys (tuples of integers followed by a slice) splitting an array with the given shape in chunks
+    of at most chunk_size elements (but at least one row of the last axis).
+
+    Examples
+    --------
+    >>> _chunk_keys((2, 3, 4), 8)
+    [(0, slice(0, 2, None)), (0, slice(2, 3, None)), (1, slice(0, 2, None)), (1, slice(2, 3, None))]
+    >>> _chunk_keys((2, 3, 4), 100)
+    [()]
+    """
+    size = int(np.prod(shape))
+    if size <= chunk_size or not shape:
+        return [()]
+    # find the outermost axis such that all the following axes fit in a chunk
+    inner_size = 1
+    split_axis = len(shape) - 1
+    while split_axis > 0 and inner_size * shape[split_axis] <= chunk_size:
+        inner_size *= shape[split_axis]
+        split_axis -= 1
+    step = max(chunk_size // inner_size, 1)
+    length = shape[split_axis]
+    return [idx + (slice(start, min(start + step, length)),)
+            for idx in np.ndindex(*shape[:split_axis])
+            for start in range(0, length, step)]
+
+
+def _leaf_key(key, leaf_shape):
+    # leaves have length 1 axes for the axes they do not have
+    if not key:
+        return key
+    split_axis = len(key) - 1
+    return tuple(0 if leaf_shape[i] == 1 else k for i, k in enumerate(key[:-1])) + \
+        (slice(None) if leaf_shape[split_axis] == 1 else key[-1],)
+
+
+class LazyArray(LazyExpr):
+    def __init__(self, array):
+        self.array = array
+        self.axes = array.axes
+
+    def _leaves(self):
+        return [self]
+
+    def _eval_chunk(self, chunks):
+        return chunks[id(self)]
+
+    def _numexpr(self, names):
+        return names[id(self)]
+
+    def _numexpr_compatible(self):
+        return self.array.dtype in _numexpr_dtypes
+
+
+class LazyBinaryOp(LazyExpr):
+    def __init__(self, op, expr1, expr2):
+        if op not in _lazy_binops and op[1:] not in _lazy_binops:
+            raise TypeError("operator {} is not supported by lazy expressions".format(op))
+        expr1 = _lazy_operand(expr1)
+        expr2 = _lazy_operand(expr2)
+        # store operands in the order they are given to the numpy function
+        if op not in _lazy_binops:
+            op = op[1:]
+            expr1, expr2 = expr2, expr1
+        self.op = op
+        self.expr1 = expr1
+        self.expr2 = expr2
+        self.axes = _lazy_axes(expr1).union(_lazy_axes(expr2))
+
+    def _leaves(self):
+        leaves = [e for expr in (self.expr1, self.expr2) if isinstance(expr, LazyExpr) for e in expr._leaves()]
+        # the same leaf can appear several times in the expression
+        unique = {}
+        for leaf in leaves:
+            unique.setdefault(id(leaf), leaf)
+        return list(unique.values())
+
+    def _eval_chunk(self, chunks):
+        expr1 = self.expr1._eval_chunk(chunks) if isinstance(self.expr1, LazyExpr) else self.expr1
+        expr2 = self.expr2._eval_chunk(chunks) if isinstance(self.expr2, LazyExpr) else self.expr2
+        return _lazy_binops[self.op][0](expr1, expr2)
+
+    def _numexpr(self, names):
+        exprs = [e._numexpr(names) if isinstance(e, LazyExpr) else repr(e) for e in (self.expr1, self.expr2)]
+        return '({} {} {})'.format(exprs[0], _lazy_binops[self.op][1], exprs[1])
+
+    def _numexpr_compatible(self):
+        return _lazy_binops[self.op][1] is not None and \
+            all(e._numexpr_compatible() if isinstance(e, LazyExpr) else isinstance(e, (bool, int, float, complex))
+                for e in (self.expr1, self.expr2))
+
+
+class LazyUnaryOp(LazyExpr):
+    def __init__(self, op, expr):
+        self.op = op
+        self.expr = expr
+        self.axes = expr.axes
+
+    def _leaves(self):
+        return self.expr._leaves()
+
+    def _eval_chunk(self, chunks):
+        return _lazy_unaryops[self.op][0](self.expr._eval_chunk(chunks))
+
+    def _numexpr(self, names):
+        return _lazy_unaryops[self.op][1].format(self.expr._numexpr(names))
+
+    def _numexpr_compatible(self):
+        return _lazy_unaryops[self.op][1] is not None and self.expr._numexpr_compatible()
+
+
+def lazy(array):
+    """
+    Returns a lazy version of an array: operations involving it are not computed immediately but build an
+    expression which is evaluated (by its compute method) when needed.
+
+    The axes of the result are computed when the expression is built, but the whole expression is evaluated at once,
+    either chunk by chunk using numpy (the chunks can be computed by several threads, see set_num_threads) or using
+    numexpr (when it is installed). This avoids creating a temporary array (as large as the result) for each
+    intermediate operation.
+
+    Parameters
+    ----------
+    array : LArray
+        Array to use in a lazy expression.
+
+    Returns
+    -------
+    LazyExpr
+
+    Examples
+    --------
+    >>> from larray import ndtest
+    >>> pop = ndtest((2, 3))
+    >>> qx = ndtest(3).rename('a', 'b').set_labels('b', ['b0', 'b1', 'b2']) / 10
+    >>> expr = lazy(pop) * (1 - qx) + 1
+    >>> expr
+    lazy expression with axes {a, b}
+    >>> expr.compute()
+    a\\b   b0   b1   b2
+     a0  1.0  1.9  2.6
+     a1  4.0  4.6  5.0
+    """
+    from larray.core.array import LArray
+
+    if not isinstance(array, LArray):
+        raise TypeError("lazy() expects an LArray, got {}".format(type(array).__name__))
+    return LazyArray(array)
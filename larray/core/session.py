@@ -178,7 +178,7 @@ class Session(object):
         # equivalent to self.__dict__ = d (we need this form because __setattr__ is overridden)
         object.__setattr__(self, '__dict__', d)
 
-    def load(self, fname, names=None, engine='auto', display=False, **kwargs):
+    def load(self, fname, names=None, engine='auto', display=False, axis_pool=None, **kwargs):
         """
         Loads array objects from a file, or several .csv files.
 
@@ -197,6 +197,9 @@ class Session(object):
             Load using `engine`. Defaults to 'auto' (use default engine for the format guessed from the file extension).
         display : bool, optional
             Whether or not to display which file is being worked on. Defaults to False.
+        axis_pool : AxisPool, optional
+            Pool of axes in which the axes of the loaded arrays are interned, so that identical axes are shared
+            between arrays (and with other arrays loaded using the same pool). Defaults to None (do not share axes).
 
         Examples
         --------
@@ -222,6 +225,13 @@ class Session(object):
         >>> s.load('data')                                # doctest: +SKIP
         >>> # or equivalently in this case
         >>> s.load('data/arr*.csv')                       # doctest: +SKIP
+
+        Share identical axes between the loaded arrays
+
+        >>> pool = AxisPool()                             # doctest: +SKIP
+        >>> s.load('input.h5', axis_pool=pool)            # doctest: +SKIP
+        >>> pool.memory_saved                             # doctest: +SKIP
+        '1.23 Kb'
         """
         if display:
             print("opening", fname)
@@ -238,6 +248,8 @@ class Session(object):
         handler = handler_cls(fname)
         arrays = handler.read_arrays(names, display=display, **kwargs)
         for k, v in arrays.items():
+            if axis_pool is not None and isinstance(v, LArray):
+                v = axis_pool.intern_axes(v)
             self[k] = v
 
     def save(self, fname, names=None, engine='auto', overwrite=True, display=False, **kwargs):
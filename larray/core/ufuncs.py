@@ -3,7 +3,7 @@
 
 import numpy as np
 
-from larray.core.array import LArray, make_numpy_broadcastable
+from larray.core.array import LArray, _broadcast_data
 
 __all__ = [
     # Trigonometric functions
@@ -51,8 +51,22 @@ def broadcastify(func):
     # intentionally not using functools.wraps, because it does not work for wrapping a function from another module
     def wrapper(*args, **kwargs):
         # TODO: normalize args/kwargs like in LIAM2 so that we can also broadcast if args are given via kwargs
-        #       (eg out=)
-        args, combined_axes = make_numpy_broadcastable(args)
+        out = kwargs.get('out')
+        if isinstance(out, LArray):
+            # out comes first in the broadcast so that the other arguments are transposed to the order of its axes
+            raw_args, combined_axes = _broadcast_data((out,) + args)
+            if len(combined_axes) != out.ndim:
+                raise ValueError("out array is missing axes {} of the result"
+                                 .format(combined_axes - out.axes))
+            raw_out = raw_args.pop(0)
+            # some functions (e.g. np.clip) require their input to have the same shape than their output
+            raw_args = [np.broadcast_to(a, raw_out.shape) if isinstance(a, np.ndarray) and a.shape != raw_out.shape
+                        else a
+                        for a in raw_args]
+            kwargs['out'] = raw_out
+            func(*raw_args, **kwargs)
+            return out
+        raw_args, combined_axes = _broadcast_data(args)
 
         # We pass only raw numpy arrays to the ufuncs even though numpy is normally meant to handle those case itself
         # via __array_wrap__
@@ -66,8 +80,6 @@ def broadcastify(func):
         # It fails on "np.minimum(ndarray, LArray)" because it calls __array_wrap__(high, result) which cannot work if
         # there was broadcasting involved (high has potentially less labels than result).
         # it does this because numpy calls __array_wrap__ on the argument with the highest __array_priority__
-        raw_args = [np.asarray(a) if isinstance(a, LArray) else a
-                    for a in args]
         res_data = func(*raw_args, **kwargs)
         if combined_axes:
             return LArray(res_data, combined_axes)
@@ -198,7 +210,30 @@ fmin = broadcastify(np.fmin)
 nan_to_num = broadcastify(np.nan_to_num)
 real_if_close = broadcastify(np.real_if_close)
 interp = broadcastify(np.interp)
-where = broadcastify(np.where)
+
+
+def _where(condition, x=None, y=None, out=None):
+    # np.where does not support out
+    if out is None:
+        return np.where(condition) if x is None and y is None else np.where(condition, x, y)
+    # operands sharing memory with out (e.g. where(arr > 0, 0, arr, out=arr)) must be copied before out is modified,
+    # unless they are out itself, in which case only the other operand needs to be copied
+    condition = np.array(condition, dtype=bool)
+    x, y = [a.copy() if isinstance(a, np.ndarray) and a is not out and np.may_share_memory(a, out) else a
+            for a in (x, y)]
+    if y is out:
+        np.copyto(out, x, where=condition)
+    elif x is out:
+        np.copyto(out, y, where=np.logical_not(condition))
+    else:
+        np.copyto(out, x)
+        np.copyto(out, y, where=np.logical_not(condition))
+    return out
+
+
+_where.__name__ = 'where'
+_where.__doc__ = np.where.__doc__
+where = broadcastify(_where)
 isnan = broadcastify(np.isnan)
 isinf = broadcastify(np.isinf)
 
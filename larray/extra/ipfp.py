@@ -1,10 +1,11 @@
 import math
-from collections import deque
+from timeit import default_timer
 
-from larray.core.array import LArray, aslarray, ones, any
+from larray.core.axis import Axis, AxisCollection
+from larray.core.array import LArray, aslarray, ones, any, get_num_threads, _get_thread_pool
 import numpy as np
 
-__all__ = ['ipfp']
+__all__ = ['ipfp', 'SparseSeed']
 
 
 def badvalues(a, bad_filter):
@@ -45,8 +46,156 @@ def warn_or_raise(what, msg):
         print("WARNING: {}".format(msg))
 
 
+class SparseSeed(object):
+    """
+    Sparse initial values for ipfp, given as the labels and values of their non zero cells (COO format).
+
+    Fitting a sparse seed only touches its non zero cells, so both the time and memory needed scale with the number
+    of non zero cells instead of the size of the whole array.
+
+    Parameters
+    ----------
+    axes : AxisCollection or list of Axis
+        Axes of the (dense) array.
+    labels : list/tuple of array-like
+        Labels of each non zero cell along each axis (one array of labels per axis, in the order of axes).
+    values : array-like
+        Value of each non zero cell.
+
+    Examples
+    --------
+    >>> from larray import Axis, ndtest
+    >>> a = Axis('a=a0,a1')
+    >>> b = Axis('b=b0..b2')
+    >>> seed = SparseSeed([a, b], [['a0', 'a1', 'a1'], ['b1', 'b0', 'b2']], [1, 2, 3])
+    >>> seed
+    SparseSeed({a, b}, 3 non zero values)
+    >>> seed.to_dense()
+    a\\b  b0  b1  b2
+     a0   0   1   0
+     a1   2   0   3
+    >>> SparseSeed.from_dense(seed.to_dense()).values
+    array([1, 2, 3])
+    """
+    def __init__(self, axes, labels, values):
+        axes = AxisCollection(axes)
+        if len(labels) != axes.ndim:
+            raise ValueError("labels must contain one array of labels per axis ({}), got {}"
+                             .format(axes.ndim, len(labels)))
+        positions = [axis.index(np.asarray(axis_labels)) for axis, axis_labels in zip(axes, labels)]
+        values = np.asarray(values)
+        if values.ndim != 1 or any(len(axis_positions) != len(values) for axis_positions in positions):
+            raise ValueError("labels along each axis and values must be 1D sequences of the same length")
+        self.axes = axes
+        self.positions = positions
+        self.values = values
+
+    @classmethod
+    def _from_positions(cls, axes, positions, values):
+        seed = cls.__new__(cls)
+        seed.axes = axes
+        seed.positions = positions
+        seed.values = values
+        return seed
+
+    @classmethod
+    def from_dense(cls, array):
+        """
+        Creates a sparse seed from the non zero cells of an array.
+
+        Parameters
+        ----------
+        array : LArray
+
+        Returns
+        -------
+        SparseSeed
+        """
+        array = aslarray(array)
+        positions = list(np.nonzero(array.data))
+        return cls._from_positions(array.axes, positions, array.data[tuple(positions)])
+
+    def to_dense(self):
+        """
+        Returns the (dense) array corresponding to the sparse seed.
+
+        Returns
+        -------
+        LArray
+        """
+        data = np.zeros(self.axes.shape, dtype=self.values.dtype)
+        data[tuple(self.positions)] = self.values
+        return LArray(data, self.axes)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    def _segments(self, axis):
+        """
+        Returns the position of each value in the (flattened) sum along axis.
+        """
+        axis_idx = self.axes.index(axis)
+        other_idx = [i for i in range(self.axes.ndim) if i != axis_idx]
+        if not other_idx:
+            return np.zeros(len(self.values), dtype=int)
+        return np.ravel_multi_index([self.positions[i] for i in other_idx], [len(self.axes[i]) for i in other_idx])
+
+    def sum(self, axis):
+        """
+        Returns the (dense) sum along axis.
+
+        Parameters
+        ----------
+        axis : Axis
+
+        Returns
+        -------
+        LArray
+        """
+        res_axes = self.axes - axis
+        res_data = np.bincount(self._segments(axis), weights=self.values, minlength=res_axes.size)
+        return LArray(res_data.reshape(res_axes.shape), res_axes)
+
+    def __repr__(self):
+        return 'SparseSeed({}, {} non zero values)'.format(self.axes, len(self.values))
+
+
+class IPFPInfo(object):
+    """
+    Information about an ipfp fit (see the `return_info` argument of ipfp).
+
+    Attributes
+    ----------
+    iterations : int or LArray
+        Number of iterations done.
+    max_sum_diff : float or LArray
+        Maximum absolute difference between the sums of the result and the target sums.
+    converged : bool or LArray
+        Whether or not max_sum_diff is below the threshold.
+    history : LArray
+        Maximum absolute difference between the sums and the target sums at each convergence check (over the slices
+        which were still being fitted when using per_slice=True), along an "iteration" axis.
+    axis_times : LArray
+        Time spent scaling the array along each fitted axis (in seconds), along an "axis" axis.
+    elapsed : float
+        Total time of the fit (in seconds).
+
+    When fitting each slice independently (using per_slice=True), iterations, max_sum_diff and converged are arrays
+    with the axes which are not fitted.
+    """
+    def __init__(self, iterations, max_sum_diff, converged, history=None, axis_times=None, elapsed=None):
+        self.iterations = iterations
+        self.max_sum_diff = max_sum_diff
+        self.converged = converged
+        self.history = history
+        self.axis_times = axis_times
+        self.elapsed = elapsed
+
+
 def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabort=10, nzvzs='raise',
-         no_convergence='raise', display_progress=False):
+         no_convergence='raise', display_progress=False, per_slice=False, threads=None, return_info=False,
+         method='ras', check_every=1, callback=None):
     """Apply Iterative Proportional Fitting Procedure (also known as bi-proportional fitting in statistics,
     RAS algorithm in economics) to array a, with target_sums as targets.
 
@@ -55,8 +204,9 @@ def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabo
     target_sums : tuple/list of array-like
         Target sums to achieve.
         First element must be the sum to achieve along axis 0, the second the sum along axis 1, ...
-    a : array-like, optional
-        Starting values to fit, if not given starts with an array filled with 1.
+    a : array-like or SparseSeed, optional
+        Starting values to fit, if not given starts with an array filled with 1. When most starting values are zero,
+        they can be given as a SparseSeed, in which case only the non zero values are fitted.
     axes : list/tuple of axes, optional
         Axes on which the fitting procedure should be applied. Defaults to all axes.
     maxiter : int, optional
@@ -79,11 +229,42 @@ def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabo
         'raise': raise an exception (default)
     display_progress : False, True or 'condensed', optional
         Whether or not to display progress. Defaults to False.
-        If 'condensed' will display progress using a denser template (using one line per iteration).
+        If 'condensed' will display progress using a denser template (using one line per iteration). When using
+        several threads, each thread displays the progress of its own slices.
+    per_slice : bool, optional
+        Whether or not to check convergence independently for each combination of labels of the axes which are not
+        fitted (see the axes argument). Slices are frozen as soon as they converge (or stop improving), instead of
+        fitting all of them until the worst one converges. In that case, the threshold, stepstoabort and maxiter
+        arguments apply to each slice. Defaults to False.
+    threads : int, optional
+        Number of threads used to fit the slices when using per_slice=True. Defaults to None (use the value set by
+        set_num_threads, 1 by default).
+    return_info : bool, optional
+        Whether or not to also return an IPFPInfo object with the number of iterations done and the final maximum
+        difference to the target sums (for each slice when using per_slice=True). Defaults to False.
+    method : 'ras' or 'anderson', optional
+        Fitting algorithm.
+        'ras': classic RAS iterations, scaling the array along each axis in turn (default).
+        'anderson': RAS iterations accelerated using Anderson mixing of the scaling factors of the previous
+        iterations. This usually needs far fewer iterations for badly scaled or sparse initial values, but each
+        iteration is more expensive and the result is not exactly the same (it only satisfies the threshold).
+    check_every : int, optional
+        Number of iterations between two convergence checks. Checking convergence needs to compute the sum along
+        all axes, so checking it less often makes each iteration cheaper, but can do up to `check_every - 1`
+        unnecessary iterations. stepstoabort then counts checks instead of iterations. Defaults to 1.
+    callback : function, optional
+        Function called after each convergence check as callback(iteration, max_cell_diff, max_sum_diff, elapsed)
+        with the iteration number (starting at 0), the maximum absolute difference between the cells of that
+        iteration and those of the previous one, the maximum absolute difference between the sums and the target
+        sums and the time elapsed since the start of the fit (in seconds). When using per_slice=True, differences
+        are computed over the slices which are still being fitted and, when using several threads, the callback is
+        called from each thread for its own slices. Defaults to None.
 
     Returns
     -------
-    LArray
+    LArray or SparseSeed
+        Fitted array (a SparseSeed if a is a SparseSeed). If return_info is True, a (fitted array, IPFPInfo) tuple is
+        returned instead.
 
     Examples
     --------
@@ -139,10 +320,47 @@ def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabo
     *much* faster than an explicit loop.
 
     >>> result = ipfp([btargets, atargets], initial, axes=(X.a, X.b))
+
+    By default, all years are fitted until the maximum difference to the targets for the worst year is below the
+    threshold. Using per_slice=True, each year is fitted independently and stops as soon as it converges:
+
+    >>> result, info = ipfp([btargets, atargets], initial, axes=(X.a, X.b), threshold=1e-6, per_slice=True,
+    ...                     return_info=True)
+    >>> info.iterations
+    year  2014  2015  2016
+             8     5     4
+    >>> info.converged
+    year  2014  2015  2016
+          True  True  True
+
+    For badly scaled initial values, Anderson acceleration can reduce the number of iterations needed considerably:
+
+    >>> initial = LArray([[1, 1, 1], [1, 0, 0], [1, 0, 0]], [Axis('a=a0..a2'), Axis('b=b0..b2')])
+    >>> targets = [LArray([2, 1, 1], initial.b), LArray([2, 1, 1], initial.a)]
+    >>> result, info = ipfp(targets, initial, threshold=1e-6, no_convergence='ignore', return_info=True)
+    >>> info.iterations, info.converged
+    (1000, False)
+    >>> result, info = ipfp(targets, initial, threshold=1e-6, method='anderson', return_info=True)
+    >>> info.iterations, info.converged
+    (42, True)
+
+    Initial values with many zeros can be given as a SparseSeed. Only their non zero values are fitted:
+
+    >>> seed = SparseSeed([a, b], [['a0', 'a1', 'a1'], ['b0', 'b0', 'b1']], [2, 1, 2])
+    >>> result = ipfp([target_sum_along_a, target_sum_along_b], seed, threshold=0.01)
+    >>> result
+    SparseSeed({a, b}, 3 non zero values)
+    >>> round(result.to_dense(), 2)
+    a\\b   b0   b1
+     a0  1.0  0.0
+     a1  1.0  1.0
     """
     assert nzvzs in {'fix', 'warn', 'raise'}
     assert no_convergence in {'ignore', 'warn', 'raise'}
     assert isinstance(display_progress, bool) or display_progress == 'condensed'
+    assert method in {'ras', 'anderson'}
+    assert check_every >= 1
+    start_time = default_timer()
 
     target_sums = [aslarray(ts) for ts in target_sums]
 
@@ -185,6 +403,12 @@ def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabo
         other_axes = target_sums[0].axes
         all_axes = first_axis + other_axes
         a = ones(all_axes, dtype=np.float64)
+    elif isinstance(a, SparseSeed):
+        if per_slice or method != 'ras':
+            raise ValueError("per_slice and method='anderson' are not supported for sparse seeds")
+        a_axes = AxisCollection([axis if axis.name is not None else axis.rename('axis{}'.format(i))
+                                 for i, axis in enumerate(a.axes)])
+        a = SparseSeed._from_positions(a_axes, a.positions, a.values.copy())
     else:
         # TODO: only make a copy if there are actually any bad values, but I am unsure we should make a copy at all.
         # Either way, this should be documented.
@@ -213,9 +437,18 @@ def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabo
             raise ValueError("target sum along {} (axis {}) is different than target sum along {} (axis {}): {} vs {}"
                              .format(axis, a.axes.index(axis), axes[0], a.axes.index(axes[0]), axis_total, axis0_total))
 
-    negative = a < 0
-    if any(negative):
-        raise ValueError("negative value(s) found:\n{}".format(badvalues(a, negative)))
+    sparse = isinstance(a, SparseSeed)
+    if sparse:
+        negative = a.values < 0
+        if negative.any():
+            labels = [axis.labels[axis_positions[negative]] for axis, axis_positions in zip(a.axes, a.positions)]
+            raise ValueError("negative value(s) found:\n{}"
+                             .format('\n'.join('{}: {}'.format('_'.join(str(label) for label in cell_labels), v)
+                                               for cell_labels, v in zip(zip(*labels), a.values[negative]))))
+    else:
+        negative = a < 0
+        if any(negative):
+            raise ValueError("negative value(s) found:\n{}".format(badvalues(a, negative)))
 
     for axis, axis_target_sum in zip(axes, target_sums):
         axis_idx = a.axes.index(axis)
@@ -235,13 +468,13 @@ def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabo
                 else:
                     print("WARNING: {}, setting them to zero:\n{}".format(msg, badvalues(axis_sum, bad)))
 
-            a[bad] = 0
+            if sparse:
+                a.values[bad.transpose(a.axes - axis).data.ravel()[a._segments(axis)]] = 0
+            else:
+                a[bad] = 0
             # verify we did fix the problem
             assert not any((a.sum(axis) != 0) & (axis_target_sum == 0))
 
-    r = a
-    lastdiffs = deque([float('nan')], maxlen=stepstoabort)
-
     # Here is the nice version of the algorithm
 
     # for i in range(maxiter):
@@ -252,48 +485,436 @@ def ipfp(target_sums, a=None, axes=None, maxiter=1000, threshold=0.5, stepstoabo
     #                        for axis, axis_target in zip(axes, target_sums))
     #     step_sum_improvement = ...
 
-    # Here is the ugly optimized version which avoids computing the sum for the first axis twice per iteration
-    # (saves ~10-15% running time).
-    axis0_sum = r.sum(axes[0])
-    for i in range(maxiter):
-        startr = r
-        r = r * target_sums[0].divnot0(axis0_sum)
-        for axis, axis_target in zip(axes[1:], target_sums[1:]):
-            r = r * axis_target.divnot0(r.sum(axis))
-
-        axes_sum = [r.sum(axis) for axis in axes]
-        max_sum_diff = max(abs(axis_sum - axis_target).max()
-                           for axis_sum, axis_target in zip(axes_sum, target_sums))
-        axis0_sum = axes_sum[0]
-
-        step_sum_improvement = lastdiffs[-1] - max_sum_diff
-        stepcelldiff = abs(r - startr).max()
-
-        if display_progress:
-            if display_progress == "condensed":
-                template = "it {} max cell diff {} max diff to target {} ({})"
-            else:
-                template = """iteration {}
+    # The optimized version (see _fit_slices) works directly on the numpy data, with a first dimension for
+    # independent slices: a single slice (the whole array) by default or one slice per combination of labels of the
+    # non fitted axes when fitting them independently.
+    dtype = np.result_type(a.dtype, *[axis_target.dtype for axis_target in target_sums])
+    if dtype.kind not in 'fc':
+        dtype = np.dtype(np.float64)
+    # without any iteration, the seed is returned as is
+    if not maxiter:
+        dtype = a.dtype
+    user_callback = callback
+
+    def make_callback():
+        # the progress printer keeps the last difference to the targets, so each thread needs its own
+        if not display_progress:
+            return user_callback
+        print_progress = _progress_printer(condensed=display_progress == 'condensed')
+        if user_callback is None:
+            return print_progress
+
+        def callback(*args):
+            print_progress(*args)
+            user_callback(*args)
+        return callback
+
+    if sparse:
+        values = a.values.astype(dtype)
+        segments = [a._segments(axis) for axis in axes]
+        targets = [axis_target.transpose(a.axes - axis).data.ravel() for axis, axis_target in zip(axes, target_sums)]
+        iterations, max_sum_diffs, status, history, axis_times = _fit_sparse(values, segments, targets, maxiter,
+                                                                             threshold, stepstoabort, display_progress,
+                                                                             check_every, make_callback(), start_time)
+        res = SparseSeed._from_positions(a.axes, a.positions, values)
+        return _finalize(res, iterations, max_sum_diffs, status, history, axis_times, axes, None, no_convergence,
+                         stepstoabort, maxiter, return_info, start_time)
+
+    axes_idx = [a.axes.index(axis) for axis in axes]
+    # targets with a length 1 dimension for their axis so that they broadcast against the fitted values
+    targets = [axis_target.broadcast_with(a.axes).data for axis_target in target_sums]
+    if per_slice:
+        slice_axes = a.axes - axes
+        order = [a.axes.index(axis) for axis in slice_axes] + axes_idx
+        slices_shape = (slice_axes.size,)
+        seed = a.data.transpose(order).reshape(slices_shape + axes.shape)
+        targets = [axis_target.transpose(order) for axis_target in targets]
+        targets = [axis_target.reshape(slices_shape + axis_target.shape[len(slice_axes):]) for axis_target in targets]
+        axes_idx = list(range(1, len(axes) + 1))
+    else:
+        seed = a.data[np.newaxis]
+        targets = [axis_target[np.newaxis] for axis_target in targets]
+        axes_idx = [axis_idx + 1 for axis_idx in axes_idx]
+    r = seed.astype(dtype)
+    # the sum along the first axis is computed using the type of the seed (and not on the upcasted values), like
+    # the first iteration always did
+    first_axis_sum = np.sum(seed, axis=axes_idx[0], keepdims=True) if seed.dtype != dtype else None
+
+    if threads is None:
+        threads = get_num_threads()
+    num_chunks = min(threads, len(r))
+    if num_chunks > 1:
+        # slices are independent so each chunk of slices can be fitted in a separate thread
+        chunks = np.array_split(np.arange(len(r)), num_chunks)
+
+        def fit_chunk(chunk):
+            chunk_r = r[chunk]
+            res = _fit_slices(chunk_r, [axis_target[chunk] for axis_target in targets], axes_idx, maxiter, threshold,
+                              stepstoabort, display_progress, method, check_every, make_callback(), start_time,
+                              first_axis_sum[chunk] if first_axis_sum is not None else None)
+            r[chunk] = chunk_r
+            return res
+        chunks_res = _get_thread_pool(num_chunks).map(fit_chunk, chunks)
+        iterations, max_sum_diffs, status = [np.concatenate(res) for res in list(zip(*chunks_res))[:3]]
+        history = {}
+        for chunk_history in [res[3] for res in chunks_res]:
+            for i, max_sum_diff in chunk_history.items():
+                history[i] = max(history.get(i, max_sum_diff), max_sum_diff)
+        axis_times = sum(res[4] for res in chunks_res)
+    else:
+        iterations, max_sum_diffs, status, history, axis_times = _fit_slices(r, targets, axes_idx, maxiter, threshold,
+                                                                             stepstoabort, display_progress, method,
+                                                                             check_every, make_callback(), start_time,
+                                                                             first_axis_sum)
+
+    if per_slice:
+        transposed_shape = tuple(len(a.axes[i]) for i in order)
+        res = LArray(np.ascontiguousarray(r.reshape(transposed_shape).transpose(np.argsort(order))), a.axes)
+    else:
+        res = LArray(r[0], a.axes)
+    return _finalize(res, iterations, max_sum_diffs, status, history, axis_times, axes,
+                     slice_axes if per_slice else None, no_convergence, stepstoabort, maxiter, return_info, start_time)
+
+
+def _finalize(res, iterations, max_sum_diffs, status, history, axis_times, axes, slice_axes, no_convergence,
+              stepstoabort, maxiter, return_info, start_time):
+    """
+    Reports convergence problems and returns the result of ipfp (and the corresponding IPFPInfo if asked to).
+    """
+    per_slice = slice_axes is not None
+    if no_convergence in {'warn', 'raise'}:
+        if per_slice:
+            num_no_improvement = (status == _NO_IMPROVEMENT).sum()
+            if num_no_improvement:
+                warn_or_raise(no_convergence, "does not seem to converge (no improvement for {} consecutive steps) "
+                                              "for {} slice(s) out of {}.".format(stepstoabort, num_no_improvement,
+                                                                                 len(status)))
+            num_maxiter = (status == _MAXITER).sum()
+            if num_maxiter:
+                warn_or_raise(no_convergence, "maximum iteration reached ({}) for {} slice(s) out of {}"
+                                              .format(maxiter, num_maxiter, len(status)))
+        elif status[0] == _NO_IMPROVEMENT:
+            warn_or_raise(no_convergence, "does not seem to converge (no improvement for {} consecutive steps), "
+                                          "stopping here.".format(stepstoabort))
+        elif status[0] == _MAXITER:
+            warn_or_raise(no_convergence, "maximum iteration reached ({})".format(maxiter))
+
+    if not return_info:
+        return res
+    checked_iterations = sorted(history.keys())
+    history = LArray([history[i] for i in checked_iterations], Axis(checked_iterations, 'iteration'))
+    axis_times = LArray(axis_times, Axis(axes.names, 'axis'))
+    elapsed = default_timer() - start_time
+    if per_slice and len(slice_axes):
+        info = IPFPInfo(LArray(iterations.reshape(slice_axes.shape), slice_axes),
+                        LArray(max_sum_diffs.reshape(slice_axes.shape), slice_axes),
+                        LArray((status == _CONVERGED).reshape(slice_axes.shape), slice_axes),
+                        history, axis_times, elapsed)
+    else:
+        info = IPFPInfo(iterations[0], max_sum_diffs[0], status[0] == _CONVERGED, history, axis_times, elapsed)
+    return res, info
+
+
+def _progress_printer(condensed=False):
+    """
+    Returns an ipfp callback printing its progress.
+    """
+    if condensed:
+        template = "it {} max cell diff {} max diff to target {} ({})"
+    else:
+        template = """iteration {}
  * max(abs(prev_cell - cell)): {}
  * max(abs(sum - target_sum)): {}
-   \- change since last iteration: {}
+   \\- change since last iteration: {}
 """
-            print(template.format(i, f2str(stepcelldiff), f2str(max_sum_diff), f2str(step_sum_improvement)))
+    last_max_sum_diff = [float('nan')]
+
+    def print_progress(iteration, max_cell_diff, max_sum_diff, elapsed):
+        step_sum_improvement = last_max_sum_diff[0] - max_sum_diff
+        last_max_sum_diff[0] = max_sum_diff
+        print(template.format(iteration, f2str(max_cell_diff), f2str(max_sum_diff), f2str(step_sum_improvement)))
+    return print_progress
+
+
+_CONVERGED, _NO_IMPROVEMENT, _MAXITER = range(3)
 
-        if np.all(np.array(lastdiffs) == max_sum_diff):
-            if no_convergence in {'warn', 'raise'}:
-                warn_or_raise(no_convergence, "does not seem to converge (no improvement for {} consecutive steps), "
-                                              "stopping here.".format(stepstoabort))
-            return r
 
+class _AndersonMixer(object):
+    """
+    Anderson acceleration of RAS iterations.
+
+    Each RAS iteration is seen as a step of a fixed-point iteration x = G(x) where x is the logarithm of the scaling
+    factors applied along each axis. The next iterate is the combination of the last `depth` iterates which minimizes
+    (in the least squares sense) the residual G(x) - x, independently for each slice. The history of a slice is
+    reset whenever its residual grows, in which case a plain RAS step is done.
+    """
+    def __init__(self, factors_shapes, depth=10):
+        num_slices = factors_shapes[0][0]
+        self.log_factors = [np.zeros(shape) for shape in factors_shapes]
+        self.depth = depth
+        size = sum(log_factor[0].size for log_factor in self.log_factors)
+        self.dg = np.zeros((num_slices, depth, size))
+        self.df = np.zeros((num_slices, depth, size))
+        self.num_steps = 0
+        self.prev_g = None
+        self.prev_f = None
+        self.prev_norm = np.full(num_slices, np.inf)
+
+    def compact(self, keep):
+        self.log_factors = [log_factor[keep] for log_factor in self.log_factors]
+        self.dg = self.dg[keep]
+        self.df = self.df[keep]
+        if self.prev_g is not None:
+            self.prev_g = self.prev_g[keep]
+            self.prev_f = self.prev_f[keep]
+        self.prev_norm = self.prev_norm[keep]
+
+    def step(self, r, ratios, zero_sums):
+        """
+        Computes the next iterate given the ratios applied along each axis during a RAS iteration (which were
+        already applied to r) and updates r accordingly.
+        """
+        num_slices = len(r)
+        # residual G(x) - x (sums which are zero have no scaling factor)
+        f = np.concatenate([np.log(np.where(zero_sum, 1, ratio)).reshape(num_slices, -1)
+                            for ratio, zero_sum in zip(ratios, zero_sums)], axis=1)
+        g = np.concatenate([log_factor.reshape(num_slices, -1) for log_factor in self.log_factors], axis=1) + f
+        if self.prev_g is not None:
+            idx = self.num_steps % self.depth
+            self.dg[:, idx] = g - self.prev_g
+            self.df[:, idx] = f - self.prev_f
+            self.num_steps += 1
+        norm = np.sqrt((f * f).sum(axis=1))
+        diverging = norm > self.prev_norm
+        self.dg[diverging] = 0
+        self.df[diverging] = 0
+        self.prev_g, self.prev_f, self.prev_norm = g, f, norm
+
+        if self.num_steps:
+            m = min(self.num_steps, self.depth)
+            df, dg = self.df[:, :m], self.dg[:, :m]
+            lhs = np.einsum('sip,sjp->sij', df, df)
+            rhs = np.einsum('sip,sp->si', df, f)
+            # regularize the (possibly singular) normal equations
+            reg = 1e-10 * np.trace(lhs, axis1=1, axis2=2) / m + np.finfo(np.float64).tiny
+            lhs += reg[:, None, None] * np.eye(m)
+            gamma = np.linalg.solve(lhs, rhs[..., None])[..., 0]
+            correction = -np.einsum('sip,si->sp', dg, gamma)
+        else:
+            correction = None
+
+        start = 0
+        for log_factor in self.log_factors:
+            size = log_factor[0].size
+            log_factor[:] = g[:, start:start + size].reshape(log_factor.shape)
+            if correction is not None:
+                axis_correction = correction[:, start:start + size].reshape(log_factor.shape)
+                log_factor += axis_correction
+                r *= np.exp(axis_correction)
+            start += size
+        return r
+
+
+def _fit_sparse(values, segments, targets, maxiter, threshold, stepstoabort, display_progress, check_every=1,
+                callback=None, start_time=None):
+    """
+    Fits the non zero values of a sparse seed in place. segments contains, for each axis, the position in the
+    (flattened) target of each value, so that sums along that axis are segment sums (computed with np.bincount).
+
+    Returns the same results as _fit_slices for a single slice.
+    """
+    if start_time is None:
+        start_time = default_timer()
+    history = {}
+    axis_times = np.zeros(len(segments))
+    # the previous values are only needed to compute the cell differences passed to the callback
+    prev_values = np.empty_like(values) if callback is not None else None
+    # buffers for the ratio of each value and the ratio (and zero sums) along each axis (sums computed by np.bincount
+    # are always float64)
+    values_ratio = np.empty_like(values)
+    ratios = [np.empty(len(axis_target), dtype=np.result_type(axis_target.dtype, np.float64))
+              for axis_target in targets]
+    zero_sums = [np.empty(len(axis_target), dtype=bool) for axis_target in targets]
+
+    def axis_sum(segment, target):
+        return np.bincount(segment, weights=values, minlength=len(target))
+
+    def divnot0(axis_target, axis_sum, out, zero_sum):
+        # same as axis_target.divnot0(axis_sum) but in place
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.true_divide(axis_target, axis_sum, out=out)
+        np.equal(axis_sum, 0, out=zero_sum)
+        np.copyto(out, 0, where=zero_sum)
+        return out
+
+    lastdiffs = np.full(stepstoabort, np.nan)
+    max_sum_diff = np.nan
+    num_checks = 0
+    for i in range(maxiter):
+        check = not (i + 1) % check_every or i == maxiter - 1
+        if check and prev_values is not None:
+            np.copyto(prev_values, values)
+        for k, (segment, axis_target) in enumerate(zip(segments, targets)):
+            axis_start = default_timer()
+            ratio = divnot0(axis_target, axis_sum(segment, axis_target), ratios[k], zero_sums[k])
+            np.take(ratio, segment, out=values_ratio)
+            values *= values_ratio
+            axis_times[k] += default_timer() - axis_start
+
+        if not check:
+            continue
+
+        max_sum_diff = max(abs(axis_sum(segment, axis_target) - axis_target).max()
+                           for segment, axis_target in zip(segments, targets))
+        history[i] = max_sum_diff
+        if callback is not None:
+            np.subtract(values, prev_values, out=prev_values)
+            np.absolute(prev_values, out=prev_values)
+            callback(i, prev_values.max() if len(values) else 0.0, max_sum_diff, default_timer() - start_time)
+
+        if (lastdiffs == max_sum_diff).all():
+            return np.array([i + 1]), np.array([max_sum_diff]), np.array([_NO_IMPROVEMENT]), history, axis_times
         if max_sum_diff < threshold:
             if display_progress:
                 print("acceptable max(abs(sum - target_sum)) found at iteration {}: {} < threshold ({})"
                       .format(i, f2str(max_sum_diff), threshold))
-            return r
+            return np.array([i + 1]), np.array([max_sum_diff]), np.array([_CONVERGED]), history, axis_times
+        lastdiffs[num_checks % stepstoabort] = max_sum_diff
+        num_checks += 1
+    return np.array([maxiter]), np.array([max_sum_diff]), np.array([_MAXITER]), history, axis_times
 
-        lastdiffs.append(max_sum_diff)
 
-    if no_convergence in {'warn', 'raise'}:
-        warn_or_raise(no_convergence, "maximum iteration reached ({})".format(maxiter))
-    return r
+def _fit_slices(r, targets, axes_idx, maxiter, threshold, stepstoabort, display_progress, method='ras',
+                check_every=1, callback=None, start_time=None, first_axis_sum=None):
+    """
+    Fits r in place. The first dimension of r and targets represents independent slices, which are frozen as soon
+    as they converge (or stop improving). Convergence is only checked every `check_every` iterations, after which
+    callback (if any) is called. If given, first_axis_sum is used instead of the sum of r along the first axis for
+    the first iteration.
+
+    Returns
+    -------
+    iterations : ndarray of int
+        Number of iterations done for each slice.
+    max_sum_diffs : ndarray
+        Maximum absolute difference between the sums and the targets for each slice.
+    status : ndarray of int
+        _CONVERGED, _NO_IMPROVEMENT or _MAXITER for each slice.
+    history : dict
+        {iteration: maximum of max_sum_diffs over the slices which were still fitted} for each check.
+    axis_times : ndarray
+        Time spent scaling along each axis.
+    """
+    if start_time is None:
+        start_time = default_timer()
+    num_slices = len(r)
+    history = {}
+    axis_times = np.zeros(len(axes_idx))
+    iterations = np.full(num_slices, maxiter, dtype=int)
+    max_sum_diffs = np.full(num_slices, np.nan)
+    status = np.full(num_slices, _MAXITER, dtype=int)
+    # positions in r of the slices which are still being fitted
+    active = np.arange(num_slices)
+    res = r
+
+    # all intermediate results are stored in buffers allocated once (they are only reallocated, smaller, when some
+    # slices are frozen)
+    def allocate_buffers(r):
+        axes_sum = [np.sum(r, axis=axis_idx, keepdims=True) for axis_idx in axes_idx]
+        ratios = [np.empty_like(axis_sum) for axis_sum in axes_sum]
+        zero_sums = [np.empty_like(axis_sum, dtype=bool) for axis_sum in axes_sum]
+        sum_diffs = [np.empty_like(axis_sum) for axis_sum in axes_sum]
+        # the fitted values alternate between two buffers so that the cell differences between two iterations can
+        # be computed without copying the values
+        return np.empty_like(r), axes_sum, ratios, zero_sums, sum_diffs
+
+    def divnot0(axis_target, axis_sum, out, zero_sum):
+        # same as axis_target.divnot0(axis_sum) but in place
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.true_divide(axis_target, axis_sum, out=out)
+        np.equal(axis_sum, 0, out=zero_sum)
+        np.copyto(out, 0, where=zero_sum)
+        return out
+
+    def slices_max(array):
+        return array.reshape(len(array), -1).max(axis=1)
+
+    prev_r, axes_sum, ratios, zero_sums, sum_diffs = allocate_buffers(r)
+    if first_axis_sum is not None:
+        axes_sum[0][...] = first_axis_sum
+    mixer = _AndersonMixer([axis_sum.shape for axis_sum in axes_sum]) if method == 'anderson' else None
+    lastdiffs = np.full((stepstoabort, num_slices), np.nan)
+    max_sum_diff = np.full(num_slices, np.nan)
+    num_checks = 0
+    for i in range(maxiter):
+        r, prev_r = prev_r, r
+        for k, axis_idx in enumerate(axes_idx):
+            axis_start = default_timer()
+            # the sum along the first axis was computed at the end of the previous iteration
+            if k:
+                np.sum(r, axis=axis_idx, keepdims=True, out=axes_sum[k])
+            np.multiply(r if k else prev_r, divnot0(targets[k], axes_sum[k], ratios[k], zero_sums[k]), out=r)
+            axis_times[k] += default_timer() - axis_start
+        if mixer is not None:
+            mixer.step(r, ratios, zero_sums)
+
+        if (i + 1) % check_every and i < maxiter - 1:
+            # only compute the sum needed by the next iteration
+            np.sum(r, axis=axes_idx[0], keepdims=True, out=axes_sum[0])
+            continue
+
+        for axis_idx, axis_target, axis_sum, sum_diff in zip(axes_idx, targets, axes_sum, sum_diffs):
+            np.sum(r, axis=axis_idx, keepdims=True, out=axis_sum)
+            np.subtract(axis_sum, axis_target, out=sum_diff)
+            np.absolute(sum_diff, out=sum_diff)
+        max_sum_diff = slices_max(sum_diffs[0])
+        for sum_diff in sum_diffs[1:]:
+            np.maximum(max_sum_diff, slices_max(sum_diff), out=max_sum_diff)
+
+        history[i] = max_sum_diff.max()
+        if callback is not None:
+            # the previous values are not needed anymore
+            np.subtract(r, prev_r, out=prev_r)
+            np.absolute(prev_r, out=prev_r)
+            callback(i, prev_r.max(), history[i], default_timer() - start_time)
+
+        no_improvement = (lastdiffs == max_sum_diff).all(axis=0)
+        converged = ~no_improvement & (max_sum_diff < threshold)
+        done = no_improvement | converged
+        if done.any():
+            if display_progress and converged.any():
+                if num_slices == 1:
+                    print("acceptable max(abs(sum - target_sum)) found at iteration {}: {} < threshold ({})"
+                          .format(i, f2str(max_sum_diff[0]), threshold))
+                else:
+                    print("acceptable max(abs(sum - target_sum)) found at iteration {} for {} slice(s) ({} left)"
+                          .format(i, converged.sum(), (~done).sum()))
+            done_slices = active[done]
+            iterations[done_slices] = i + 1
+            max_sum_diffs[done_slices] = max_sum_diff[done]
+            status[done_slices] = np.where(converged[done], _CONVERGED, _NO_IMPROVEMENT)
+            if done.all():
+                if r is not res:
+                    res[active] = r
+                return iterations, max_sum_diffs, status, history, axis_times
+            # freeze the slices which are done and only keep fitting the others
+            res[done_slices] = r[done]
+            keep = ~done
+            active = active[keep]
+            r = r[keep]
+            targets = [axis_target[keep] for axis_target in targets]
+            first_axis_sum = axes_sum[0][keep]
+            prev_r, axes_sum, ratios, zero_sums, sum_diffs = allocate_buffers(r)
+            axes_sum[0] = first_axis_sum
+            lastdiffs = lastdiffs[:, keep]
+            max_sum_diff = max_sum_diff[keep]
+            if mixer is not None:
+                mixer.compact(keep)
+
+        lastdiffs[num_checks % stepstoabort] = max_sum_diff
+        num_checks += 1
+
+    max_sum_diffs[active] = max_sum_diff
+    if r is not res:
+        res[active] = r
+    return iterations, max_sum_diffs, status, history, axis_times
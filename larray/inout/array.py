@@ -75,7 +75,7 @@ def cartesian_product_df(df, sort_rows=False, sort_columns=False, **kwargs):
     return df.reindex(new_index, columns, **kwargs), labels
 
 
-def from_series(s, sort_rows=False):
+def from_series(s, sort_rows=False, axis_pool=None):
     """
     Converts Pandas Series into 1D LArray.
 
@@ -85,6 +85,9 @@ def from_series(s, sort_rows=False):
         Input Pandas Series.
     sort_rows : bool, optional
         Whether or not to sort the rows alphabetically. Defaults to False.
+    axis_pool : AxisPool, optional
+        Pool of axes in which the axes of the output array are interned, so that they are shared with other arrays
+        loaded using the same pool. Defaults to None (do not share axes).
 
     Returns
     -------
@@ -95,10 +98,14 @@ def from_series(s, sort_rows=False):
         name = str(name)
     if sort_rows:
         s = s.sort_index()
-    return LArray(s.values, Axis(s.index.values, name))
+    axis = Axis(s.index.values, name)
+    if axis_pool is not None:
+        axis = axis_pool.intern(axis)
+    return LArray(s.values, axis)
 
 
-def from_frame(df, sort_rows=False, sort_columns=False, parse_header=False, unfold_last_axis_name=False, **kwargs):
+def from_frame(df, sort_rows=False, sort_columns=False, parse_header=False, unfold_last_axis_name=False,
+               axis_pool=None, **kwargs):
     """
     Converts Pandas DataFrame into LArray.
 
@@ -118,6 +125,9 @@ def from_frame(df, sort_rows=False, sort_columns=False, parse_header=False, unfo
     unfold_last_axis_name : bool, optional
         Whether or not to extract the names of the last two axes by splitting the name of the last index column of the
         dataframe using ``\\``. Defaults to False.
+    axis_pool : AxisPool, optional
+        Pool of axes in which the axes of the output array are interned, so that they are shared with other arrays
+        loaded using the same pool. Defaults to None (do not share axes).
 
     Returns
     -------
@@ -182,11 +192,14 @@ def from_frame(df, sort_rows=False, sort_columns=False, parse_header=False, unfo
                   for name in axes_names]
 
     axes = [Axis(labels, name) for labels, name in zip(axes_labels, axes_names)]
+    if axis_pool is not None:
+        axes = [axis_pool.intern(axis) for axis in axes]
     data = df.values.reshape([len(axis) for axis in axes])
     return LArray(data, axes)
 
 
-def df_aslarray(df, sort_rows=False, sort_columns=False, raw=False, parse_header=True, wide=True, **kwargs):
+def df_aslarray(df, sort_rows=False, sort_columns=False, raw=False, parse_header=True, wide=True, axis_pool=None,
+                **kwargs):
     """
     Prepare Pandas DataFrame and then convert it into LArray.
 
@@ -209,6 +222,9 @@ def df_aslarray(df, sort_rows=False, sort_columns=False, raw=False, parse_header
         Whether or not to assume the array is stored in "wide" format.
         If False, the array is assumed to be stored in "narrow" format: one column per axis plus one value column.
         Defaults to True.
+    axis_pool : AxisPool, optional
+        Pool of axes in which the axes of the output array are interned, so that they are shared with other arrays
+        loaded using the same pool. Defaults to None (do not share axes).
 
     Returns
     -------
@@ -252,7 +268,7 @@ def df_aslarray(df, sort_rows=False, sort_columns=False, raw=False, parse_header
                 series.name = series.index.name
                 if sort_rows:
                     raise ValueError('sort_rows=True is not valid for 1D arrays. Please use sort_columns instead.')
-                return from_series(series, sort_rows=sort_columns)
+                return from_series(series, sort_rows=sort_columns, axis_pool=axis_pool)
 
     # handle 1D
     if len(df) == 1 and (pd.isnull(df.index.values[0]) or
@@ -263,12 +279,12 @@ def df_aslarray(df, sort_rows=False, sort_columns=False, raw=False, parse_header
         series.name = df.index.name
         if sort_rows:
             raise ValueError('sort_rows=True is not valid for 1D arrays. Please use sort_columns instead.')
-        return from_series(series, sort_rows=sort_columns)
+        return from_series(series, sort_rows=sort_columns, axis_pool=axis_pool)
     else:
         axes_names = [decode(name, 'utf8') for name in df.index.names]
         unfold_last_axis_name = isinstance(axes_names[-1], basestring) and '\\' in axes_names[-1]
         return from_frame(df, sort_rows=sort_rows, sort_columns=sort_columns, parse_header=parse_header,
-                          unfold_last_axis_name=unfold_last_axis_name, **kwargs)
+                          unfold_last_axis_name=unfold_last_axis_name, axis_pool=axis_pool, **kwargs)
 
 
 def _get_index_col(nb_axes=None, index_col=None, wide=True):
@@ -288,7 +304,7 @@ def _get_index_col(nb_axes=None, index_col=None, wide=True):
 
 @deprecate_kwarg('nb_index', 'nb_axes', arg_converter=lambda x: x + 1)
 def read_csv(filepath_or_buffer, nb_axes=None, index_col=None, sep=',', headersep=None, fill_value=np.nan,
-             na=np.nan, sort_rows=False, sort_columns=False, wide=True, dialect='larray', **kwargs):
+             na=np.nan, sort_rows=False, sort_columns=False, wide=True, dialect='larray', axis_pool=None, **kwargs):
     """
     Reads csv file and returns an array with the contents.
 
@@ -331,6 +347,9 @@ def read_csv(filepath_or_buffer, nb_axes=None, index_col=None, sep=',', headerse
         Defaults to True.
     dialect : 'classic' | 'larray' | 'liam2', optional
         Name of dialect. Defaults to 'larray'.
+    axis_pool : AxisPool, optional
+        Pool of axes in which the axes of the output array are interned, so that they are shared with other arrays
+        loaded using the same pool. Defaults to None (do not share axes).
     **kwargs
 
     Returns
@@ -437,7 +456,8 @@ def read_csv(filepath_or_buffer, nb_axes=None, index_col=None, sep=',', headerse
         df.index.names = combined_axes_names.split(headersep)
         raw = False
 
-    return df_aslarray(df, sort_rows=sort_rows, sort_columns=sort_columns, fill_value=fill_value, raw=raw, wide=wide)
+    return df_aslarray(df, sort_rows=sort_rows, sort_columns=sort_columns, fill_value=fill_value, raw=raw, wide=wide,
+                       axis_pool=axis_pool)
 
 
 def read_tsv(filepath_or_buffer, **kwargs):
@@ -463,7 +483,8 @@ def read_eurostat(filepath_or_buffer, **kwargs):
     return read_csv(filepath_or_buffer, sep='\t', headersep=',', **kwargs)
 
 
-def read_hdf(filepath_or_buffer, key, fill_value=np.nan, na=np.nan, sort_rows=False, sort_columns=False, **kwargs):
+def read_hdf(filepath_or_buffer, key, fill_value=np.nan, na=np.nan, sort_rows=False, sort_columns=False,
+             axis_pool=None, **kwargs):
     """Reads an array named key from a HDF5 file in filepath (path+name)
 
     Parameters
@@ -480,6 +501,9 @@ def read_hdf(filepath_or_buffer, key, fill_value=np.nan, na=np.nan, sort_rows=Fa
     sort_columns : bool, optional
         Whether or not to sort the columns alphabetically (sorting is more efficient than not sorting).
         Defaults to False.
+    axis_pool : AxisPool, optional
+        Pool of axes in which the axes of the output array are interned, so that they are shared with other arrays
+        loaded using the same pool. Defaults to None (do not share axes).
 
     Returns
     -------
@@ -492,7 +516,8 @@ def read_hdf(filepath_or_buffer, key, fill_value=np.nan, na=np.nan, sort_rows=Fa
 
     key = _translate_key_hdf(key)
     df = pd.read_hdf(filepath_or_buffer, key, **kwargs)
-    return df_aslarray(df, sort_rows=sort_rows, sort_columns=sort_columns, fill_value=fill_value, parse_header=False)
+    return df_aslarray(df, sort_rows=sort_rows, sort_columns=sort_columns, fill_value=fill_value, parse_header=False,
+                       axis_pool=axis_pool)
 
 
 @deprecate_kwarg('nb_index', 'nb_axes', arg_converter=lambda x: x + 1)
@@ -2,6 +2,7 @@ from __future__ import absolute_import, division, print_function
 
 import os
 import sys
+import weakref
 from unittest import TestCase
 
 import pytest
@@ -14,10 +15,12 @@ except ImportError:
     xw = None
 
 from larray.tests.common import inputpath, assert_array_equal, assert_array_nan_equal, assert_larray_equiv
-from larray import (LArray, Axis, LGroup, union, zeros, zeros_like, ndtest, ones, eye, diag, stack,
-                    clip, exp, where, X, mean, isnan, round, read_hdf, read_csv, read_eurostat, read_excel,
-                    from_lists, from_string, open_excel, from_frame, sequence, nan_equal)
+from larray import (LArray, Axis, AxisCollection, LGroup, union, zeros, zeros_like, ndtest, ones, eye, diag, stack,
+                    clip, exp, where, X, sum, mean, min, max, isnan, round, read_hdf, read_csv, read_eurostat,
+                    read_excel, from_lists, from_string, open_excel, from_frame, sequence, nan_equal, set_num_threads,
+                    get_num_threads, maximum, lazy, set_broadcast_cache_size, clear_broadcast_cache)
 from larray.inout.array import from_series
+from larray.core.array import _broadcast_plans
 from larray.core.axis import _to_ticks, _to_key
 from larray.util.misc import StringIO
 
@@ -960,6 +963,127 @@ age    0       1       2       3       4       5       6       7        8  ...
         with pytest.raises(ValueError, match="incompatible axes:"):
             la[:] = la2
 
+    def test_getitem_setitem_orthogonal(self):
+        arr = ndtest((4, 5, 6, 3))
+        raw = arr.data
+        a, b, c, d = arr.axes
+
+        # several lists, slices and scalars
+        res = arr[a['a0', 'a2', 'a3'], b['b1':'b3'], c['c5', 'c0'], 'd1']
+        assert res.axes.names == ['a', 'b', 'c']
+        assert_array_equal(res, raw[np.ix_([0, 2, 3], [1, 2, 3], [5, 0], [1])][..., 0])
+        res = arr['a1', b['b4', 'b0'], c['c1':'c4'], d['d2', 'd0']]
+        assert res.axes.names == ['b', 'c', 'd']
+        assert_array_equal(res, raw[np.ix_([1], [4, 0], [1, 2, 3, 4], [2, 0])][0])
+        # repeated labels and empty lists
+        assert arr.i[[1, 1, 1], :, [0, 2]].shape == (3, 5, 2, 3)
+        assert arr.i[[], :, [0, 2]].shape == (0, 5, 2, 3)
+
+        # setting a scalar, a raw array and an array with axes in another order
+        arr = arr.copy()
+        raw = arr.data
+        key = a['a0', 'a2', 'a3'], 'b1', c['c5', 'c0'], d['d2', 'd0']
+        raw_key = np.ix_([0, 2, 3], [1], [5, 0], [2, 0])
+        arr[key] = -1
+        assert (raw[raw_key] == -1).all()
+        value = np.arange(12).reshape(3, 2, 2)
+        arr[key] = value
+        assert_array_equal(raw[raw_key][:, 0], value)
+        arr[key] = arr[key].transpose('d', 'a', 'c') * 10
+        assert_array_equal(raw[raw_key][:, 0], value * 10)
+        # value broadcasted along the a axis
+        arr[key] = ndtest([d['d2', 'd0'], c['c5', 'c0']])
+        assert_array_equal(raw[raw_key][:, 0], np.broadcast_to([[0, 2], [1, 3]], (3, 2, 2)))
+        # whole array was not touched outside the subset
+        assert arr['a1'].equals(ndtest((4, 5, 6, 3))['a1'])
+
+    def test_getitem_setitem_scalar(self):
+        arr = ndtest((Axis('nat=BE,FO'), Axis('sex=M,F'), Axis('time=2013..2015'), Axis(range(3), 'age')))
+        raw = arr.data
+
+        # one label per axis, in any order
+        assert arr['FO', 'F', 2014, 2] == raw[1, 1, 1, 2]
+        assert arr[2014, 2, 'F', 'FO'] == raw[1, 1, 1, 2]
+        assert arr.get_value('FO', 'F', 2014, 2) == raw[1, 1, 1, 2]
+        assert arr.get_value(2, 'FO', sex='F', time=2014) == raw[1, 1, 1, 2]
+
+        arr = arr.copy()
+        raw = arr.data
+        arr['BE', 'M', 2015, 0] = -1
+        assert raw[0, 0, 2, 0] == -1
+        arr.set_value(-2, 'BE', 'M', age=1, time=2013)
+        assert raw[0, 0, 0, 1] == -2
+
+        # ambiguous or invalid labels give the same errors as the generic path
+        ambiguous = ndtest((Axis('a=0,1'), Axis('b=1,2')))
+        with pytest.raises(ValueError, match="1 is ambiguous"):
+            ambiguous[0, 1]
+        with pytest.raises(ValueError, match="1 is ambiguous"):
+            ambiguous.get_value(0, 1)
+        assert ambiguous.get_value(0, b=1) == 0
+        assert ambiguous[0, ambiguous.b[1]] == 0
+        with pytest.raises(ValueError, match="2016 is not a valid label for any axis"):
+            arr['BE', 'M', 2016, 0]
+        with pytest.raises(ValueError, match="2016 is not a valid label for any axis"):
+            arr['BE', 'M', 2016, 0] = 0
+        # 0 is not matched against False or 0.0
+        bools = ndtest(Axis([False, True], 'b'))
+        with pytest.raises(ValueError, match="0 is not a valid label for any axis"):
+            bools[0]
+        # several labels of the same axis
+        with pytest.raises(ValueError, match="key has several values for axis: time"):
+            arr.get_value('BE', 'M', 2015, 0, time=2013)
+        with pytest.raises(ValueError, match="does not select a single value"):
+            arr.get_value('BE', 'M', 2015)
+
+    def test_get_set_values(self):
+        arr = ndtest((Axis('sex=M,F'), Axis('age=0..3'), Axis('region=R0,R1,R2')))
+        raw = arr.data
+        sex = np.array(['F', 'M', 'F', 'F'])
+        age = np.array([3, 0, 1, 3])
+        region = np.array(['R2', 'R0', 'R1', 'R2'], dtype=object)
+        expected = raw[[1, 0, 1, 1], [3, 0, 1, 3], [2, 0, 1, 2]]
+
+        # positional keys in axis order, keys by axis name and string labels with object dtype
+        assert_array_equal(arr.get_values(sex, age, region), expected)
+        assert_array_equal(arr.get_values(region=region, sex=sex, age=age), expected)
+        assert_array_equal(arr.get_values(sex, age=age, region=region), expected)
+        # scalars and multi-dimensional keys are broadcasted
+        assert_array_equal(arr.get_values('F', age, 'R2'), raw[1, [3, 0, 1, 3], 2])
+        assert arr.get_values(sex.reshape(2, 2), age.reshape(2, 2), 'R0').shape == (2, 2)
+
+        # LArray keys
+        ids = Axis(4, 'id')
+        res = arr.get_values(LArray(sex, ids), LArray(age, ids), region=LArray(region, ids))
+        assert res.axes == AxisCollection([ids])
+        assert_array_equal(res, expected)
+        res = arr.get_values(LArray(sex, ids), ndtest(3), region='R1')
+        assert res.axes.names == ['id', 'a']
+        assert_array_equal(res, raw[np.ix_([1, 0, 1, 1], [0, 1, 2], [1])][..., 0])
+        # empty keys
+        assert arr.get_values('F', [], 'R0').shape == (0,)
+
+        # errors
+        with pytest.raises(ValueError, match=r"'X' is not valid label\(s\) for the sex axis"):
+            arr.get_values(['F', 'X'], age[:2], region[:2])
+        # keys with another dtype than the axis keep the original error
+        with pytest.raises(KeyError):
+            arr.get_values('F', [1., 2.], 'R0')
+        with pytest.raises(ValueError, match="no key given for axis region"):
+            arr.get_values(sex, age)
+        with pytest.raises(ValueError, match="several keys given for axis sex"):
+            arr.get_values(sex, age, region, sex=sex)
+
+        # set_values
+        arr = zeros(arr.axes, dtype=int)
+        arr.set_values([1, 2, 3, 4], sex, age, region)
+        assert arr.sum() == 9
+        assert arr['F', 3, 'R2'] == 4
+        assert arr['M', 0, 'R0'] == 2
+        arr.set_values(LArray([5, 6, 7, 8], ids), LArray(sex, ids), LArray(age, ids), region='R1')
+        assert arr['F', 1, 'R1'] == 7
+        assert arr['F', 3, 'R1'] == 8
+
     def test_setitem_ndarray(self):
         """
         tests LArray.__setitem__(key, value) where value is a raw ndarray.
@@ -1672,6 +1796,161 @@ age    0       1       2       3       4       5       6       7        8  ...
                                    , 1, 2""", sep=',')
         assert_array_equal(b.sum('b1:'), expected)
 
+    def test_group_agg_contiguous_groups(self):
+        arr = ndtest((10, 3), dtype=float)
+        arr['a3', 'b1'] = np.nan
+        raw = arr.data
+        a = arr.a
+        # adjacent, unordered, overlapping and single label groups, a group ending at the last label
+        groups = (a['a0':'a2'], a['a5', 'a6'], a['a3':'a5'], a['a1':'a8'], a.i[4], a['a7':])
+        slices = [slice(0, 3), slice(5, 7), slice(3, 6), slice(1, 9), slice(4, 5), slice(7, 10)]
+        for method, func in [('sum', np.nansum), ('prod', np.nanprod), ('min', np.nanmin), ('max', np.nanmax),
+                             ('mean', np.nanmean)]:
+            res = getattr(arr, method)(groups)
+            assert res.shape == (6, 3)
+            assert_array_nan_equal(res, [func(raw[s], axis=0) for s in slices])
+            res = getattr(arr, method)(groups, skipna=False)
+            assert_array_nan_equal(res, [getattr(np, method)(raw[s], axis=0) for s in slices])
+
+        # several groups ending at the last label
+        res = arr.sum((a['a5':], a['a8':]))
+        assert_array_equal(res, [np.nansum(raw[5:], axis=0), np.nansum(raw[8:], axis=0)])
+
+        # integer and boolean arrays
+        int_arr = ndtest((10, 3))
+        assert_array_equal(int_arr.sum(groups), [int_arr.data[s].sum(axis=0) for s in slices])
+        assert_array_equal(int_arr.mean(groups), [int_arr.data[s].mean(axis=0) for s in slices])
+        bool_arr = int_arr % 4 == 1
+        res = bool_arr.sum(groups)
+        assert res.dtype.kind == 'i'
+        assert_array_equal(res, [bool_arr.data[s].sum(axis=0) for s in slices])
+        assert_array_equal(bool_arr.mean(groups), [bool_arr.data[s].mean(axis=0) for s in slices])
+        assert_array_equal(bool_arr.any(groups), [bool_arr.data[s].any(axis=0) for s in slices])
+        assert_array_equal(bool_arr.all(groups), [bool_arr.data[s].all(axis=0) for s in slices])
+
+    def test_group_agg_overlapping_groups(self):
+        arr = ndtest((3, 8), dtype=float)
+        arr['a1', 'b2'] = np.nan
+        raw = arr.data
+        b = arr.b
+        groups = (b['b0', 'b2', 'b4'], b['b2', 'b5', 'b6', 'b7'], b['b1', 'b0'], b.i[[3, 5]])
+        indices = [[0, 2, 4], [2, 5, 6, 7], [1, 0], [3, 5]]
+        for method in ['sum', 'mean', 'prod', 'min', 'max']:
+            res = getattr(arr, method)(groups)
+            assert res.axes.b.name == 'b'
+            assert res.shape == (3, 4)
+            nanfunc = getattr(np, 'nan' + method)
+            assert_array_nan_equal(res, np.stack([nanfunc(raw[:, idx], axis=1) for idx in indices], axis=1))
+            res = getattr(arr, method)(groups, skipna=False)
+            func = getattr(np, method)
+            assert_array_nan_equal(res, np.stack([func(raw[:, idx], axis=1) for idx in indices], axis=1))
+
+        # infinite values
+        arr['a0', 'b7'] = np.inf
+        assert_array_nan_equal(arr.sum(groups),
+                               np.stack([np.nansum(arr.data[:, idx], axis=1) for idx in indices], axis=1))
+
+        int_arr = ndtest((3, 8))
+        res = int_arr.sum(groups)
+        assert res.dtype.kind == 'i'
+        assert_array_equal(res, np.stack([int_arr.data[:, idx].sum(axis=1) for idx in indices], axis=1))
+        assert_array_equal(int_arr.mean(groups),
+                           np.stack([int_arr.data[:, idx].mean(axis=1) for idx in indices], axis=1))
+        bool_arr = int_arr % 3 == 1
+        for method in ['sum', 'mean', 'all', 'any']:
+            res = getattr(bool_arr, method)(groups)
+            func = getattr(np, method)
+            assert_array_equal(res, np.stack([func(bool_arr.data[:, idx], axis=1) for idx in indices], axis=1))
+
+        # empty group
+        res = arr.sum((b['b0', 'b2'], b[[]]))
+        assert_array_nan_equal(res, np.stack([np.nansum(arr.data[:, [0, 2]], axis=1), np.zeros(3)], axis=1))
+
+    def test_aggregate_by_mapping(self):
+        arr = ndtest((2, 6), dtype=float)
+        arr['a1', 'b3'] = np.nan
+        mapping = LArray(['c1', 'c0', 'c1', 'c1', 'c2', 'c0'], arr.b)
+        groups = (arr.b['b0', 'b2', 'b3'] >> 'c1', arr.b['b1', 'b5'] >> 'c0', arr.b['b4'] >> 'c2')
+        for op in (sum, mean, min, max):
+            res = arr.aggregate_by_mapping(mapping, op=op)
+            assert res.axes.b.equals(Axis(['c1', 'c0', 'c2'], 'b'))
+            expected = op(arr, groups)
+            assert_array_nan_equal(res, expected.data)
+        res = arr.aggregate_by_mapping(mapping, skipna=False)
+        assert_array_nan_equal(res, arr.sum(groups, skipna=False).data)
+
+        # explicit target labels and name, mapping in another order
+        res = arr.aggregate_by_mapping(mapping[['b5', 'b4', 'b3', 'b2', 'b1', 'b0']], labels=['c0', 'c1', 'c2', 'c3'],
+                                       name='c')
+        assert res.axes.c.equals(Axis(['c0', 'c1', 'c2', 'c3'], 'c'))
+        assert_array_nan_equal(res, [[6, 5, 4, 0], [18, 14, 10, 0]])
+
+        # boolean and integer arrays
+        int_arr = ndtest((2, 6))
+        assert_array_equal(int_arr.aggregate_by_mapping(mapping), int_arr.sum(groups).data)
+        bool_arr = int_arr % 2 == 0
+        res = bool_arr.aggregate_by_mapping(mapping)
+        assert res.dtype.kind == 'i'
+        assert_array_equal(res, [[2, 0, 1], [2, 0, 1]])
+
+        with pytest.raises(ValueError):
+            arr.aggregate_by_mapping(mapping, op=np.sum)
+
+    def test_agg_threads(self):
+        import larray.core.array
+        arr = ndtest((7, 5, 11), dtype=float)
+        arr['a1', 'b2', 'c3'] = np.nan
+        min_size = larray.core.array._parallel_min_size
+        larray.core.array._parallel_min_size = 0
+        try:
+            for method in ['sum', 'prod', 'min', 'max', 'mean', 'var', 'std']:
+                func = getattr(arr, method)
+                # results of min and max do not depend on the number of threads
+                rtol = 0 if method in ('min', 'max') else 1e-12
+                for axes in [('b',), ('a', 'c'), ('c',)]:
+                    expected = func(*axes)
+                    for threads in (2, 3, 16):
+                        res = func(*axes, threads=threads)
+                        assert expected.equals(res, rtol=rtol, nan_equals=True)
+                        # deterministic for a given number of threads
+                        assert res.equals(func(*axes, threads=threads), nan_equals=True)
+                    assert func(*axes, keepaxes=True).equals(func(*axes, threads=2, keepaxes=True), rtol=rtol,
+                                                             nan_equals=True)
+                by_func = getattr(arr, method + '_by')
+                assert by_func('b').equals(by_func('b', threads=4), rtol=rtol, nan_equals=True)
+
+            out = zeros((arr.a, arr.c))
+            arr.sum('b', threads=3, out=out)
+            assert_array_nan_equal(out, arr.sum('b'))
+
+            previous = set_num_threads(4)
+            try:
+                assert get_num_threads() == 4
+                assert arr.sum('b').equals(arr.sum('b', threads=1), nan_equals=True)
+            finally:
+                set_num_threads(previous)
+            with pytest.raises(ValueError):
+                set_num_threads(0)
+        finally:
+            larray.core.array._parallel_min_size = min_size
+
+    def test_group_agg_several_axes_order(self):
+        arr = ndtest((10, 4, 6))
+        a_groups = (arr.a['a0':'a4'], arr.a['a5':])
+        b_groups = (arr.b['b0', 'b1'], arr.b['b2', 'b3'], arr.b['b1', 'b3'])
+        c_group = arr.c['c1':'c3']
+        # the largest reduction is done first but the order of axes of the result is unchanged
+        items = arr._sort_group_aggregates([b_groups, a_groups, c_group])
+        assert items[0] is c_group and items[1] is a_groups and items[2] is b_groups
+        res = arr.sum(b_groups, a_groups, c_group)
+        assert res.shape == (2, 3)
+        expected = arr.sum(b_groups).sum(a_groups).sum(c_group)
+        assert_array_equal(res, expected)
+        # items on the same axis are not reordered
+        a_group = arr.a['a0':'a2']
+        items = arr._sort_group_aggregates([a_groups, a_group, c_group])
+        assert items[0] is a_groups and items[1] is a_group and items[2] is c_group
+
     # TODO: fix this (and add other tests for references (x.) to anonymous axes
     # def test_group_agg_anonymous_axis_ref(self):
     #     la = ndtest([Axis(2), Axis(3)])
@@ -2286,6 +2565,130 @@ age    0       1       2       3       4       5       6       7        8  ...
             # ValueError: operands could not be broadcast together with shapes (2,3) (2,)
             np.asarray(a) * np.asarray(c)
 
+    def test_binary_ops_broadcast_plan(self):
+        arr = ndtest((2, 3))
+        other = ndtest(Axis(['b0', 'b1', 'b2'], 'b'))
+        # the second time uses the cached plan
+        for _ in range(2):
+            res = arr * other
+            assert res.axes == arr.axes
+            assert_array_equal(res, arr.data * other.data)
+            res = other * arr
+            assert res.axes == AxisCollection([arr.b, arr.a])
+            assert_array_equal(res, (arr.data * other.data).T)
+        # results do not share their axes collection
+        assert (arr * other).axes is not (arr * other).axes
+        # replacing the labels of an axis in place is taken into account
+        other.axes.b.labels = ['x0', 'x1', 'x2']
+        with pytest.raises(ValueError):
+            arr * other
+        # as well as resizing a wildcard (or range) axis in place
+        arr = ones((Axis(3, 'a'), Axis(range(2), 'b')))
+        other = ones((Axis(3, 'a'), Axis(range(2), 'b')))
+        assert_array_equal(arr + other, arr.data * 2)
+        other.axes.a.labels = 2
+        with pytest.raises(ValueError):
+            arr + other
+        other = ones((Axis(3, 'a'), Axis(range(2), 'b')))
+        assert_array_equal(arr + other, arr.data * 2)
+        other.axes.b.labels = range(3)
+        with pytest.raises(ValueError):
+            arr + other
+
+        # plans are shared between arrays with equal axes but the result gets the axes of the operands
+        clear_broadcast_cache()
+        arr = ndtest((2, 3))
+        res = arr * ndtest(Axis(['b0', 'b1', 'b2'], 'b'))
+        arr2 = ndtest((2, 3))
+        res2 = arr2 * ndtest(Axis(['b0', 'b1', 'b2'], 'b'))
+        assert _broadcast_plans.cache_info()[:2] == (1, 1)
+        assert res.axes.a is arr.a and res2.axes.a is arr2.a
+
+        # cached plans do not keep axes alive
+        ref = weakref.ref(arr.a)
+        del arr, res
+        assert ref() is None
+
+        # float labels are not cached (a digest does not imply equal labels)
+        arr = ndtest(Axis([0.5, 1.5], 'a'))
+        assert_array_equal(arr + arr, arr.data * 2)
+        assert _broadcast_plans.cache_info()[:2] == (1, 1)
+
+        # resizing and disabling the cache
+        assert set_broadcast_cache_size(0) == 128
+        assert len(_broadcast_plans) == 0
+        assert_array_equal(arr2 * arr2, arr2.data ** 2)
+        assert len(_broadcast_plans) == 0
+        assert set_broadcast_cache_size(128) == 0
+
+    def test_binary_ops_inplace(self):
+        arr = ndtest((2, 3))
+        view = arr
+        data = arr.data
+        arr += 1
+        arr *= ndtest(Axis(['b0', 'b1', 'b2'], 'b'))
+        arr -= arr['a0']
+        assert arr is view
+        assert arr.data is data
+        assert_array_equal(arr, [[0, 0, 0], [0, 3, 6]])
+        # other is transposed before being applied
+        arr += arr.T
+        assert_array_equal(data, [[0, 0, 0], [0, 6, 12]])
+        # the result cannot be stored in an array of integers => a new array is returned
+        arr /= 2
+        assert arr is not view
+        assert arr.dtype == np.float64
+        assert_array_equal(arr, [[0., 0., 0.], [0., 3., 6.]])
+        assert view.dtype == data.dtype
+        # other cannot add axes to the array
+        with pytest.raises(ValueError):
+            view += ndtest('c=c0,c1')
+
+        # aliases and arrays viewed by a subset are modified too
+        arr = ndtest((2, 3))
+        alias = arr
+        alias += 1
+        assert_array_equal(arr, [[1, 2, 3], [4, 5, 6]])
+        sub = arr['a0']
+        sub += 100
+        assert_array_equal(arr, [[101, 102, 103], [4, 5, 6]])
+        sub = arr['b1':]
+        sub *= 2
+        assert_array_equal(arr, [[101, 204, 206], [4, 10, 12]])
+        # but not copies
+        sub = arr[['b0', 'b2']]
+        sub -= 1
+        assert_array_equal(arr, [[101, 204, 206], [4, 10, 12]])
+
+    def test_lazy(self):
+        from larray.core.expr import ne
+
+        pop = ndtest((3, 4, 5)).astype(float)
+        qx = ndtest((4, 5)).rename({'a': 'b', 'b': 'c'}) / 100
+        qx = qx.set_labels({'b': pop.b.labels, 'c': pop.c.labels})
+        mig = ndtest(Axis(pop.c.labels, 'c')) / 10
+        births = ndtest((3, 4)) * 1.0
+        expected = pop * qx * (1 - mig) + births
+
+        expr = lazy(pop) * qx * (1 - mig) + births
+        # axes are computed when building the expression
+        assert expr.axes == expected.axes
+        # larrays on the left side produce lazy expressions too
+        assert (qx * lazy(pop)).axes == AxisCollection([qx.b, qx.c, pop.a])
+        backends = ['numpy', 'numexpr'] if ne is not None else ['numpy']
+        for backend in backends:
+            assert_array_nan_equal(expr.compute(backend=backend), expected)
+            assert_array_equal((-lazy(pop) > -30).compute(backend=backend), pop < 30)
+        # several chunks and threads
+        assert_array_nan_equal(expr.compute(backend='numpy', chunk_size=7), expected)
+        assert_array_nan_equal(expr.compute(backend='numpy', chunk_size=7, threads=2), expected)
+        # operators not supported by numexpr use numpy
+        assert_array_equal((lazy(ndtest(4)) // 2 % 3).compute(), [0, 0, 1, 1])
+        # lazy expressions can be used as keys
+        assert_array_equal(pop[lazy(pop) > 57], [58., 59.])
+        with pytest.raises(ValueError):
+            lazy(pop) + ndtest((2, 3))
+
     def test_unary_ops(self):
         raw = self.small_data
         la = self.small
@@ -3693,6 +4096,34 @@ age    0       1       2       3       4       5       6       7        8  ...
 
         assert_array_equal(la_out, raw_out)
 
+        # with out= given as a keyword argument, the result is written in (and returned as) the out array, whatever
+        # the order of its axes
+        la_out = zeros([Axis([0, 1, 2], 'a')] + list(la.axes[::-1]))
+        self.assertIs(exp(la, out=la_out), la_out)
+        assert_array_equal(la_out.transpose('sex', 'lipro', 'a'), np.exp(raw)[..., np.newaxis] * np.ones(3))
+        self.assertIs(maximum(la, la['M'], out=la_out), la_out)
+        assert_array_equal(la_out.i[0], np.maximum(raw, raw[0]).T)
+        self.assertIs(clip(la, 10, 20, out=la_out), la_out)
+        assert_array_equal(la_out.i[1], raw.T.clip(10, 20))
+        self.assertIs(where(la > 10, la, la['M'], out=la_out), la_out)
+        assert_array_equal(la_out.i[2], np.where(raw > 10, raw, raw[0]).T)
+        # out being one of the operands
+        arr = ndtest((2, 3)) - 2
+        self.assertIs(where(arr > 0, 0, arr, out=arr), arr)
+        assert_array_equal(arr, [[-2, -1, 0], [0, 0, 0]])
+        arr = ndtest((2, 3)) - 2
+        self.assertIs(where(arr > 0, arr, 0, out=arr), arr)
+        assert_array_equal(arr, [[0, 0, 0], [1, 2, 3]])
+        # out sharing memory with (but not being) an operand
+        arr = ndtest((2, 2))
+        where(arr > 1, arr.data.T, -1, out=arr)
+        assert_array_equal(arr, [[-1, -1], [1, 3]])
+        arr = ndtest((2, 2))
+        where(arr < 2, -1, arr.data.T, out=arr)
+        assert_array_equal(arr, [[-1, -1], [1, 3]])
+        with pytest.raises(ValueError):
+            exp(la, out=zeros(la.sex))
+
         sex, lipro = la.axes
 
         low = la.sum(sex) // 4 + 3
@@ -3730,6 +4161,48 @@ age    0       1       2       3       4       5       6       7        8  ...
         rounded = round(small_float)
         assert_array_equal(rounded, np.round(self.small_data + 0.6))
 
+    @pytest.mark.skipif(not hasattr(np.ndarray, '__array_ufunc__'), reason="__array_ufunc__ requires numpy >= 1.13")
+    def test_array_ufunc(self):
+        arr = ndtest((2, 3))
+        b = Axis(['b0', 'b1', 'b2'], 'b')
+        other = ndtest(b)
+
+        # broadcasting by name
+        res = np.add(other, arr)
+        assert res.axes == AxisCollection([b, arr.a])
+        assert_array_equal(res, (arr.data + other.data).T)
+        # ndarrays use numpy broadcasting rules
+        assert_array_equal(np.arange(3) + arr, arr.data + np.arange(3))
+        # several outputs
+        frac, integral = np.modf(arr / 2)
+        assert frac.axes == arr.axes
+        assert_array_equal(integral, arr.data // 2)
+
+        # out (with axes in another order) and where
+        out = zeros(arr.axes[::-1])
+        assert np.multiply(arr, other, out=out) is out
+        assert_array_equal(out, (arr.data * other.data).T)
+        assert np.add(arr, 100, out=out, where=arr > 2) is out
+        assert_array_equal(out, [[0, 103], [1, 104], [4, 105]])
+        with pytest.raises(ValueError):
+            np.add(arr, 1, out=zeros(b))
+
+        # reduce and accumulate along named axes
+        assert_array_equal(np.multiply.reduce(arr, axis='b'), arr.prod('b'))
+        assert_array_equal(np.add.reduce(arr, axis=(X.a, 'b')), 15)
+        assert_array_equal(np.maximum.reduce(arr, axis=None), 5)
+        assert np.add.reduce(arr, axis='a', keepdims=True).shape == (1, 3)
+        out = zeros(b)
+        assert np.add.reduce(arr, axis='a', out=out) is out
+        assert_array_equal(out, arr.sum('a'))
+        assert_array_equal(np.add.accumulate(arr, axis='b'), arr.cumsum('b'))
+
+        # outer and at
+        res = np.multiply.outer(ndtest(2), other)
+        assert res.axes.names == ['a', 'b']
+        np.add.at(arr, (0, [0, 1]), 10)
+        assert_array_equal(arr['a0'], [10, 11, 2])
+
     def test_diag(self):
         # 2D -> 1D
         a = ndtest((3, 3))
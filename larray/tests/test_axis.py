@@ -6,7 +6,7 @@ import pytest
 import numpy as np
 
 from larray.tests.common import assert_array_equal
-from larray import Axis, AxisCollection, LGroup, IGroup
+from larray import Axis, AxisCollection, AxisPool, LGroup, IGroup, ndtest
 
 
 class TestAxis(TestCase):
@@ -109,6 +109,158 @@ class TestAxis(TestCase):
         self.assertEqual(a.index('a1'), 1)
         self.assertEqual(a.index('a1 >> A1'), 1)
 
+    def test_range_axis(self):
+        # labels given as a range are not materialized
+        person = Axis(range(1000000), 'person')
+        assert person._labels is None
+        assert len(person) == 1000000
+        assert person.index(500000) == 500000
+        assert person.index(slice(10, 19)) == slice(10, 20)
+        assert_array_equal(person.index([3, 1, 2]), [3, 1, 2])
+        assert_array_equal(person.index(np.array([7, 8])), [7, 8])
+        assert person._labels is None
+        with pytest.raises(KeyError):
+            person.index(1000000)
+        with pytest.raises(KeyError):
+            person.index(np.array([-1, 0]))
+        # empty keys select nothing, whatever their dtype
+        res = person.index(np.array([]))
+        assert res.dtype.kind == 'i' and res.shape == (0,)
+        assert_array_equal(person.index([]), [])
+        # narrow integer types do not overflow
+        small = Axis(np.arange(-100, 101, dtype=np.int8), 'small')
+        assert small._range == (-100, 1)
+        res = small.index(np.array([100, -100], dtype=np.int8))
+        assert res.dtype == np.intp
+        assert_array_equal(res, [200, 0])
+
+        # range strings and arithmetic progressions are detected
+        time = Axis('time=2020..2010')
+        assert time._range == (2020, -1)
+        assert time.index(2015) == 5
+        assert time.index(slice(2018, 2012)) == slice(2, 9)
+        assert_array_equal(time.labels, np.arange(2020, 2009, -1))
+        even = Axis([0, 2, 4, 6], 'even')
+        assert even._range == (0, 2)
+        assert even.index(4) == 2
+        assert_array_equal(even.index(np.array([6, 0])), [3, 0])
+        with pytest.raises(KeyError):
+            even.index(3)
+        assert Axis([0, 1, 3], 'a')._range is None
+        assert Axis(['a0', 'a1'], 'a')._range is None
+        # but only when needed
+        lazy = Axis([2, 4, 6], 'lazy')
+        assert lazy._Axis__range is False
+        assert lazy.copy()._range == (2, 2)
+        assert lazy._Axis__range is False
+        assert_array_equal(lazy.index([6, 2]), [2, 0])
+        assert lazy._Axis__range is False
+        assert_array_equal(lazy.index(np.array([6, 2])), [2, 0])
+        assert lazy._Axis__range == (2, 2)
+        # short and long lists
+        assert_array_equal(person.index(list(range(20, 0, -2))), np.arange(20, 0, -2))
+        with pytest.raises(KeyError):
+            person.index([1, 1000000])
+        with pytest.raises(KeyError):
+            person.index(list(range(999990, 1000010)))
+
+        # sub axes of range axes are range axes
+        subaxis = person.subaxis(slice(100, 200))
+        assert subaxis._labels is None
+        assert subaxis.equals(Axis(range(100, 200), 'person'))
+        assert subaxis.equals(Axis(np.arange(100, 200), 'person'))
+        assert not subaxis.equals(Axis(range(100, 201), 'person'))
+
+    def test_lookup_engine(self):
+        code = Axis(['C%04d' % i for i in range(1000)], 'code')
+        assert code.lookup_engine == 'hash'
+        # long enough to use the hash table
+        key = code.labels[np.arange(999, -1, -3)]
+        expected = np.arange(999, -1, -3)
+        assert_array_equal(code.index(key), expected)
+        assert_array_equal(code.index(key.reshape(2, -1)), expected.reshape(2, -1))
+        with pytest.raises(KeyError):
+            code.index(np.append(key, 'C1000'))
+        with pytest.raises(KeyError):
+            code.index(np.arange(100))
+
+        code.lookup_engine = 'sorted'
+        assert_array_equal(code.index(key), expected)
+        with pytest.raises(KeyError):
+            code.index(np.append(key, 'C1000'))
+        # the engine is kept by copies
+        assert code.copy().lookup_engine == 'sorted'
+
+        with pytest.raises(ValueError):
+            code.lookup_engine = 'invalid'
+
+    def test_equals_fingerprint(self):
+        codes = ['C%04d' % i for i in range(1000)]
+        code = Axis(codes, 'code')
+        assert code.equals(Axis(codes, 'code'))
+        assert code.iscompatible(Axis(codes, 'code'))
+        assert not code.equals(Axis(codes[:-1] + ['C9999'], 'code'))
+        assert not code.iscompatible(Axis(codes[:-1] + ['C9999'], 'code'))
+        # same labels stored with another dtype
+        assert code.equals(Axis(np.array(codes, dtype='U10'), 'code'))
+        assert Axis([1, 2, 3], 'a').equals(Axis([1., 2., 3.], 'a'))
+        assert Axis([1., 2., 3.], 'a').equals(Axis([1., 2., 3.], 'a'))
+        assert Axis(['a', 1, 2.5], 'a').equals(Axis(['a', 1, 2.5], 'a'))
+        assert not Axis(['a', 1, 2.5], 'a').equals(Axis(['a', 1, 3.5], 'a'))
+        # fingerprint is updated when labels change
+        other = Axis(codes, 'code')
+        assert code.equals(other)
+        other.labels = codes[::-1]
+        assert not code.equals(other)
+        # range axes are fingerprinted without materializing their labels
+        rng = Axis(range(1000), 'code')
+        assert rng._fingerprint == ('range', (0, 1, 1000), True)
+        assert rng._labels is None
+        assert not rng.equals(code)
+        assert rng.equals(Axis(np.arange(1000.), 'code'))
+
+    def test_index_cache(self):
+        codes = ['C%02d' % i for i in range(100)]
+        code = Axis(codes, 'code')
+        key = codes[10:74]
+        expected = np.arange(10, 74)
+        assert code.index_cache_info() == (0, 0, 32, 0)
+        assert_array_equal(code.index(key), expected)
+        res = code.index(key)
+        assert_array_equal(res, expected)
+        assert code.index_cache_info() == (1, 1, 32, 1)
+        # the cached result cannot be modified
+        with pytest.raises(ValueError):
+            res[0] = 5
+        # arrays with the same labels are cached separately from sequences
+        assert_array_equal(code.index(np.array(key)), expected)
+        assert_array_equal(code.index(np.array([key])), [expected])
+        assert code.index_cache_info() == (1, 3, 32, 3)
+        # short keys are not cached
+        assert_array_equal(code.index(['C01', 'C03']), [1, 3])
+        assert_array_equal(code.index(np.array(['C01', 'C03'])), [1, 3])
+        assert code.index_cache_info() == (1, 3, 32, 3)
+
+        # the cache is emptied when labels are replaced
+        code.labels = codes[::-1]
+        assert code.index_cache_info() == (0, 0, 32, 0)
+        assert_array_equal(code.index(key), 99 - expected)
+
+        # disabled cache
+        code.index_cache_size = 0
+        code.labels = codes
+        assert_array_equal(code.index(key), expected)
+        assert code.index_cache_info() == (0, 0, 0, 0)
+
+    def test_index_cache_group_keys(self):
+        # sequences of groups are not cached (and must not be converted to an array to check their size)
+        g1 = LGroup(['a', 'b'], 'g1')
+        g2 = LGroup(['c'], 'g2')
+        groups = Axis([g1, g2], 'groups')
+        assert_array_equal(groups.index([g1, g2]), [0, 1])
+        assert_array_equal(groups.index((g1, g2)), [0, 1])
+        assert groups.index_cache_info() == (0, 0, 32, 0)
+
     def test_getitem_lgroup_keys(self):
         def group_equal(g1, g2):
             return (g1.key == g2.key and g1.name == g2.name and
@@ -565,6 +717,11 @@ class TestAxisCollection(TestCase):
         self.assertEqual(len(col), 2)
         self.assert_axis_eq(col[0], self.lipro)
         self.assert_axis_eq(col[1], self.sex)
+        self.assertIs(col.sex, self.sex)
+        self.assertNotIn('age', col)
+        # modifying the slice does not modify the original collection
+        col['sex'] = self.sex2
+        self.assertIs(self.collection.sex, self.sex)
 
     def test_setitem_name(self):
         col = self.collection[:]
@@ -775,6 +932,37 @@ class TestAxisCollection(TestCase):
         with self.assertRaises(ValueError):
             col.index(anon3)
 
+    def test_label_positions(self):
+        long_range = Axis(range(0, 3000, 2), 'long_range')
+        # labels are first looked up in each axis, then in the label index of the collection
+        for min_lookups in (AxisCollection._label_index_min_lookups, 1):
+            col = AxisCollection([self.lipro, self.sex, self.age, Axis('other=F,5,6'), long_range])
+            col._label_index_min_lookups = min_lookups
+            assert col._label_positions('P02') == [(self.lipro, 1)]
+            # range axes
+            assert col._label_positions(5) == [(self.age, 5)]
+            assert col._label_positions(2000) == [(long_range, 1000)]
+            # ambiguous label
+            assert col._label_positions('F') == [(self.sex, 1), (col.other, 0)]
+            assert col._label_positions('P05') == []
+            # no matching of 0 against False or 0.0
+            assert col._label_positions(False) == []
+            assert col._label_positions(0.0) == []
+            # keys which are not plain labels
+            assert col._label_positions('P01,P02') is None
+            assert col._label_positions(['P01']) is None
+            assert isinstance(col._label_index[1], tuple) == (min_lookups == 1)
+
+            # positions are up to date when the collection or the labels of its axes change
+            del col['sex']
+            assert col._label_positions('F') == [(col.other, 0)]
+            col.append(self.geo)
+            assert col._label_positions('A12') == [(self.geo, 1)]
+            copy = col.copy()
+            col.other.labels = ['G', 'F', 'H']
+            assert col._label_positions('F') == [(col.other, 1)]
+            assert copy._label_positions('F') == [(copy.other, 1)]
+
     def test_get(self):
         col = self.collection
         self.assert_axis_eq(col.get('lipro'), self.lipro)
@@ -872,6 +1060,75 @@ class TestAxisCollection(TestCase):
     Axis([0, 1, 2, 3, 4, 5, 6, 7], 'age')
 ])""")
 
+    def test_prepare_key(self):
+        arr = ndtest((2, 3, 4))
+        a, b, c = arr.axes
+        key = arr.axes.prepare_key('a1', c='c1..c2')
+        expected = arr['a1', 'c1..c2']
+        assert arr[key].equals(expected)
+        # arrays with other (but compatible) axes objects, in another order or without some axes
+        assert ndtest((2, 3, 4)).transpose('c', 'a', 'b')[key].equals(expected.transpose('c', 'b'))
+        assert ndtest([a, c])[key].equals(ndtest([a, c])['a1', 'c1..c2'])
+        other = ndtest([Axis('d=d0,d1'), a, b, c])
+        assert other[key].equals(other['a1', 'c1..c2'])
+        # setitem
+        arr[key] = -expected
+        assert arr['a1', 'c1..c2'].equals(-expected)
+        assert arr['a0'].equals(ndtest((2, 3, 4))['a0'])
+        # the key must select all the labels of missing axes
+        with pytest.raises(ValueError):
+            ndtest([b, c])[key]
+        # incompatible axes
+        with pytest.raises(ValueError):
+            ndtest([Axis('a=a0,a1,a2'), b, c])[key]
+        # keys which do not select labels independently on each axis
+        with pytest.raises(ValueError):
+            arr.axes.prepare_key(arr > 3)
+
+
+class TestAxisPool(TestCase):
+    def test_intern(self):
+        pool = AxisPool()
+        a = Axis(['a0', 'a1', 'a2'], 'a')
+        assert pool.intern(a) is a
+        assert pool.intern(a) is a
+        assert pool.intern(Axis(['a0', 'a1', 'a2'], 'a')) is a
+        # different name, labels or length
+        a2 = Axis(['a0', 'a1', 'a2'], 'a2')
+        assert pool.intern(a2) is a2
+        assert pool.intern(Axis(['a0', 'a1'], 'a')) is not a
+        assert pool.intern(Axis(['a0', 'a1', 'a3'], 'a')) is not a
+        # wildcard axes
+        w = Axis(3, 'a')
+        assert pool.intern(w) is w
+        assert pool.intern(Axis(3, 'a')) is w
+        assert len(pool) == 5
+        assert pool.hits == 2
+        assert pool.nbytes_saved == a.labels.nbytes
+        # range axes are interned without materializing their labels
+        r = Axis(range(1000), 'r')
+        assert pool.intern(r) is r
+        assert pool.intern(Axis(range(1000), 'r')) is r
+        assert pool.intern(Axis(range(1, 1001), 'r')) is not r
+        assert r._labels is None
+        assert pool.hits == 3
+        assert pool.nbytes_saved == a.labels.nbytes
+
+        pool.clear()
+        assert len(pool) == 0
+        assert pool.hits == 0
+        assert pool.memory_saved == '0 bytes'
+
+    def test_intern_axes(self):
+        pool = AxisPool()
+        arr1 = ndtest((2, 3))
+        arr2 = ndtest((2, 3))
+        assert pool.intern_axes(arr1) is arr1
+        res = pool.intern_axes(arr2)
+        assert res.equals(arr2)
+        assert res.axes.a is arr1.axes.a
+        assert res.axes.b is arr1.axes.b
+
 
 if __name__ == "__main__":
     pytest.main()
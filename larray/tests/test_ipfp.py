@@ -1,11 +1,13 @@
 from __future__ import absolute_import, division, print_function
 
+import sys
 from unittest import TestCase
 
+import numpy as np
 import pytest
 
 from larray.tests.common import assert_array_equal
-from larray import Axis, LArray, ndtest, ipfp, X
+from larray import Axis, LArray, ndtest, ipfp, X, SparseSeed
 
 
 class TestIPFP(TestCase):
@@ -141,6 +143,211 @@ class TestIPFP(TestCase):
         assert_array_equal(r['b0'], ipfp([t['b0'] for t in targets], initial['b0']))
         assert_array_equal(r['b1'], ipfp([t['b1'] for t in targets], initial['b1']))
 
+    def test_ipfp_per_slice(self):
+        initial = ndtest((3, 4, 5)) + 1
+        # targets computed from an array which is not proportional to initial
+        fitted = initial * (ndtest((3, 4, 5)) % 3 + 1)
+        axes = (X.a, X.b)
+        targets = [fitted.sum(axis) for axis in axes]
+
+        r, info = ipfp(targets, initial, axes=axes, threshold=1e-8, per_slice=True, return_info=True)
+        assert r.axes == initial.axes
+        assert info.iterations.axes == initial.axes - axes
+        assert info.converged.all()
+        assert (info.max_sum_diff < 1e-8).all()
+        # same results than N independent 2D ipfp calls
+        for c in r.c:
+            expected, expected_info = ipfp([t[c] for t in targets], initial[c], threshold=1e-8, return_info=True)
+            assert_array_equal(r[c], expected)
+            assert info.iterations[c] == expected_info.iterations
+            assert info.max_sum_diff[c] == expected_info.max_sum_diff
+        # slices with different convergence speeds
+        assert info.iterations.min() < info.iterations.max()
+
+        # using threads
+        r2, info2 = ipfp(targets, initial, axes=axes, threshold=1e-8, per_slice=True, threads=2, return_info=True)
+        assert_array_equal(r2, r)
+        assert info2.iterations.equals(info.iterations)
+        # each thread gets its own progress printer
+        ipfp_module = sys.modules[ipfp.__module__]
+        printers = []
+
+        def progress_printer(condensed=False):
+            printers.append(condensed)
+            return lambda *args: None
+        orig_progress_printer = ipfp_module._progress_printer
+        ipfp_module._progress_printer = progress_printer
+        try:
+            r2 = ipfp(targets, initial, axes=axes, threshold=1e-8, per_slice=True, threads=2, display_progress=True)
+        finally:
+            ipfp_module._progress_printer = orig_progress_printer
+        assert_array_equal(r2, r)
+        assert len(printers) == 2
+
+        # other axes
+        axes = (X.a, X.c)
+        targets = [fitted.sum(axis) for axis in axes]
+        r = ipfp(targets, initial, axes=axes, threshold=1e-8, per_slice=True)
+        assert r.axes == initial.axes
+        for b in r.b:
+            assert_array_equal(r[b], ipfp([t[b] for t in targets], initial[b], threshold=1e-8))
+
+        # not converging slices
+        with self.assertRaisesRegexp(ValueError, "maximum iteration reached \\(2\\) for 4 slice\\(s\\) out of 4"):
+            ipfp(targets, initial, axes=axes, threshold=1e-8, maxiter=2, per_slice=True)
+
+        # without per_slice
+        r, info = ipfp(targets, initial, axes=axes, threshold=1e-8, return_info=True)
+        assert info.converged
+        assert info.max_sum_diff < 1e-8
+
+    def test_ipfp_methods(self):
+        initial = ndtest((3, 4, 5)) + 1
+        fitted = initial * (ndtest((3, 4, 5)) % 3 + 1)
+        targets = [fitted.sum(axis) for axis in initial.axes]
+
+        # check_every
+        r, info = ipfp(targets, initial, threshold=1e-8, return_info=True)
+        r2, info2 = ipfp(targets, initial, threshold=1e-8, check_every=4, return_info=True)
+        assert info2.iterations % 4 == 0
+        assert info.iterations <= info2.iterations < info.iterations + 4
+        assert_array_equal(r2, ipfp(targets, initial, threshold=0, maxiter=info2.iterations, no_convergence='ignore'))
+
+        # anderson gives the same result (up to the threshold)
+        r3, info3 = ipfp(targets, initial, threshold=1e-8, method='anderson', return_info=True)
+        assert info3.converged
+        assert abs(r3 - r).max() < 1e-6
+        for axis, target in zip(initial.axes, targets):
+            assert abs(r3.sum(axis) - target).max() < 1e-8
+        # also with per_slice and axes
+        axes = (X.a, X.c)
+        targets = [fitted.sum(axis) for axis in axes]
+        r, info = ipfp(targets, initial, axes=axes, threshold=1e-8, method='anderson', per_slice=True,
+                       check_every=2, return_info=True)
+        assert info.converged.all()
+        assert abs(r - ipfp(targets, initial, axes=axes, threshold=1e-10)).max() < 1e-6
+
+        # badly scaled initial values (the cell a0, b0 tends towards 0)
+        initial = LArray([[1, 1, 1], [1, 0, 0], [1, 0, 0]], [Axis('a=a0..a2'), Axis('b=b0..b2')])
+        targets = [LArray([2, 1, 1], initial.b), LArray([2, 1, 1], initial.a)]
+        with self.assertRaisesRegexp(ValueError, "maximum iteration reached \\(1000\\)"):
+            ipfp(targets, initial, threshold=1e-6)
+        r, info = ipfp(targets, initial, threshold=1e-6, method='anderson', return_info=True)
+        assert info.iterations < 100
+        assert abs(r - LArray([[0, 1, 1], [1, 0, 0], [1, 0, 0]], r.axes)).max() < 1e-5
+
+    def test_ipfp_callback_info(self):
+        initial = ndtest((3, 4, 5)) + 1
+        fitted = initial * (ndtest((3, 4, 5)) % 3 + 1)
+        targets = [fitted.sum(axis) for axis in initial.axes]
+
+        calls = []
+
+        def callback(iteration, max_cell_diff, max_sum_diff, elapsed):
+            calls.append((iteration, max_cell_diff, max_sum_diff, elapsed))
+
+        r, info = ipfp(targets, initial, threshold=1e-6, check_every=2, callback=callback, return_info=True)
+        assert [call[0] for call in calls] == list(range(1, info.iterations, 2))
+        # max_sum_diff decreases, elapsed increases
+        max_sum_diffs = [call[2] for call in calls]
+        assert max_sum_diffs == sorted(max_sum_diffs, reverse=True)
+        assert max_sum_diffs[-1] == info.max_sum_diff
+        elapsed = [call[3] for call in calls]
+        assert elapsed == sorted(elapsed)
+        assert info.elapsed >= elapsed[-1]
+        # max cell diff
+        r1 = ipfp(targets, initial, threshold=0, maxiter=1, no_convergence='ignore')
+        r2 = ipfp(targets, initial, threshold=0, maxiter=2, no_convergence='ignore')
+        self.assertAlmostEqual(calls[0][1], abs(r2 - r1).max())
+
+        # diagnostics
+        assert info.history.axes.names == ['iteration']
+        assert list(info.history.axes[0].labels) == [call[0] for call in calls]
+        assert_array_equal(info.history, max_sum_diffs)
+        assert list(info.axis_times.axes[0].labels) == ['a', 'b', 'c']
+        assert (info.axis_times > 0).all()
+        assert info.axis_times.sum() < info.elapsed
+
+        # per_slice and threads
+        calls = []
+        r, info = ipfp(targets[:2], initial, axes=(X.a, X.b), threshold=1e-6, per_slice=True, threads=2,
+                       callback=callback, return_info=True)
+        # the callback is called by each thread
+        assert sorted(set(call[0] for call in calls)) == list(range(info.iterations.max()))
+        assert info.history.max() == max(call[2] for call in calls)
+
+    def test_ipfp_sparse(self):
+        initial = ndtest((3, 4, 5)) % 7
+        fitted = initial * (ndtest((3, 4, 5)) % 3 + 1)
+        targets = [fitted.sum(axis) for axis in initial.axes]
+        seed = SparseSeed.from_dense(initial)
+        assert len(seed.values) == (initial != 0).sum()
+        assert seed.to_dense().equals(initial)
+
+        r, info = ipfp(targets, seed, threshold=1e-8, return_info=True)
+        expected, expected_info = ipfp(targets, initial, threshold=1e-8, return_info=True)
+        assert isinstance(r, SparseSeed)
+        assert r.axes == initial.axes
+        assert info.iterations == expected_info.iterations
+        assert abs(r.to_dense() - expected).max() < 1e-10
+        # the seed is not modified
+        assert seed.to_dense().equals(initial)
+
+        # using the axes argument
+        axes = (X.a, X.c)
+        targets = [fitted.sum(axis) for axis in axes]
+        r = ipfp(targets, seed, axes=axes, threshold=1e-8)
+        assert abs(r.to_dense() - ipfp(targets, initial, axes=axes, threshold=1e-8)).max() < 1e-10
+
+        # seed given by labels, without axes names
+        a, b = Axis(2), Axis(3)
+        seed = SparseSeed([a, b], [[0, 1, 1, 0], [0, 0, 2, 1]], [1, 2, 3, 4])
+        assert_array_equal(seed.to_dense(), [[1, 4, 0], [2, 0, 3]])
+        r = ipfp([[3, 4, 3], [5, 5]], seed, threshold=1e-8)
+        assert abs(r.to_dense() - ipfp([[3, 4, 3], [5, 5]], seed.to_dense(), threshold=1e-8)).max() < 1e-10
+
+        # validation
+        a, b = Axis('a=a0,a1'), Axis('b=b0,b1')
+        seed = SparseSeed([a, b], [['a0', 'a0', 'a1'], ['b0', 'b1', 'b0']], [2, -1, 1])
+        with self.assertRaisesRegexp(ValueError, "negative value\\(s\\) found:\na0_b1: -1"):
+            ipfp([LArray([2, 1], b), LArray([1, 2], a)], seed)
+        with self.assertRaisesRegexp(ValueError, "found all zero values sum along a \\(axis 0\\) but non zero target "
+                                                 "sum:\nb1: 2"):
+            ipfp([LArray([1, 2], b), LArray([1, 2], a)], SparseSeed([a, b], [['a0', 'a1'], ['b0', 'b0']], [2, 1]))
+        seed = SparseSeed([a, b], [['a0', 'a0', 'a1'], ['b0', 'b1', 'b0']], [2, 1, 1])
+        with self.assertRaisesRegexp(ValueError, "found Non Zero Values but Zero target Sum \\(nzvzs\\) along a "
+                                                 "\\(axis 0\\), use nzvzs='warn' or 'fix' to set them to zero "
+                                                 "automatically:\nb1: 1"):
+            ipfp([LArray([3, 0], b), LArray([1, 2], a)], seed)
+        r = ipfp([LArray([3, 0], b), LArray([1, 2], a)], seed, nzvzs='fix')
+        assert_array_equal(r.to_dense(), [[1, 0], [2, 0]])
+        with self.assertRaisesRegexp(ValueError, "not supported for sparse seeds"):
+            ipfp([LArray([3, 0], b), LArray([1, 2], a)], seed, per_slice=True)
+
+    def test_ipfp_dtype(self):
+        initial = ndtest((2, 3)).astype(np.float32)
+        a, b = initial.axes
+        targets = [LArray([4, 5, 6], b).astype(np.float32), LArray([7, 8], a).astype(np.float32)]
+        r = ipfp(targets, initial, threshold=0.01)
+        assert r.dtype == np.float32
+        # initial values are not modified
+        assert_array_equal(initial, ndtest((2, 3)))
+        # integer initial values and targets give floats
+        r = ipfp([[2, 1], [1, 2]], [[2, 1], [1, 2]])
+        assert r.dtype == np.float64
+        assert_array_equal(r, [[0.8, 0.2], [1.0, 1.0]])
+        # float32 initial values and float64 targets: the first sum is computed in float32
+        targets = [targets[0].astype(np.float64) / 3, targets[1].astype(np.float64) / 3]
+        r = ipfp(targets, initial, maxiter=1, no_convergence='ignore')
+        assert r.dtype == np.float64
+        expected = initial * targets[0].divnot0(initial.sum(a))
+        expected = expected * targets[1].divnot0(expected.sum(b))
+        assert_array_equal(r, expected)
+        # without any iteration, the initial values are returned with their type
+        r = ipfp(targets, initial, maxiter=0, no_convergence='ignore')
+        assert r.dtype == np.float32
+        assert_array_equal(r, initial)
+
     def test_ipfp_no_values(self):
         # 6, 12, 18
         along_a = ndtest([(3, 'b')], start=1) * 6
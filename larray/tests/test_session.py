@@ -9,7 +9,7 @@ import pandas as pd
 import pytest
 
 from larray.tests.common import assert_array_nan_equal, inputpath
-from larray import (Session, Axis, LArray, isnan, larray_equal, zeros_like, ndtest, ones_like,
+from larray import (Session, Axis, AxisPool, LArray, isnan, larray_equal, zeros_like, ndtest, ones_like,
                     local_arrays, global_arrays, arrays)
 from larray.util.misc import pickle
 
@@ -166,6 +166,16 @@ class TestSession(TestCase):
         s.load(fpath, ['e', 'f'])
         self.assertEqual(list(s.keys()), ['e', 'f'])
 
+        # share identical axes
+        fpath = self.get_path('test_session_pool.h5')
+        Session(e=self.e, g=self.g).save(fpath)
+        pool = AxisPool()
+        s = Session()
+        s.load(fpath, axis_pool=pool)
+        assert s.e.a0 is s.g.a0
+        assert s.e.a1 is not s.g.a1
+        assert pool.hits == 1
+
     def test_xlsx_pandas_io(self):
         fpath = self.get_path('test_session.xlsx')
         self.session.save(fpath, engine='pandas_excel')
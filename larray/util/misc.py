@@ -12,7 +12,7 @@ import warnings
 from textwrap import wrap
 from functools import reduce, wraps
 from itertools import product
-from collections import defaultdict
+from collections import defaultdict, namedtuple, OrderedDict
 
 try:
     from itertools import izip
@@ -20,6 +20,7 @@ except ImportError:
     izip = zip
 
 import numpy as np
+import pandas as pd
 try:
     np.set_printoptions(legacy='1.13')
 except TypeError:
@@ -338,6 +339,168 @@ def array_lookup2(array, sorted_keys, sorted_values):
     return sorted_values[indices]
 
 
+class SortedLookup(object):
+    """
+    Lookup engine translating arrays of keys through a mapping using binary search in the sorted keys.
+
+    Costs O(len(mapping) * log(len(mapping))) to build and O(len(array) * log(len(mapping))) per lookup.
+
+    Parameters
+    ----------
+    mapping : dict
+        Mapping {key: value} to pass arrays through.
+
+    Examples
+    --------
+    >>> lookup = SortedLookup({'b': 0, 'a': 1, 'c': 2})
+    >>> lookup(np.array(['c', 'a']))
+    array([2, 1])
+    """
+    def __init__(self, mapping):
+        if mapping:
+            sorted_keys, sorted_values = tuple(zip(*sorted(mapping.items())))
+        else:
+            sorted_keys, sorted_values = (), ()
+        self.sorted_keys = np.array(sorted_keys)
+        self.sorted_values = np.array(sorted_values)
+
+    def __call__(self, array):
+        return array_lookup2(array, self.sorted_keys, self.sorted_values)
+
+
+class HashLookup(object):
+    """
+    Lookup engine translating arrays of keys through a mapping using a hash table (a Pandas Index).
+
+    Costs O(len(mapping)) to build and O(len(array)) per lookup. Short arrays are translated through the mapping
+    itself, which is faster for them. In all cases, a key which is not in the mapping raises a KeyError as soon as it
+    is found.
+
+    Parameters
+    ----------
+    mapping : dict
+        Mapping {key: value} to pass arrays through.
+
+    Examples
+    --------
+    >>> lookup = HashLookup({'b': 0, 'a': 1, 'c': 2})
+    >>> lookup(np.array(['c', 'a']))
+    array([2, 1])
+    >>> lookup(np.array(['c', 'd']))
+    Traceback (most recent call last):
+        ...
+    KeyError: 'd'
+    """
+    # arrays with less elements than this are translated element by element using the mapping
+    short_size = 64
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        keys = np.array(list(mapping.keys()))
+        self.keys_kind = keys.dtype.kind
+        self._index = None
+        self._keys = keys
+        self.values = np.array(list(mapping.values()), dtype=int)
+
+    @property
+    def index(self):
+        # the hash table is only built when an array too long for the mapping path is first looked up
+        if self._index is None:
+            self._index = pd.Index(self._keys)
+            self._keys = None
+        return self._index
+
+    def __call__(self, array):
+        array = np.asarray(array)
+        if not array.size:
+            return np.empty(array.shape, dtype=self.values.dtype)
+        # prevent an array of booleans from matching a integer axis (like array_lookup2 does)
+        if array.dtype.kind != self.keys_kind:
+            raise KeyError('key has not the same dtype than axis')
+        mapping = self.mapping
+        if array.size < self.short_size:
+            res = np.empty(array.shape, dtype=self.values.dtype)
+            res.flat = [mapping[key] for key in array.flat]
+            return res
+        # fail early if the first key is invalid (this is common when guessing the axis of a key)
+        mapping[array.flat[0]]
+        indexer = self.index.get_indexer(array.ravel())
+        if (indexer == -1).any():
+            raise KeyError('all keys not in array')
+        return self.values[indexer].reshape(array.shape)
+
+
+lookup_engines = {'hash': HashLookup, 'sorted': SortedLookup}
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class LRUCache(object):
+    """
+    Bounded cache which discards the least recently used items first.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of items in the cache.
+
+    Examples
+    --------
+    >>> cache = LRUCache(2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache.get('a')
+    1
+    >>> cache['c'] = 3
+    >>> cache.get('b') is None
+    True
+    >>> cache.cache_info()
+    CacheInfo(hits=1, misses=1, maxsize=2, currsize=2)
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        data = self._data
+        try:
+            value = data.pop(key)
+        except KeyError:
+            self.misses += 1
+            return default
+        # mark as most recently used
+        data[key] = value
+        self.hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        data = self._data
+        data.pop(key, None)
+        data[key] = value
+        while len(data) > self.maxsize:
+            data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        data = self._data
+        while len(data) > maxsize:
+            data.popitem(last=False)
+
+    def cache_info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+
 def split_on_condition(seq, condition):
     """splits an iterable into two lists depending on a condition
 